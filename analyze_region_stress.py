@@ -2,7 +2,7 @@
 analyze_region_stress.py
 
 Amaç:
-- region_stress_index_weekly.csv + event_dates.csv dosyalarını okur
+- region_stress_index_weekly + event_dates tablolarını okur (Parquet, yoksa CSV)
 - Her event + bölge için pre/post stres ortalaması ve delta_stress hesaplar
 - Basit ANOVA ile bölgeler arası delta_stress farkı var mı diye bakar
 
@@ -10,10 +10,11 @@ Amaç:
     python analyze_region_stress.py
 """
 
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
-from statsmodels.formula.api import ols
+
+from stress_metrics import instrument, record
+from stress_store import read_table, write_table
 
 
 # --------------------------
@@ -21,16 +22,20 @@ from statsmodels.formula.api import ols
 # --------------------------
 
 def load_data(
-    region_file="region_stress_index_weekly.csv",
-    events_file="event_dates.csv"
+    region_file="region_stress_index_weekly.parquet",
+    events_file="event_dates.parquet",
+    date_range=None,
+    regions=None
 ):
+    """
+    date_range / regions verilirse sadece o tarih aralığı ve bölgeler okunur.
+    """
     print(f"[INFO] Bölgesel stres verisi okunuyor: {region_file}")
-    region = pd.read_csv(region_file)
-    region["date"] = pd.to_datetime(region["date"])
+    region = read_table("region_index", region_file,
+                        date_range=date_range, regions=regions)
 
     print(f"[INFO] Event tarihleri okunuyor: {events_file}")
-    events = pd.read_csv(events_file)
-    events["event_date"] = pd.to_datetime(events["event_date"])
+    events = read_table("events", events_file, date_range=date_range)
 
     return region, events
 
@@ -39,7 +44,13 @@ def load_data(
 # 2) Basit EDA
 # --------------------------
 
-def run_eda(region):
+def run_eda(region, out_file=None):
+    """
+    Özet istatistikler + bölge indeks grafiği.
+    out_file verilirse grafik ekrana basılmaz, dosyaya kaydedilir.
+    """
+    from plot_region_stress_analysis import plot_region_index
+
     print("\n--- region_stress_index_weekly.head() ---")
     print(region.head())
 
@@ -47,67 +58,227 @@ def run_eda(region):
     print(region.describe())
 
     print("\n[INFO] 7 bölgenin stres indeksini çiziyorum...")
-    plt.figure(figsize=(12, 6))
-    for reg in sorted(region["region7"].unique()):
-        sub = region[region["region7"] == reg]
-        plt.plot(sub["date"], sub["stress_index"], label=reg, alpha=0.8)
-    plt.title("7 Bölge İçin Haftalık Stres İndeksi (Google Trends)")
-    plt.xlabel("Tarih")
-    plt.ylabel("Stres İndeksi (z-score ortalaması)")
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
+    plot_region_index(region, out_file=out_file)
 
 
 # --------------------------
 # 3) Event + bölge paneli
 # --------------------------
 
+def build_region_prefix(region):
+    """
+    Haftalık indeksi bir kez (tarih × bölge) matrisine pivotlar ve
+    kümülatif toplamlarını hazırlar.
+
+    Dönen sözlük:
+    - dates:   sıralı tekil tarihler (datetime64[ns])
+    - regions: sıralı bölge isimleri
+    - csum:    (n_dates + 1, n_regions) kümülatif stres toplamı
+    - cerr:    (n_dates + 1, n_regions) kümülatif yuvarlama hatası
+    - ccnt:    (n_dates + 1, n_regions) kümülatif gözlem sayısı
+
+    Düz float64 cumsum'da C[hi] - C[lo] farkı, sıfıra yakın pencerelerde
+    son hanede sapıyor. Bu yüzden her toplama adımının yuvarlama hatası
+    (TwoSum) ayrıca biriktiriliyor; pencere toplamı böylece pandas'ın
+    .mean() sonucuyla aynı çıkıyor.
+    """
+    grouped = (
+        region
+        .dropna(subset=["stress_index"])
+        .groupby(["date", "region7"], observed=True)["stress_index"]
+        .agg(["sum", "count"])
+    )
+    sums = grouped["sum"].unstack("region7")
+    counts = grouped["count"].unstack("region7")
+
+    regions = sorted(region["region7"].unique())
+    dates = sums.index.union(pd.DatetimeIndex(region["date"].unique())).sort_values()
+    sums = sums.reindex(index=dates, columns=regions).fillna(0.0)
+    counts = counts.reindex(index=dates, columns=regions).fillna(0)
+
+    prefix = build_prefix(dates, sums.to_numpy(dtype=np.float64),
+                          counts.to_numpy(dtype=np.int64))
+    prefix["regions"] = regions
+    return prefix
+
+
+def build_prefix(dates, sums, counts):
+    """
+    Genel (tarih × kolon) kümülatif toplam yapısı.
+
+    - dates:  (n_dates,) sıralı tarihler
+    - sums:   (n_dates, n_cols) hücre toplamları (eksik = 0)
+    - counts: (n_dates, n_cols) hücre gözlem sayıları
+
+    build_region_prefix bölge kolonları için, il paneli (il × keyword)
+    kolonları için kullanır.
+    """
+    shape = (len(dates) + 1, sums.shape[1])
+
+    csum = np.zeros(shape)
+    np.cumsum(sums, axis=0, out=csum[1:])
+
+    # csum[i] = fl(csum[i-1] + sums[i-1]) adımının tam hatası
+    err = _two_sum_err(csum[:-1], sums, csum[1:])
+    cerr = np.zeros(shape)
+    np.cumsum(err, axis=0, out=cerr[1:])
+
+    ccnt = np.zeros(shape, dtype=np.int64)
+    np.cumsum(counts, axis=0, out=ccnt[1:])
+
+    return {
+        "dates": np.asarray(dates, dtype="datetime64[ns]"),
+        "csum": csum,
+        "cerr": cerr,
+        "ccnt": ccnt,
+    }
+
+
+def _two_sum_err(a, b, s):
+    # s = fl(a + b) iken a + b - s (Knuth TwoSum)
+    bb = s - a
+    return (a - (s - bb)) + (b - bb)
+
+
+def window_means(prefix, ev_dates, pre_days, post_days):
+    """
+    Tüm event'ler ve bölgeler için pre/post ortalamalarını tek seferde hesaplar.
+
+    - pre:  event_date - pre_days <= date <  event_date
+    - post: event_date            <= date <= event_date + post_days
+
+    Pencere sınırları tarih ekseninde searchsorted ile bulunur, ortalama
+    kümülatif toplam farkından gelir. Boş pencerede sonuç NaN olur.
+    Dönüş: (pre_mean, post_mean), her biri (n_events, n_regions).
+    """
+    dates = prefix["dates"]
+    ev = np.asarray(ev_dates, dtype="datetime64[ns]")
+    pre_td = np.timedelta64(int(pre_days), "D")
+    post_td = np.timedelta64(int(post_days), "D")
+
+    pre_lo = np.searchsorted(dates, ev - pre_td, side="left")
+    ev_pos = np.searchsorted(dates, ev, side="left")
+    post_hi = np.searchsorted(dates, ev + post_td, side="right")
+
+    pre_mean = _range_mean(prefix, pre_lo, ev_pos)
+    post_mean = _range_mean(prefix, ev_pos, post_hi)
+    return pre_mean, post_mean
+
+
+def _range_mean(prefix, lo, hi):
+    csum, cerr, ccnt = prefix["csum"], prefix["cerr"], prefix["ccnt"]
+    upper, lower = csum[hi], -csum[lo]
+    diff = upper + lower
+    total = diff + (_two_sum_err(upper, lower, diff) + (cerr[hi] - cerr[lo]))
+    count = ccnt[hi] - ccnt[lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+    mean[count == 0] = np.nan
+    return mean
+
+
+@instrument("build_event_panel")
 def build_event_panel(region, events,
                       pre_days=30, post_days=30,
-                      out_file="event_region_stress_panel.csv"):
+                      out_file="event_region_stress_panel.parquet"):
     """
     Her event + bölge için:
     - pre_mean: event_date - pre_days .. event_date-1
     - post_mean: event_date .. event_date + post_days
     - delta_stress: post_mean - pre_mean
+
+    Bölge verisi bir kez tarih × bölge matrisine çevrilir; tüm event'ler
+    için pencere ortalamaları kümülatif toplam + searchsorted ile tek
+    geçişte hesaplanır (bkz. build_region_prefix, window_means).
     """
     print(f"\n[INFO] Event panel oluşturuluyor (pre={pre_days}, post={post_days})...")
 
-    rows = []
-    regions = sorted(region["region7"].unique())
+    prefix = build_region_prefix(region)
 
-    for _, ev in events.iterrows():
-        ev_date = ev["event_date"]
-        ev_type = ev["event_type"]
+    ev_dates = pd.to_datetime(events["event_date"]).to_numpy()
+    pre_mean, post_mean = window_means(prefix, ev_dates, pre_days, post_days)
+    panel = _panel_frame(prefix, events, pre_mean, post_mean)
+    record(rows_in=len(region) + len(events), rows_out=len(panel))
 
-        for reg in regions:
-            sub = region[region["region7"] == reg].copy()
-
-            pre_mask = (sub["date"] >= ev_date - pd.Timedelta(days=pre_days)) & \
-                       (sub["date"] < ev_date)
-            post_mask = (sub["date"] >= ev_date) & \
-                        (sub["date"] <= ev_date + pd.Timedelta(days=post_days))
+    if out_file is not None:
+        out_file = write_table(panel, "panel", out_file)
+        print(f"[OK] event_region_stress_panel kaydedildi: {out_file}")
+    print(panel.head())
 
-            pre_mean = sub.loc[pre_mask, "stress_index"].mean()
-            post_mean = sub.loc[post_mask, "stress_index"].mean()
-            delta = post_mean - pre_mean
+    return panel
 
-            rows.append({
-                "event_date": ev_date,
-                "event_type": ev_type,
-                "region7": reg,
-                "pre_mean": pre_mean,
-                "post_mean": post_mean,
-                "delta_stress": delta
-            })
 
-    panel = pd.DataFrame(rows)
-    panel.to_csv(out_file, index=False)
+def _panel_frame(prefix, events, pre_mean, post_mean):
+    # (n_events, n_regions) matrislerini event-major uzun panele açar
+    regions = prefix["regions"]
+    n_events, n_regions = len(events), len(regions)
+    panel = pd.DataFrame({
+        "event_date": np.repeat(pd.to_datetime(events["event_date"]).to_numpy(), n_regions),
+        "event_type": np.repeat(events["event_type"].to_numpy(), n_regions),
+        "region7": np.tile(np.asarray(regions, dtype=object), n_events),
+        "pre_mean": pre_mean.ravel(),
+        "post_mean": post_mean.ravel(),
+    })
+    panel["delta_stress"] = panel["post_mean"] - panel["pre_mean"]
+    return panel
 
-    print(f"[OK] event_region_stress_panel kaydedildi: {out_file}")
-    print(panel.head())
 
+@instrument("sweep_event_windows")
+def sweep_event_windows(region, events, windows,
+                        with_anova=False, out_file=None):
+    """
+    Birden çok (pre_days, post_days) penceresi için event panelini tek
+    seferde üretir (duyarlılık analizi).
+
+    - windows: [(pre_days, post_days), ...] listesi
+    - Kümülatif toplam yapısı bir kez kurulur; her tekil pre_days ve
+      post_days değeri için pencere ortalaması bir kez hesaplanır,
+      kombinasyonlar bunlardan türetilir.
+    - Sonuç: pre_days, post_days kolonlu uzun (long) panel
+    - with_anova=True ise (panel, anova_by_window(panel)) döner
+    - out_file verilirse stress_store.write_table("panel_sweep") ile yazılır
+      (.parquet ise Parquet + CSV kopyası, .csv ise sadece CSV)
+    """
+    windows = [(int(pre), int(post)) for pre, post in windows]
+    if not windows:
+        raise ValueError("windows boş olamaz: en az bir (pre_days, post_days) gerekli")
+    bad = [w for w in windows if min(w) < 0]
+    if bad:
+        raise ValueError(f"Pencere günleri negatif olamaz: {bad}")
+    print(f"\n[INFO] Pencere taraması: {len(windows)} kombinasyon, {len(events)} event")
+
+    prefix = build_region_prefix(region)
+    dates = prefix["dates"]
+    ev_dates = pd.to_datetime(events["event_date"]).to_numpy()
+    ev = ev_dates.astype("datetime64[ns]")
+    ev_pos = np.searchsorted(dates, ev, side="left")
+
+    pre_cache = {}
+    for pre in sorted({pre for pre, _ in windows}):
+        lo = np.searchsorted(dates, ev - np.timedelta64(pre, "D"), side="left")
+        pre_cache[pre] = _range_mean(prefix, lo, ev_pos)
+
+    post_cache = {}
+    for post in sorted({post for _, post in windows}):
+        hi = np.searchsorted(dates, ev + np.timedelta64(post, "D"), side="right")
+        post_cache[post] = _range_mean(prefix, ev_pos, hi)
+
+    parts = []
+    for pre, post in windows:
+        part = _panel_frame(prefix, events, pre_cache[pre], post_cache[post])
+        part.insert(0, "post_days", post)
+        part.insert(0, "pre_days", pre)
+        parts.append(part)
+
+    panel = pd.concat(parts, ignore_index=True)
+    record(rows_in=len(region) + len(events), rows_out=len(panel))
+
+    if out_file is not None:
+        out_file = write_table(panel, "panel_sweep", out_file)
+        print(f"[OK] Pencere tarama paneli kaydedildi: {out_file}")
+
+    if with_anova:
+        return panel, anova_by_window(panel)
     return panel
 
 
@@ -115,23 +286,35 @@ def build_event_panel(region, events,
 # 4) ANOVA: Bölgelerarası fark
 # --------------------------
 
-def run_anova(panel):
+@instrument("run_anova")
+def run_anova(panel, verbose=True):
     """
     H0: delta_stress ortalaması tüm bölgelerde aynıdır.
     H1: En az bir bölgenin delta_stress ortalaması farklıdır.
+
+    ANOVA tablosunu döndürür; verbose=False ise ekrana yazmaz.
     """
+    # statsmodels sadece burada gerekli; panel / event komutları import etmesin
+    import statsmodels.api as sm
+    from statsmodels.formula.api import ols
+
     df = panel.dropna(subset=["delta_stress"]).copy()
+    record(rows_in=len(panel), rows_out=len(df))
 
-    print("\n--- ANOVA için gözlem sayısı ---")
-    print(len(df))
+    if verbose:
+        print("\n--- ANOVA için gözlem sayısı ---")
+        print(len(df))
 
     model = ols("delta_stress ~ C(region7)", data=df).fit()
     anova_table = sm.stats.anova_lm(model, typ=2)
 
+    if not verbose:
+        return anova_table
+
     print("\n--- ANOVA Sonuçları (delta_stress ~ C(region7)) ---")
     print(anova_table)
 
-    p_val = anova_table["PR(>F)"][0]
+    p_val = anova_table["PR(>F)"].iloc[0]
     alpha = 0.05
 
     if p_val < alpha:
@@ -145,6 +328,34 @@ def run_anova(panel):
             "\n       Bölgeler arasında event sonrası stres değişiminde anlamlı fark yok."
         )
 
+    return anova_table
+
+
+def anova_by_window(sweep_panel):
+    """
+    sweep_event_windows çıktısında her (pre_days, post_days) için run_anova
+    çalıştırır; pencere başına F ve p değerini tek tabloda toplar.
+    En az iki bölgede gözlemi olmayan (ör. delta_stress'i tamamen NaN)
+    pencereler ANOVA'ya girmez, atlanır.
+    """
+    rows = []
+    for (pre, post), sub in sweep_panel.groupby(["pre_days", "post_days"], sort=False):
+        observed = sub["delta_stress"].notna()
+        n_obs = int(observed.sum())
+        if sub.loc[observed, "region7"].nunique() < 2:
+            print(f"  [WARN] Pencere ({pre}, {post}): yeterli gözlem yok, ANOVA atlanıyor.")
+            continue
+        table = run_anova(sub, verbose=False)
+        rows.append({
+            "pre_days": pre,
+            "post_days": post,
+            "n_obs": n_obs,
+            "F": table["F"].iloc[0],
+            "p_value": table["PR(>F)"].iloc[0],
+        })
+
+    return pd.DataFrame(rows, columns=["pre_days", "post_days", "n_obs", "F", "p_value"])
+
 
 # --------------------------
 # MAIN
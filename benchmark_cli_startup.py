@@ -0,0 +1,140 @@
+"""
+benchmark_cli_startup.py
+
+Amaç:
+- stress_cli alt komutlarının soğuk başlangıç (import) süresini ölçer:
+  her ölçüm yeni bir Python sürecinde `import stress_cli` +
+  stress_cli.load_command(<komut>) + komutun çalışırken tembel import
+  ettiği paketleri (COMMANDS[..]["deps"]; kurulu değilse atlanır) yükler
+- Süreler komut başına bütçeyle (BUDGET_MS) karşılaştırılır; ayrıca
+  komutun yüklememesi gereken paketler (COMMANDS[..]["forbidden"], ör.
+  events için matplotlib / statsmodels) yüklendiyse hata sayılır
+- --importtime ile her komut için en pahalı (kümülatif) importlar listelenir
+- Bütçe aşılırsa ya da yasak paket yüklenirse çıkış kodu 1 (CI'da
+  kontrol olarak çalıştırılabilir)
+
+Çalıştırma:
+    python benchmark_cli_startup.py
+    python benchmark_cli_startup.py --repeat 7 --importtime
+    python benchmark_cli_startup.py --scale 2.0     # yavaş makinede bütçeyi gevşet
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from stress_cli import COMMANDS
+
+
+# Soğuk başlangıç bütçesi (ms, en iyi ölçüm; yorumlayıcı açılışı dahil değil)
+BUDGET_MS = {
+    "collect": 900,
+    "events": 900,
+    "index": 900,
+    "panel": 900,
+    "anova": 2500,
+    "plot": 3500,
+}
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import stress_cli
+stress_cli.load_command({name!r})
+for dep in stress_cli.COMMANDS[{name!r}]["deps"]:
+    try:
+        __import__(dep)
+    except ImportError:
+        pass
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"import_s": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure(name, repeat=5):
+    """Komutun import süresi (yeni süreçlerde, en iyi / ortalama) ve yüklenen paketler."""
+    times, modules = [], set()
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(name=name)],
+                             cwd=HERE, capture_output=True, text=True, check=True)
+        res = json.loads(out.stdout.strip().splitlines()[-1])
+        times.append(res["import_s"])
+        modules = set(res["modules"])
+
+    # "statsmodels" paketi ve alt modülleri; "statsmodels.api" sadece o alt ağaç
+    forbidden = [f for f in COMMANDS[name]["forbidden"]
+                 if any(m == f or m.startswith(f + ".") for m in modules)]
+    return {
+        "command": name,
+        "best_ms": 1e3 * min(times),
+        "mean_ms": 1e3 * sum(times) / len(times),
+        "forbidden_loaded": ",".join(forbidden),
+    }
+
+
+def import_profile(name, top=10):
+    """python -X importtime çıktısından en pahalı kümülatif importlar."""
+    code = _PROBE.format(name=name)
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                         cwd=HERE, capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:  self [us] | cumulative | modül"
+        self_us, cum_us, module = line[len("import time:"):].split("|")
+        rows.append({"module": module.strip(), "self_ms": int(self_us) / 1e3,
+                     "cumulative_ms": int(cum_us) / 1e3})
+    df = pd.DataFrame(rows)
+    # Sadece üst düzey paketler (iç içe importların toplamı zaten kümülatifte)
+    df = df[~df["module"].str.contains(r"\.")]
+    return df.sort_values("cumulative_ms", ascending=False).head(top)
+
+
+def run_benchmark(commands=None, repeat=5, scale=1.0, importtime=False):
+    commands = commands or list(COMMANDS)
+    rows = []
+    for name in commands:
+        print(f"[INFO] Ölçülüyor: {name}")
+        row = measure(name, repeat)
+        row["budget_ms"] = BUDGET_MS[name] * scale
+        row["ok"] = row["best_ms"] <= row["budget_ms"] and not row["forbidden_loaded"]
+        rows.append(row)
+
+        if importtime:
+            print(import_profile(name).round(1).to_string(index=False))
+
+    result = pd.DataFrame(rows)
+    print("\n--- Soğuk başlangıç (ms) ---")
+    print(result.round(1).to_string(index=False))
+
+    failed = result[~result["ok"]]
+    if failed.empty:
+        print("\n[OK] Tüm komutlar bütçe içinde.")
+    else:
+        for row in failed.itertuples():
+            why = f"yasak paket: {row.forbidden_loaded}" if row.forbidden_loaded else \
+                f"{row.best_ms:.0f} ms > {row.budget_ms:.0f} ms"
+            print(f"[ERROR] {row.command}: {why}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CLI soğuk başlangıç bütçesi")
+    parser.add_argument("commands", nargs="*", help=f"Varsayılan: hepsi ({', '.join(COMMANDS)})")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="Bütçe çarpanı")
+    parser.add_argument("--importtime", action="store_true")
+    args = parser.parse_args()
+    unknown = [c for c in args.commands if c not in COMMANDS]
+    if unknown:
+        parser.error(f"Bilinmeyen komut: {unknown}")
+
+    result = run_benchmark(args.commands, args.repeat, args.scale, args.importtime)
+    sys.exit(0 if result["ok"].all() else 1)
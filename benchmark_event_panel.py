@@ -0,0 +1,108 @@
+"""
+benchmark_event_panel.py
+
+Amaç:
+- analyze_region_stress.build_event_panel'in vektörize motorunu eski
+  iterrows/.copy() döngüsüyle karşılaştırır
+- region_stress_index_weekly.csv üzerine rastgele (sentetik) event
+  kataloğu üretir, iki yöntemi zamanlar ve sonuçların aynı olduğunu kontrol eder
+
+Çalıştırma:
+    python benchmark_event_panel.py
+    python benchmark_event_panel.py --events 20000 --pre 60 --post 30
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analyze_region_stress import load_data, build_event_panel
+
+
+def build_event_panel_loop(region, events, pre_days=30, post_days=30):
+    """
+    Referans: build_event_panel'in eski (event × bölge döngülü) hâli.
+    Sadece karşılaştırma için tutuluyor, CSV yazmaz.
+    """
+    rows = []
+    regions = sorted(region["region7"].unique())
+
+    for _, ev in events.iterrows():
+        ev_date = ev["event_date"]
+        ev_type = ev["event_type"]
+
+        for reg in regions:
+            sub = region[region["region7"] == reg].copy()
+
+            pre_mask = (sub["date"] >= ev_date - pd.Timedelta(days=pre_days)) & \
+                       (sub["date"] < ev_date)
+            post_mask = (sub["date"] >= ev_date) & \
+                        (sub["date"] <= ev_date + pd.Timedelta(days=post_days))
+
+            pre_mean = sub.loc[pre_mask, "stress_index"].mean()
+            post_mean = sub.loc[post_mask, "stress_index"].mean()
+
+            rows.append({
+                "event_date": ev_date,
+                "event_type": ev_type,
+                "region7": reg,
+                "pre_mean": pre_mean,
+                "post_mean": post_mean,
+                "delta_stress": post_mean - pre_mean
+            })
+
+    return pd.DataFrame(rows)
+
+
+def make_synthetic_events(region, n_events, seed=0):
+    """Bölge verisinin tarih aralığında rastgele event günleri üretir."""
+    rng = np.random.default_rng(seed)
+    start = region["date"].min().normalize()
+    n_days = (region["date"].max() - start).days + 1
+
+    offsets = rng.integers(0, n_days, size=n_events)
+    events = pd.DataFrame({
+        "event_date": start + pd.to_timedelta(np.sort(offsets), unit="D"),
+        "event_type": rng.choice(["earthquake", "fx_shock"], size=n_events),
+    })
+    return events
+
+
+def run_benchmark(n_events=10_000, pre_days=30, post_days=30, seed=0):
+    region, _ = load_data()
+    events = make_synthetic_events(region, n_events, seed=seed)
+
+    print(f"\n[INFO] {n_events} sentetik event × "
+          f"{region['region7'].nunique()} bölge")
+
+    t0 = time.perf_counter()
+    fast = build_event_panel(region, events, pre_days=pre_days,
+                             post_days=post_days, out_file=None)
+    t_fast = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    slow = build_event_panel_loop(region, events, pre_days=pre_days,
+                                  post_days=post_days)
+    t_slow = time.perf_counter() - t0
+
+    pd.testing.assert_frame_equal(fast, slow, check_exact=False, rtol=1e-12)
+
+    print("\n--- Sonuç ---")
+    print(f"Döngü (iterrows):    {t_slow:8.3f} s")
+    print(f"Vektörize (cumsum):  {t_fast:8.3f} s")
+    print(f"Hızlanma:            {t_slow / t_fast:8.1f}x")
+
+    return {"loop_s": t_slow, "vectorized_s": t_fast}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Event panel benchmark")
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--pre", type=int, default=30)
+    parser.add_argument("--post", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run_benchmark(args.events, args.pre, args.post, args.seed)
@@ -0,0 +1,319 @@
+"""
+benchmark_pipeline.py
+
+Amaç:
+- Pipeline'ın her aşamasının süresini ve bellek kullanımını ölçer:
+  build_event_dates, build_region_stress_index, build_event_panel,
+  run_anova ve plot fonksiyonları
+- Gerçek dosyalarla birebir aynı şemada sentetik girdiler üretir;
+  ölçek ayarlanabilir (il sayısı, keyword sayısı, günlük / haftalık /
+  aylık tarih, deprem ve kur kataloğu büyüklüğü)
+- Her aşama ayrı bir süreçte (spawn) çalışır; böylece tepe RSS aşamaya
+  özgü olur. Süre, en iyi --repeat ölçümüdür; ardından aşama bir kez de
+  tracemalloc açıkken çalıştırılıp tepe ayırma (allocation) ölçülür.
+  stress_store parse cache'i ölçüm süreçlerinde kapalıdır (STRESS_CACHE=0)
+- Sonuçlar makine tarafından okunabilir JSON satırı olarak
+  benchmark_history.jsonl'a eklenir (git commit'i ve ölçek ayarlarıyla);
+  --compare ile aynı ölçekteki bir önceki çalıştırmayla karşılaştırılır
+
+Çalıştırma:
+    python benchmark_pipeline.py
+    python benchmark_pipeline.py --provinces 400 --keywords 10 --freq D --quakes 500000
+    python benchmark_pipeline.py --compare
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from build_region_stress_index import VALUE_COLS
+from earthquake_events import PROVINCE_FILE
+
+
+DATA_DIR = "benchmark_data"
+HISTORY_FILE = "benchmark_history.jsonl"
+
+REGIONS = ["Akdeniz", "Doğu Anadolu", "Ege", "Güneydoğu Anadolu",
+           "Karadeniz", "Marmara", "İç Anadolu"]
+
+PLOTS = ["plot_delta_stress_by_region", "plot_delta_stress_bar",
+         "plot_event_timeline", "plot_fx_vs_quake"]
+
+
+# --------------------------------------------------
+# Sentetik girdiler (gerçek dosya şemalarında)
+# --------------------------------------------------
+
+def make_synthetic_inputs(data_dir=DATA_DIR, n_provinces=81, n_keywords=5,
+                          freq="W-MON", start="2018-01-01", end="2025-10-31",
+                          n_quakes=200_000, seed=0):
+    """
+    data_dir içine üç girdi yazar:
+    - google_trends_province_timeseries.csv  (date, keyword'ler, province_code, province, region7)
+    - earthquake.csv                         (AFAD şeması, Date = gün/ay/yıl saat)
+    - USD_TRY Historical Data.csv            (investing.com şeması, günlük, yeniden eskiye)
+    Dönüş: keyword kolonları listesi
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(data_dir, exist_ok=True)
+
+    # İller: önce gerçek 81 il, fazlası sentetik isimlerle
+    real = pd.read_csv(PROVINCE_FILE)
+    provinces = real[["code", "province", "region7"]].head(n_provinces).to_dict("records")
+    for i in range(len(provinces), n_provinces):
+        provinces.append({"code": f"TR-X{i + 1:04d}", "province": f"Il_{i + 1:04d}",
+                          "region7": REGIONS[i % len(REGIONS)]})
+
+    keywords = list(VALUE_COLS[:n_keywords]) + \
+        [f"kw_{j + 1:02d}" for j in range(len(VALUE_COLS), n_keywords)]
+
+    dates = pd.date_range(start, end, freq=freq)
+    n_dates, n_prov = len(dates), len(provinces)
+
+    # Trends: 0-100 arası tamsayılar, il başına farklı seviye + gürültü
+    level = rng.uniform(10, 60, size=(n_prov, 1, len(keywords)))
+    noise = rng.normal(0, 10, size=(n_prov, n_dates, len(keywords)))
+    values = np.clip(np.rint(level + noise), 0, 100).reshape(-1, len(keywords))
+
+    trends = pd.DataFrame(values.astype(np.int64), columns=keywords)
+    trends.insert(0, "date", np.tile(dates.strftime("%Y-%m-%d"), n_prov))
+    prov = pd.DataFrame(provinces).loc[np.repeat(np.arange(n_prov), n_dates)].reset_index(drop=True)
+    trends["province_code"] = prov["code"]
+    trends["province"] = prov["province"]
+    trends["region7"] = prov["region7"]
+    trends.to_csv(os.path.join(data_dir, "google_trends_province_timeseries.csv"), index=False)
+
+    # Deprem kataloğu: Gutenberg–Richter (b = 1) magnitüdleri, Türkiye kutusunda konum
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds()
+    times = pd.Timestamp(start) + pd.to_timedelta(np.sort(rng.uniform(0, span, n_quakes)), unit="s")
+    mag = np.round(2.0 + rng.exponential(np.log10(np.e), n_quakes), 1)
+    eq = pd.DataFrame({
+        "Date": times.strftime("%d/%m/%Y %H:%M:%S"),
+        "Longitude": np.round(rng.uniform(26.0, 45.0, n_quakes), 5),
+        "Latitude": np.round(rng.uniform(36.0, 42.0, n_quakes), 5),
+        "Depth": np.round(rng.uniform(0.0, 60.0, n_quakes), 2),
+        "Rms": np.round(rng.uniform(0.1, 1.0, n_quakes), 2),
+        "Type": np.where(mag >= 4.0, "MW", "ML"),
+        "Magnitude": mag,
+        "Location": "Sentetik",
+        "EventID": np.arange(n_quakes)[::-1] + 1,
+    })
+    eq = eq.iloc[::-1]  # AFAD dosyası yeniden eskiye
+    eq.to_csv(os.path.join(data_dir, "earthquake.csv"), index=False)
+
+    # Kur: günlük log-normal yürüyüş
+    fx_dates = pd.bdate_range(start, end)
+    price = 5.0 * np.exp(np.cumsum(rng.normal(0.0005, 0.01, len(fx_dates))))
+    fx = pd.DataFrame({
+        "Date": fx_dates.strftime("%m/%d/%Y"),
+        "Price": np.round(price, 4),
+        "Open": np.round(price * rng.uniform(0.99, 1.01, len(price)), 4),
+        "High": np.round(price * 1.01, 4),
+        "Low": np.round(price * 0.99, 4),
+        "Vol.": "",
+        "Change %": [f"{c:.2f}%" for c in np.r_[0.0, 100 * np.diff(price) / price[:-1]]],
+    }).iloc[::-1]
+    fx.to_csv(os.path.join(data_dir, "USD_TRY Historical Data.csv"), index=False)
+
+    print(f"[INFO] Sentetik girdiler '{data_dir}': {len(trends):,} Trends satırı "
+          f"({n_prov} il × {len(keywords)} keyword × {n_dates} tarih), "
+          f"{n_quakes:,} deprem, {len(fx):,} kur günü")
+    return keywords
+
+
+# --------------------------------------------------
+# Aşamalar
+# --------------------------------------------------
+
+def _stage_setup(name, data_dir, keywords):
+    """Aşama için (ölçülmeyen) hazırlık; ölçülecek fonksiyonu döndürür."""
+    p = lambda f: os.path.join(data_dir, f)  # noqa: E731
+
+    if name == "build_event_dates":
+        from build_event_dates import build_event_dates
+        return lambda: build_event_dates(p("earthquake.csv"), p("USD_TRY Historical Data.csv"),
+                                         out_file=p("event_dates.parquet"))
+
+    if name == "build_region_stress_index":
+        from build_region_stress_index import build_region_stress_index
+        return lambda: build_region_stress_index(p("google_trends_province_timeseries.csv"),
+                                                 p("region_stress_index_weekly.parquet"),
+                                                 value_cols=keywords)
+
+    from analyze_region_stress import build_event_panel, load_data, run_anova
+    region, events = load_data(p("region_stress_index_weekly.parquet"), p("event_dates.parquet"))
+
+    if name == "build_event_panel":
+        return lambda: build_event_panel(region, events, out_file=p("event_region_stress_panel.parquet"))
+
+    from stress_store import read_table
+    panel = read_table("panel", p("event_region_stress_panel.parquet"))
+
+    if name == "run_anova":
+        return lambda: run_anova(panel, verbose=False)
+
+    if name.startswith("plot_"):
+        import matplotlib
+        matplotlib.use("Agg")
+        import plot_region_stress_analysis as plots
+
+        fn = getattr(plots, name)
+        data = region if name == "plot_region_index" else panel
+        return lambda: fn(data, out_file=io.BytesIO())
+
+    raise ValueError(f"Bilinmeyen aşama: {name}")
+
+
+def _measure_stage(name, data_dir, keywords, repeat, trace_alloc):
+    # Ayrı (spawn) süreçte çalışır; stdout susturulur. Parse cache'i kapalı:
+    # yoksa ilk tekrardan sonrakiler (ve best_s) cache okumasını ölçer
+    sys.stdout = open(os.devnull, "w")
+    os.environ["STRESS_CACHE"] = "0"
+    import stress_store
+    stress_store.USE_CACHE = False
+    fn = _stage_setup(name, data_dir, keywords)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    result = {
+        "stage": name,
+        "best_s": min(times),
+        "mean_s": float(np.mean(times)),
+        "rss_peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "rss_setup_mb": rss_before / 1024,
+    }
+
+    if trace_alloc:
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["alloc_peak_mb"] = peak / 2**20
+
+    return result
+
+
+def run_benchmark(data_dir=DATA_DIR, keywords=VALUE_COLS, repeat=3, trace_alloc=True,
+                  stages=None):
+    """
+    Aşamaları sırayla (her biri temiz bir süreçte) ölçer. Sonraki aşamalar
+    önceki aşamaların data_dir'e yazdığı çıktıları kullanır.
+    """
+    if stages is None:
+        stages = ["build_event_dates", "build_region_stress_index", "build_event_panel",
+                  "run_anova", "plot_region_index"] + PLOTS
+
+    ctx = get_context("spawn")
+    results = []
+    for name in stages:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            res = pool.submit(_measure_stage, name, data_dir, list(keywords),
+                              repeat, trace_alloc).result()
+        results.append(res)
+        alloc = f", alloc {res['alloc_peak_mb']:.1f} MB" if trace_alloc else ""
+        print(f"  [OK] {name:30s} {res['best_s']:8.3f} s  "
+              f"RSS {res['rss_peak_mb']:7.1f} MB{alloc}")
+
+    return results
+
+
+# --------------------------------------------------
+# Kayıt + karşılaştırma
+# --------------------------------------------------
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(results, config, history_file=HISTORY_FILE):
+    record = {
+        "timestamp": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "config": config,
+        "stages": results,
+    }
+    with open(history_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    print(f"[OK] Sonuçlar eklendi: {history_file} (commit {record['commit']})")
+    return record
+
+
+def compare_runs(history_file=HISTORY_FILE):
+    """Son çalıştırmayı aynı config'le yapılmış bir önceki çalıştırmayla karşılaştırır."""
+    with open(history_file, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if not records:
+        print("[WARN] Kayıt yok.")
+        return None
+
+    last = records[-1]
+    prev = next((r for r in reversed(records[:-1]) if r["config"] == last["config"]), None)
+    if prev is None:
+        print("[WARN] Aynı ölçekte önceki bir çalıştırma yok.")
+        return None
+
+    a = pd.DataFrame(prev["stages"]).set_index("stage")
+    b = pd.DataFrame(last["stages"]).set_index("stage")
+    table = pd.DataFrame({
+        "before_s": a["best_s"],
+        "after_s": b["best_s"],
+        "ratio": b["best_s"] / a["best_s"],
+        "rss_ratio": b["rss_peak_mb"] / a["rss_peak_mb"],
+    })
+    print(f"\n--- {prev['commit']} ({prev['timestamp']}) → "
+          f"{last['commit']} ({last['timestamp']}) ---")
+    print(table.round(3))
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline benchmark / profil")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--provinces", type=int, default=81)
+    parser.add_argument("--keywords", type=int, default=5)
+    parser.add_argument("--freq", default="W-MON", help="pandas frekansı: D, W-MON, MS ...")
+    parser.add_argument("--start", default="2018-01-01")
+    parser.add_argument("--end", default="2025-10-31")
+    parser.add_argument("--quakes", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-alloc", action="store_true", help="tracemalloc ölçümünü atla")
+    parser.add_argument("--history", default=HISTORY_FILE)
+    parser.add_argument("--compare", action="store_true",
+                        help="Sadece son iki uyumlu çalıştırmayı karşılaştır")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_runs(args.history)
+        sys.exit(0)
+
+    config = {k: getattr(args, k) for k in
+              ["provinces", "keywords", "freq", "start", "end", "quakes", "seed"]}
+
+    keywords = make_synthetic_inputs(args.data_dir, args.provinces, args.keywords, args.freq,
+                                     args.start, args.end, args.quakes, args.seed)
+    results = run_benchmark(args.data_dir, keywords, args.repeat, not args.no_alloc)
+    save_results(results, config, args.history)
+    compare_runs(args.history)
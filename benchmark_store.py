@@ -0,0 +1,82 @@
+"""
+benchmark_store.py
+
+Amaç:
+- Ara çıktıların CSV (read_csv + to_datetime) ve Parquet (stress_store)
+  ile okunma sürelerini karşılaştırır
+- Tarih + bölge filtreli okumayı (predicate pushdown) ayrıca ölçer
+- Dosya boyutlarını yazdırır
+
+Çalıştırma:
+    python benchmark_store.py
+    python benchmark_store.py --repeat 20
+"""
+
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from stress_store import DATASETS, csv_sibling, read_table, write_table
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _legacy_csv_read(csv_path, date_cols):
+    # Pipeline'ın eski okuma şekli: read_csv + her seferinde tarih parse
+    df = pd.read_csv(csv_path)
+    for col in date_cols:
+        df[col] = pd.to_datetime(df[col])
+    return df
+
+
+def run_benchmark(repeat=10, date_range=("2022-01-01", "2023-12-31"), regions=("Marmara",)):
+    rows = []
+
+    for name, spec in DATASETS.items():
+        parquet_path = spec["path"]
+        csv_path = csv_sibling(parquet_path)
+        if not os.path.exists(csv_path):
+            print(f"  [WARN] {csv_path} yok, atlanıyor.")
+            continue
+
+        # Parquet'i CSV'den üret (CSV kopyasına dokunmadan)
+        if not os.path.exists(parquet_path):
+            write_table(read_table(name, csv_path), name, parquet_path, export_csv=False)
+
+        has_region = "region7" in spec["categories"]
+        filt = {"date_range": date_range, "regions": regions if has_region else None}
+
+        rows.append({
+            "dataset": name,
+            "csv_kb": os.path.getsize(csv_path) / 1024,
+            "parquet_kb": os.path.getsize(parquet_path) / 1024,
+            "csv_ms": 1e3 * _best_of(lambda: _legacy_csv_read(csv_path, spec["dates"]), repeat),
+            "parquet_ms": 1e3 * _best_of(lambda: read_table(name, parquet_path), repeat),
+            "csv_filtered_ms": 1e3 * _best_of(lambda: read_table(name, csv_path, **filt), repeat),
+            "parquet_filtered_ms": 1e3 * _best_of(lambda: read_table(name, parquet_path, **filt), repeat),
+        })
+
+    result = pd.DataFrame(rows)
+    result["speedup"] = result["csv_ms"] / result["parquet_ms"]
+
+    print("\n--- Okuma süreleri (en iyi / ms) ---")
+    print(result.round(2).to_string(index=False))
+
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CSV vs Parquet okuma benchmark'ı")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    run_benchmark(args.repeat)
@@ -4,14 +4,18 @@ build_event_dates.py
 Amaç:
 - earthquake.csv içinden "büyük ve sığ" depremleri seçip event tarihleri üretir
 - USD_TRY Historical Data.csv içinden "kur şoku" günlerini seçip event tarihleri üretir
-- İkisini birleştirip event_dates.csv olarak kaydeder
+  (fx_events.py; çok çiftli / z-score eşikli tespit için oraya bakın)
+- İkisini birleştirip event_dates.parquet (+ event_dates.csv) olarak kaydeder
 
 Çalıştırma:
     python build_event_dates.py
 """
 
 import pandas as pd
-import numpy as np
+
+from fx_events import fx_shock_events
+from stress_metrics import instrument, record
+from stress_store import load_source, write_table
 
 
 # Eşik değerleri istersen buradan değiştirebilirsin
@@ -22,25 +26,46 @@ DEPTH_MAX = 40.0     # Deprem derinliği üst sınır (km)
 FX_RET_THRESHOLD = 0.02  # Kur şoku için log-getiri eşiği (~%2)
 
 
+@instrument("build_event_dates")
 def build_event_dates(
     eq_file="earthquake.csv",
     fx_file="USD_TRY Historical Data.csv",
-    out_file="event_dates.csv"
+    out_file="event_dates.parquet",
+    mag_min=MAG_MIN,
+    depth_min=DEPTH_MIN,
+    depth_max=DEPTH_MAX,
+    fx_ret_threshold=FX_RET_THRESHOLD,
+    decluster=False
 ):
+    """
+    Eşikler varsayılan olarak modül sabitlerinden (MAG_MIN, DEPTH_*,
+    FX_RET_THRESHOLD) gelir. out_file=None ise dosyaya yazmaz.
+
+    decluster=True ise depremler önce Gardner–Knopoff ile ayıklanır
+    (earthquake_events.py); artçı şoklar ayrı event günü üretmez.
+    """
     # --------------------------------------------------
     # 1) Deprem event tarihleri
     # --------------------------------------------------
     print(f"[INFO] Deprem verisi okunuyor: {eq_file}")
-    eq = pd.read_csv(eq_file)
 
-    # AFAD CSV'inde Date kolonu: '31/10/2025 07:18:50' formatında (gün/ay/yıl)
-    eq["date"] = pd.to_datetime(eq["Date"], dayfirst=True, errors="coerce")
-    eq = eq.dropna(subset=["date"])
+    if decluster:
+        from earthquake_events import earthquake_events
+
+        eq_big = earthquake_events(eq_file, mag_min=mag_min, depth_min=depth_min,
+                                   depth_max=depth_max, decluster=True)
+        eq_big["date"] = eq_big["time"]
+    else:
+        # AFAD CSV'inde Date kolonu: '31/10/2025 07:18:50' formatında (gün/ay/yıl);
+        # şema ve format stress_store.SOURCES["earthquake"] içinde
+        eq = load_source("earthquake", eq_file)
+        eq["date"] = eq["Date"]
+        eq = eq.dropna(subset=["date"])
 
-    # Filtre: Magnitüd ≥ MAG_MIN ve derinlik DEPTH_MIN–DEPTH_MAX arası
-    mask_mag = eq["Magnitude"] >= MAG_MIN
-    mask_depth = (eq["Depth"] >= DEPTH_MIN) & (eq["Depth"] <= DEPTH_MAX)
-    eq_big = eq[mask_mag & mask_depth].copy()
+        # Filtre: Magnitüd ≥ mag_min ve derinlik depth_min–depth_max arası
+        mask_mag = eq["Magnitude"] >= mag_min
+        mask_depth = (eq["Depth"] >= depth_min) & (eq["Depth"] <= depth_max)
+        eq_big = eq[mask_mag & mask_depth].copy()
 
     # Sadece tarih (saatten bağımsız)
     eq_big["event_date"] = eq_big["date"].dt.date
@@ -60,30 +85,13 @@ def build_event_dates(
     # 2) Kur şoku event tarihleri
     # --------------------------------------------------
     print(f"[INFO] Kur verisi okunuyor: {fx_file}")
-    fx = pd.read_csv(fx_file)
-
-    # USD_TRY dosyasında Date: '11/23/2025' formatı (ay/gün/yıl)
-    fx["date"] = pd.to_datetime(fx["Date"], dayfirst=False, errors="coerce")
-    fx = fx.dropna(subset=["date"])
-
-    # Tarihe göre sırala (çoğu finans datası tersten gelir)
-    fx = fx.sort_values("date")
 
-    # Fiyatı numeric yap
-    fx["price"] = pd.to_numeric(fx["Price"], errors="coerce")
-    fx = fx.dropna(subset=["price"])
-
-    # Günlük/haftalık log-getiri
-    fx["ret"] = np.log(fx["price"]).diff()
-
-    # Şok tanımı: |ret| > FX_RET_THRESHOLD
-    fx_shock = fx[fx["ret"].abs() > FX_RET_THRESHOLD].copy()
-
-    # Kur şoku event tarihleri
-    fx_shock["event_date"] = fx_shock["date"].dt.date
+    # Tipli okuma + vektörize tespit (fx_events.py): |log-getiri| > fx_ret_threshold
+    fx_shock = fx_shock_events(fx_file, method="abs", threshold=fx_ret_threshold)
 
     fx_dates = (
         fx_shock[["event_date"]]
+        .assign(event_date=fx_shock["event_date"].dt.date)
         .drop_duplicates()
         .sort_values("event_date")
         .reset_index(drop=True)
@@ -97,12 +105,15 @@ def build_event_dates(
     # --------------------------------------------------
     events = pd.concat([eq_dates, fx_dates], ignore_index=True)
     events = events.sort_values("event_date").reset_index(drop=True)
+    record(rows_in=len(eq_big) + len(fx_shock), rows_out=len(events))
 
-    events.to_csv(out_file, index=False)
-
-    print(f"[OK] Toplam {len(events)} event günü '{out_file}' dosyasına kaydedildi.")
+    if out_file is not None:
+        out_file = write_table(events, "events", out_file)
+        print(f"[OK] Toplam {len(events)} event günü '{out_file}' dosyasına kaydedildi.")
     print(events.head())
 
+    return events
+
 
 if __name__ == "__main__":
     build_event_dates()
@@ -3,81 +3,503 @@ build_region_stress_index.py
 
 Amaç:
 - google_trends_province_timeseries.csv dosyasını okur
-- Her il için stresle ilgili kelimeleri uzun forma (long) çevirir
+- Veriyi il × keyword × tarih dizisine (NumPy) çevirir
 - İl + keyword bazında z-score (standart skor) hesaplar
 - 7 bölge (region7) düzeyinde haftalık ortalama z-score'u hesaplar
-- Sonuç: region_stress_index_weekly.csv
+- Keyword listesi ve isimli indeksler (ör. sadece kaygı, sadece somatik,
+  özel ağırlıklar) data/index_spec.json tanımından gelir; indices="all"
+  verilirse hepsi aynı dizi üzerinden tek geçişte, ayrı kolonlar olarak
+  hesaplanır (varsayılan: sadece eşit ağırlıklı stress_index)
+- gaps="interpolate" / "lowrank" verilirse eksik veri aşaması devreye
+  girer (bkz. gap_region_index): eksik hücreler (zero_missing=True ise
+  Trends'in 0 döndürdüğü eşik altı hücreler de) tüm dizi üzerinde tek
+  seferde doldurulur, bölge ortalamasında doldurulan hücreler o
+  bölge-haftanın kapsamı (coverage) kadar ağırlık alır ve bölge-hafta
+  kapsamı ayrı kolon olarak yazılır
+- Sonuç: region_stress_index_weekly.parquet (+ .csv)
+
+Çok büyük girdiler (saatlik veri, çok ülke) için chunksize verilirse
+dosya parça parça iki geçişte okunur: önce il + keyword istatistikleri,
+sonra normalizasyon + bölge ortalaması. Bellek kullanımı satır sayısından
+bağımsız kalır.
+
+Not: Dizi yolu z-score ve ortalamaları eski melt + groupby hesabından farklı
+sırada topladığı için sonuçlar son hanede (~2e-16) ayrılabilir. Repodaki
+region_stress_index_weekly.csv baseline çıktısı olarak tutulur; testler onu
+atol=1e-12 ile karşılaştırır.
 
 Çalıştırma:
     python build_region_stress_index.py
+    python build_region_stress_index.py --indices all
+    python build_region_stress_index.py --gaps interpolate
+    python build_region_stress_index.py --gaps lowrank --zero-missing
 """
 
+import argparse
+
+import numpy as np
 import pandas as pd
-from scipy.stats import zscore
 
+from index_spec import check_columns, index_weights, load_index_spec
+from stress_metrics import count, instrument, record
+from stress_store import read_table, write_table, iter_table_chunks
+
+
+# Stresle ilgili keyword kolonları (collect_trends_provinces.KW_LIST ile aynı tanım)
+VALUE_COLS = load_index_spec()["keywords"]
+
+# Eksik veri aşaması: yöntemler, seri başına en düşük gözlem oranı
+# (altındaki seriler doldurulmaz, indekse girmez) ve low-rank ayarları
+GAP_METHODS = ("interpolate", "lowrank")
+MIN_COVERAGE = 0.2
+LOWRANK_RANK = 3
+LOWRANK_MAX_ITER = 200
+LOWRANK_TOL = 1e-6
 
+
+@instrument("build_region_stress_index")
 def build_region_stress_index(
-    in_file="google_trends_province_timeseries.csv",
-    out_file="region_stress_index_weekly.csv"
+    in_file="google_trends_province_timeseries.parquet",
+    out_file="region_stress_index_weekly.parquet",
+    chunksize=None,
+    value_cols=VALUE_COLS,
+    indices=None,
+    gaps=None,
+    zero_missing=False
 ):
+    if chunksize is not None:
+        if gaps is not None:
+            # Boşluk doldurma tüm tarih eksenini ister; parça parça okumada yok
+            raise ValueError("gaps, chunksize ile birlikte kullanılamaz")
+        return build_region_stress_index_chunked(in_file, out_file, chunksize, value_cols, indices)
+
     # Veriyi oku
     print(f"[INFO] İl bazlı Trends verisi okunuyor: {in_file}")
-    df = pd.read_csv(in_file)
+    df = read_table("trends", in_file)
+
+    region_weekly = region_stress_index(df, value_cols, indices, gaps, zero_missing)
+    record(rows_in=len(df), rows_out=len(region_weekly))
 
-    # Tarih formatı
-    df["date"] = pd.to_datetime(df["date"])
+    # Kaydet
+    if out_file is not None:
+        out_file = write_table(region_weekly, "region_index", out_file)
+        print(f"[OK] Bölgesel stres indeksi kaydedildi: {out_file}")
+    print(region_weekly.head())
 
-    # Stresle ilgili keyword kolonları
-    # Bu isimler collect_trends_provinces.py içindeki KW_LIST ile birebir aynı olmalı
-    value_cols = ["anksiyete", "uykusuzluk", "stres", "panik atak", "mide yanması"]
+    return region_weekly
 
-    # long formata çevir (her satır: date, province, region7, keyword, score)
-    long_df = df.melt(
-        id_vars=["date", "province_code", "province", "region7"],
-        value_vars=value_cols,
-        var_name="keyword",
-        value_name="score"
-    )
 
-    # Eksik skorları at
-    long_df = long_df.dropna(subset=["score"])
+def region_stress_index(df, value_cols=VALUE_COLS, indices=None, gaps=None, zero_missing=False):
+    """
+    Okunmuş il bazlı Trends tablosundan (date, region7, stress_index, ...)
+    tablosunu hesaplar; dosya okuyup yazmaz. indices için bkz.
+    index_weight_matrix, gaps için gap_region_index.
+    """
+    check_columns(df, value_cols)
+    names, weights = index_weight_matrix(value_cols, indices)
+    arr = province_array(df, value_cols)
+
+    if gaps is not None:
+        print(f"[INFO] Eksik veri aşaması ({gaps}) + kapsam ağırlıklı bölge indeksleri: "
+              f"{', '.join(names)}")
+        return gap_region_index(arr, weights, names, method=gaps, zero_missing=zero_missing)
 
     print("[INFO] Z-score hesaplanıyor (province + keyword bazında)...")
+    z = zscore_array(arr["values"])
+
+    print(f"[INFO] Bölge bazında haftalık indeksler hesaplanıyor: {', '.join(names)}")
+    return region_index(arr, z, weights, names)
+
+
+def index_weight_matrix(value_cols, indices=None):
+    """
+    (isimler, (n_index, n_keyword) ağırlık matrisi), kolonlar value_cols sırasında.
+
+    - indices=None:  sadece eşit ağırlıklı "stress_index" (her keyword 1)
+    - "all" / liste: index_spec tanımındaki isimli indeksler
+    """
+    if indices is None:
+        return ["stress_index"], np.ones((1, len(value_cols)))
+
+    spec = load_index_spec()
+    names, weights = index_weights(spec, indices)
+    by_kw = [dict(zip(spec["keywords"], w)) for w in weights]
+
+    for name, w in zip(names, by_kw):
+        missing = [k for k, x in w.items() if x and k not in value_cols]
+        if missing:
+            raise ValueError(f"{name}: value_cols içinde olmayan keyword'ler {missing}")
+
+    return names, np.array([[w.get(k, 0.0) for k in value_cols] for w in by_kw])
+
+
+# --------------------------------------------------
+# İl × keyword × tarih dizisi
+# --------------------------------------------------
+
+def province_array(df, value_cols):
+    """
+    Geniş (wide) il verisini (n_province, n_keyword, n_date) float dizisine
+    yerleştirir. Eksik gözlemler NaN kalır.
+
+    Dönen sözlük: provinces, province_region, dates, keywords, values
+    """
+    p_idx, provinces = pd.factorize(df["province"], sort=True)
+    t_idx, dates = pd.factorize(df["date"], sort=True)
+
+    # Her ilin bölgesi (ilk görüldüğü satırdan)
+    first = pd.Series(np.arange(len(df))).groupby(p_idx).first().to_numpy()
+    province_region = df["region7"].to_numpy()[first]
+
+    values = np.full((len(provinces), len(value_cols), len(dates)), np.nan)
+    values[p_idx, :, t_idx] = df[value_cols].to_numpy(dtype=np.float64)
+
+    return {
+        "provinces": np.asarray(provinces),
+        "province_region": province_region,
+        "dates": pd.DatetimeIndex(dates),
+        "keywords": list(value_cols),
+        "values": values,
+    }
+
+
+def zscore_array(values):
+    """
+    Son eksen (tarih) boyunca nan-omit z-score (ddof=0), scipy.stats.zscore
+    (nan_policy="omit") ile aynı tanım.
+
+    - Gözlenmeyen hücreler NaN kalır
+    - Sabit ya da tek gözlemli seriler (std = 0) 0'a çekilir
+    """
+    observed = ~np.isnan(values)
+    count = observed.sum(axis=-1, keepdims=True)
+    filled = np.where(observed, values, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = filled.sum(axis=-1, keepdims=True) / count
+        centered = np.where(observed, values - mean, 0.0)
+        std = np.sqrt((centered ** 2).sum(axis=-1, keepdims=True) / count)
+        z = centered / std
+
+    z[~np.isfinite(z)] = 0.0
+    z[~observed] = np.nan
+    return z
+
+
+def region_index(arr, z, weights=None, names=("stress_index",), cell_weights=None):
+    """
+    Bölge + tarih düzeyinde ağırlıklı ortalama z-score = regional stress index.
+    Ortalama, o bölge-tarihte gözlenen tüm (il, keyword) hücreleri üzerinden;
+    weights (n_index, n_keyword) verilirse her indeks için ayrı kolon.
+    cell_weights (n_province, n_keyword, n_date) verilirse her hücre ayrıca
+    bu ağırlıkla (ör. doldurulmuş hücreler için kapsam) çarpılır.
+    """
+    r_idx, regions = pd.factorize(arr["province_region"], sort=True)
+    if weights is None:
+        weights = np.ones((1, z.shape[1]))
+    if cell_weights is None:
+        cell_weights = np.ones(z.shape)
+
+    # (n_region, n_province) üyelik matrisi ile il toplamlarını bölgeye topla
+    member = np.zeros((len(regions), len(r_idx)))
+    member[r_idx, np.arange(len(r_idx))] = 1.0
+
+    observed = ~np.isnan(z)
+    filled = np.where(observed, z, 0.0)
+
+    sums, counts = [], []
+    for w in weights:
+        w = w[None, :, None] * cell_weights
+        sums.append(member @ (filled * w).sum(axis=1))
+        counts.append(member @ (observed * w).sum(axis=1))
+
+    # En az bir indeksin gözlemi olan bölge-tarihler
+    ri, ti = np.nonzero(np.any(counts, axis=0))
+    out = pd.DataFrame({
+        "date": arr["dates"][ti],
+        "region7": np.asarray(regions)[ri],
+    })
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for name, z_sum, n_obs in zip(names, sums, counts):
+            out[name] = z_sum[ri, ti] / n_obs[ri, ti]
+    return out
+
+
+# --------------------------------------------------
+# Eksik veri: maske, kapsam, toplu boşluk doldurma
+# --------------------------------------------------
+
+def gap_mask(values, zero_missing=False):
+    """
+    Gerçek gözlem maskesi (n_province, n_keyword, n_date). Trends küçük
+    illerde arama hacmi eşiğin altındaysa 0 döndürür; zero_missing=True
+    iken bu 0'lar da eksik sayılır. Committed veride keyword başına
+    hücrelerin %40-78'i 0 olduğu (çoğu gerçek "düşük hacim") için varsayılan
+    kapalıdır; sadece NaN (çekilemeyen il / tarih) eksiktir.
+    """
+    mask = ~np.isnan(values)
+    if zero_missing:
+        mask &= values != 0
+    return mask
+
+
+def interpolate_gaps(z, mask):
+    """
+    Son eksen boyunca doğrusal interpolasyon; tüm seriler tek seferde
+    (seri başına döngü yok). Her hücre için önceki / sonraki gözlemin
+    indeksi birikimli max / min ile bulunur; baştaki ve sondaki boşluklar
+    en yakın gözlemle doldurulur. Hiç gözlemi olmayan seriler NaN kalır.
+    """
+    shape = z.shape
+    n_t = shape[-1]
+    flat = z.reshape(-1, n_t)
+    m = mask.reshape(-1, n_t)
+    t = np.arange(n_t)
+
+    prev = np.maximum.accumulate(np.where(m, t, -1), axis=1)
+    nxt = np.minimum.accumulate(np.where(m, t, n_t)[:, ::-1], axis=1)[:, ::-1]
+    lo = np.where(prev >= 0, prev, nxt).clip(0, n_t - 1)
+    hi = np.where(nxt < n_t, nxt, prev).clip(0, n_t - 1)
+
+    rows = np.arange(len(flat))[:, None]
+    z_lo, z_hi = flat[rows, lo], flat[rows, hi]
+    span = hi - lo
+    frac = np.divide(t - lo, span, out=np.zeros(span.shape), where=span > 0)
 
-    # Her il + keyword için z-score (standartlaştırma)
-    # Gruplar tek elemanlı ise zscore NaN verebilir, onları 0'a çekeceğiz.
-    def zscore_safe(x):
-        z = zscore(x, nan_policy="omit")
-        # Tek gözlemde zscore 'nan' olabilir, 0 ile doldur
-        if hasattr(z, "__len__"):
-            return z
-        else:
-            return 0.0
+    out = z_lo + frac * (z_hi - z_lo)
+    out[~m.any(axis=1)] = np.nan
+    return out.reshape(shape)
 
-    long_df["score_z"] = long_df.groupby(
-        ["province", "keyword"]
-    )["score"].transform(zscore_safe)
 
-    # Kalan NaN'leri 0 yap
-    long_df["score_z"] = long_df["score_z"].fillna(0)
+def lowrank_gaps(z, mask, rank=LOWRANK_RANK, max_iter=LOWRANK_MAX_ITER, tol=LOWRANK_TOL):
+    """
+    (seri × tarih) z matrisinin eksik hücrelerini rank-r SVD yaklaşımıyla
+    doldurur (hard-impute): eksikler 0 (seri ortalaması) ile başlar, her
+    adımda gözlenen hücreler sabit tutulup eksikler rank-r yaklaşımla
+    güncellenir. Seriler arası ortak hareketi (aynı bölgenin illeri, aynı
+    ilin keyword'leri) kullanır. Hiç gözlemi olmayan seriler NaN kalır.
+    """
+    shape = z.shape
+    flat = z.reshape(-1, shape[-1])
+    m = mask.reshape(-1, shape[-1])
+    rows = m.any(axis=1)
+
+    x = flat[rows]
+    mr = m[rows]
+    filled = np.where(mr, x, 0.0)
+    rank = min(rank, *filled.shape)
+
+    for it in range(max_iter):
+        u, s, vt = np.linalg.svd(filled, full_matrices=False)
+        approx = (u[:, :rank] * s[:rank]) @ vt[:rank]
+        new = np.where(mr, x, approx)
+        change = np.linalg.norm(new - filled) / max(np.linalg.norm(filled), 1e-12)
+        filled = new
+        if change < tol:
+            break
+    count("lowrank_iter", it + 1)
+
+    out = np.full(flat.shape, np.nan)
+    out[rows] = filled
+    return out.reshape(shape)
+
+
+GAP_FILLERS = {
+    "interpolate": interpolate_gaps,
+    "lowrank": lowrank_gaps,
+}
+
+
+def expected_provinces(regions):
+    """
+    Bölge başına beklenen il sayısı: index_spec il listesi ile veride
+    görülen illerin büyüğü. Hiç veri dönmeyen iller (collect'te boş kalan)
+    böylece kapsamı düşürür.
+    """
+    spec = load_index_spec()["provinces"]["region7"].value_counts()
+    return spec.reindex(regions).fillna(0).to_numpy()
+
+
+def gap_region_index(arr, weights, names, method="interpolate", zero_missing=False,
+                     min_coverage=MIN_COVERAGE):
+    """
+    Eksik veriye duyarlı bölgesel indeks; tüm adımlar (il × keyword × tarih)
+    dizisi üzerinde, grup başına Python çağrısı olmadan:
+
+    1. Maske: NaN ve (zero_missing) 0 hücreleri eksik
+    2. Seri kapsamı: (il, keyword) başına gözlem oranı; min_coverage
+       altındaki seriler tamamen düşülür
+    3. Z-score sadece gözlenen hücrelerden, boşluklar GAP_FILLERS[method]
+       ile toplu doldurulur
+    4. coverage: bölge-tarihte gözlenen (il, keyword) hücrelerinin,
+       bölgenin beklenen il sayısı × keyword sayısına oranı
+    5. Bölge ortalaması hücre bazında ağırlıklı: gözlenen hücre 1,
+       doldurulan hücre o bölge-tarihin kapsamı kadar sayılır; kapsamı düşük
+       haftada ortalama gözlenen hücrelere yaslanır
+    """
+    if method not in GAP_FILLERS:
+        raise ValueError(f"Bilinmeyen gaps yöntemi: {method} (seçenekler: {', '.join(GAP_METHODS)})")
+
+    values = arr["values"]
+    mask = gap_mask(values, zero_missing)
+    series_cov = mask.mean(axis=-1)
+    keep = series_cov >= min_coverage
+    mask &= keep[:, :, None]
+
+    dropped = int((~keep).sum())
+    count("gap_cells", int((~mask).sum()))
+    count("dropped_series", dropped)
+    if dropped:
+        print(f"[WARN] {dropped} / {keep.size} (il, keyword) serisi kapsam < {min_coverage} "
+              f"olduğu için indekse girmiyor.")
+
+    z = zscore_array(np.where(mask, values, np.nan))
+    z = GAP_FILLERS[method](z, mask)
+
+    # Bölge-tarih kapsamı (bölge × tarih)
+    r_idx, regions = pd.factorize(arr["province_region"], sort=True)
+    member = np.zeros((len(regions), len(r_idx)))
+    member[r_idx, np.arange(len(r_idx))] = 1.0
+    n_cells = np.maximum(expected_provinces(regions), member.sum(axis=1)) * values.shape[1]
+    coverage = (member @ mask.sum(axis=1)) / n_cells[:, None]
+
+    # Hücre ağırlığı: gözlenen 1, doldurulan = ilinin bölge-tarih kapsamı,
+    # düşülen seri 0
+    cell_weights = np.where(mask, 1.0, coverage[r_idx][:, None, :]) * keep[:, :, None]
+    out = region_index(arr, z, weights, names, cell_weights=cell_weights)
+
+    ri = pd.Index(regions).get_indexer(out["region7"])
+    ti = arr["dates"].get_indexer(out["date"])
+    out["coverage"] = coverage[ri, ti]
+    record(mean_coverage=float(coverage.mean()))
+    return out
+
+
+# --------------------------------------------------
+# Parça parça (chunked) iki geçişli hesap
+# --------------------------------------------------
+
+def build_region_stress_index_chunked(
+    in_file="google_trends_province_timeseries.parquet",
+    out_file="region_stress_index_weekly.parquet",
+    chunksize=100_000,
+    value_cols=VALUE_COLS,
+    indices=None
+):
+    """
+    1. geçiş: il + keyword başına sayı / ortalama / M2 (Chan birleştirmesi)
+    2. geçiş: z-score + bölge-tarih toplamları
+    Bellekte sadece (il × keyword) istatistikleri ve (bölge × tarih)
+    toplamları tutulur.
+    """
+    print(f"[INFO] İl bazlı Trends verisi parça parça okunuyor: {in_file} (chunksize={chunksize})")
+    names, weights = index_weight_matrix(value_cols, indices)
+
+    stats = None
+    rows_in = 0
+    for chunk in iter_table_chunks("trends", in_file, chunksize):
+        rows_in += len(chunk)
+        part = province_stats(chunk, value_cols)
+        stats = part if stats is None else _combine_stats(stats, part)
+
+    print("[INFO] Z-score hesaplanıyor (province + keyword bazında)...")
+
+    z_sum = None
+    n_obs = None
+    for chunk in iter_table_chunks("trends", in_file, chunksize):
+        part_sum, part_cnt = region_sums(chunk, stats, value_cols, names, weights)
+        z_sum = part_sum if z_sum is None else z_sum.add(part_sum, fill_value=0)
+        n_obs = part_cnt if n_obs is None else n_obs.add(part_cnt, fill_value=0)
 
     print("[INFO] Bölge bazında haftalık stres indeksi hesaplanıyor...")
 
-    # Bölge + tarih düzeyinde ortalama z-score = regional stress index
-    region_weekly = (
-        long_df
-        .groupby(["date", "region7"], as_index=False)["score_z"]
-        .mean()
-        .rename(columns={"score_z": "stress_index"})
-        .sort_values(["region7", "date"])
-    )
+    region_weekly = finish_region_sums(z_sum, n_obs)
 
-    # Kaydet
-    region_weekly.to_csv(out_file, index=False)
+    record(rows_in=rows_in, rows_out=len(region_weekly))
+
+    out_file = write_table(region_weekly, "region_index", out_file)
 
     print(f"[OK] Bölgesel stres indeksi kaydedildi: {out_file}")
     print(region_weekly.head())
 
+    return region_weekly
+
+
+def province_stats(chunk, value_cols):
+    """Parçadaki il + keyword başına (n, mean, M2); _combine_stats ile birleşir."""
+    g = chunk.groupby("province", observed=True)[value_cols]
+    n = g.count().astype(np.float64)
+    return {"n": n, "mean": g.mean(), "m2": g.var(ddof=0) * n}
+
+
+def region_sums(chunk, stats, value_cols, names, weights):
+    """
+    Parçanın (tarih, bölge) başına indeks toplamları ve ağırlıklı gözlem
+    sayıları; z-score tüm geçmişin istatistiklerinden (stats) gelir.
+    """
+    values = chunk[value_cols].to_numpy(dtype=np.float64)
+    observed = ~np.isnan(values)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.sqrt(stats["m2"] / stats["n"])
+        mean = stats["mean"].loc[chunk["province"]].to_numpy()
+        sd = std.loc[chunk["province"]].to_numpy()
+        z = (values - mean) / sd
+    z[~np.isfinite(z)] = 0.0
+    z[~observed] = 0.0
+
+    keys = [chunk["date"], chunk["region7"]]
+    sums = {name: (z * w).sum(axis=1) for name, w in zip(names, weights)}
+    cnts = {name: (observed * w).sum(axis=1) for name, w in zip(names, weights)}
+    part_sum = pd.DataFrame(sums, index=chunk.index).groupby(keys, observed=True).sum()
+    part_cnt = pd.DataFrame(cnts, index=chunk.index).groupby(keys, observed=True).sum()
+    return part_sum, part_cnt
+
+
+def finish_region_sums(z_sum, n_obs):
+    """Toplamlardan (date, region7, indeksler) tablosu."""
+    keep = (n_obs > 0).any(axis=1)
+    return (
+        (z_sum[keep] / n_obs[keep])
+        .rename_axis(["date", "region7"])
+        .reset_index()
+        .sort_values(["region7", "date"])
+        .reset_index(drop=True)
+    )
+
+
+def _combine_stats(a, b):
+    # İki parçanın (n, mean, M2) istatistiklerini birleştirir (Chan et al.)
+    idx = a["n"].index.union(b["n"].index)
+    na = a["n"].reindex(idx).fillna(0)
+    nb = b["n"].reindex(idx).fillna(0)
+    ma = a["mean"].reindex(idx).fillna(0)
+    mb = b["mean"].reindex(idx).fillna(0)
+    m2a = a["m2"].reindex(idx).fillna(0)
+    m2b = b["m2"].reindex(idx).fillna(0)
+
+    n = na + nb
+    delta = mb - ma
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (ma + delta * nb / n).where(n > 0)
+        m2 = (m2a + m2b + delta ** 2 * na * nb / n).where(n > 0)
+
+    return {"n": n, "mean": mean, "m2": m2}
+
 
 if __name__ == "__main__":
-    build_region_stress_index()
+    parser = argparse.ArgumentParser(description="Bölgesel stres indeksi")
+    parser.add_argument("--indices", nargs="+", default=None,
+                        help='index_spec içindeki isimli indeksler ya da "all"')
+    parser.add_argument("--chunksize", type=int, default=None)
+    parser.add_argument("--gaps", choices=GAP_METHODS, default=None,
+                        help="Eksik veri aşaması: boşlukları doldur + kapsam ağırlıklı ortalama")
+    parser.add_argument("--zero-missing", action="store_true",
+                        help="--gaps ile: Trends'in 0 döndürdüğü hücreleri de eksik say")
+    args = parser.parse_args()
+
+    indices = args.indices
+    if indices == ["all"]:
+        indices = "all"
+    build_region_stress_index(chunksize=args.chunksize, indices=indices, gaps=args.gaps,
+                              zero_missing=args.zero_missing)
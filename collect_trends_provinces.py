@@ -5,183 +5,435 @@ Bu script şunları yapar:
 
 - Türkiye'deki 81 il için ISO kodlarını ve 7 coğrafi bölgeyi tanımlar
 - Her il için Google Trends'ten (interest_over_time) 2018-2025 haftalık zaman serisi çeker
-- Sonuçları tek bir CSV'de toplar: google_trends_province_timeseries.csv
+- İstekleri sınırlı bir iş parçacığı havuzu + token-bucket hız sınırlayıcı ile atar,
+  hata alırsa üstel bekleme (backoff) ile tekrar dener
+- Her ilin cevabını diske (cache) yazar; yarıda kalan bir çalıştırma tekrar
+  başlatıldığında sadece eksik iller çekilir
+- Sonuçları tek bir tabloda toplar: google_trends_province_timeseries.parquet (+ .csv)
 
 Çalıştırma:
     python collect_trends_provinces.py
 """
 
-from pytrends.request import TrendReq
-import pandas as pd
+import hashlib
+import json
+import os
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from index_spec import load_index_spec
+from stress_metrics import count, instrument, observe, record
+from stress_store import read_table, write_table
+
+# --------------------------------------------------
+# 81 il + ISO kodu + 7 bölge ve keyword listesi
+# data/index_spec.json tanımından gelir (bkz. index_spec.py)
+# --------------------------------------------------
+SPEC = load_index_spec()
+
+PROVINCES = SPEC["provinces"].to_dict("records")
+KW_LIST = SPEC["keywords"]
+TIMEFRAME = SPEC["timeframe"]
+
+
+CACHE_DIR = "trends_cache"
+
 
 # --------------------------------------------------
-# 81 il + ISO kodu + 7 bölge (Marmara, Ege, Akdeniz,
-# İç Anadolu, Karadeniz, Doğu Anadolu, Güneydoğu Anadolu)
+# Fetch backend'leri
 # --------------------------------------------------
-PROVINCES = [
-    # Akdeniz
-    {"code": "TR-01", "province": "Adana",        "region7": "Akdeniz"},
-    {"code": "TR-07", "province": "Antalya",      "region7": "Akdeniz"},
-    {"code": "TR-15", "province": "Burdur",       "region7": "Akdeniz"},
-    {"code": "TR-31", "province": "Hatay",        "region7": "Akdeniz"},
-    {"code": "TR-32", "province": "Isparta",      "region7": "Akdeniz"},
-    {"code": "TR-33", "province": "Mersin",       "region7": "Akdeniz"},
-    {"code": "TR-46", "province": "Kahramanmaraş","region7": "Akdeniz"},
-    {"code": "TR-80", "province": "Osmaniye",     "region7": "Akdeniz"},
-
-    # Ege
-    {"code": "TR-03", "province": "Afyonkarahisar","region7": "Ege"},
-    {"code": "TR-09", "province": "Aydın",         "region7": "Ege"},
-    {"code": "TR-20", "province": "Denizli",       "region7": "Ege"},
-    {"code": "TR-35", "province": "İzmir",         "region7": "Ege"},
-    {"code": "TR-43", "province": "Kütahya",       "region7": "Ege"},
-    {"code": "TR-45", "province": "Manisa",        "region7": "Ege"},
-    {"code": "TR-48", "province": "Muğla",         "region7": "Ege"},
-    {"code": "TR-64", "province": "Uşak",          "region7": "Ege"},
-
-    # Marmara
-    {"code": "TR-10", "province": "Balıkesir",     "region7": "Marmara"},
-    {"code": "TR-11", "province": "Bilecik",       "region7": "Marmara"},
-    {"code": "TR-16", "province": "Bursa",         "region7": "Marmara"},
-    {"code": "TR-17", "province": "Çanakkale",     "region7": "Marmara"},
-    {"code": "TR-22", "province": "Edirne",        "region7": "Marmara"},
-    {"code": "TR-34", "province": "İstanbul",      "region7": "Marmara"},
-    {"code": "TR-39", "province": "Kırklareli",    "region7": "Marmara"},
-    {"code": "TR-41", "province": "Kocaeli",       "region7": "Marmara"},
-    {"code": "TR-54", "province": "Sakarya",       "region7": "Marmara"},
-    {"code": "TR-59", "province": "Tekirdağ",      "region7": "Marmara"},
-    {"code": "TR-77", "province": "Yalova",        "region7": "Marmara"},
-
-    # İç Anadolu
-    {"code": "TR-06", "province": "Ankara",        "region7": "İç Anadolu"},
-    {"code": "TR-18", "province": "Çankırı",       "region7": "İç Anadolu"},
-    {"code": "TR-26", "province": "Eskişehir",     "region7": "İç Anadolu"},
-    {"code": "TR-38", "province": "Kayseri",       "region7": "İç Anadolu"},
-    {"code": "TR-40", "province": "Kırşehir",      "region7": "İç Anadolu"},
-    {"code": "TR-42", "province": "Konya",         "region7": "İç Anadolu"},
-    {"code": "TR-50", "province": "Nevşehir",      "region7": "İç Anadolu"},
-    {"code": "TR-51", "province": "Niğde",         "region7": "İç Anadolu"},
-    {"code": "TR-58", "province": "Sivas",         "region7": "İç Anadolu"},
-    {"code": "TR-66", "province": "Yozgat",        "region7": "İç Anadolu"},
-    {"code": "TR-68", "province": "Aksaray",       "region7": "İç Anadolu"},
-    {"code": "TR-70", "province": "Karaman",       "region7": "İç Anadolu"},
-    {"code": "TR-71", "province": "Kırıkkale",     "region7": "İç Anadolu"},
-
-    # Karadeniz
-    {"code": "TR-05", "province": "Amasya",        "region7": "Karadeniz"},
-    {"code": "TR-14", "province": "Bolu",          "region7": "Karadeniz"},
-    {"code": "TR-19", "province": "Çorum",         "region7": "Karadeniz"},
-    {"code": "TR-28", "province": "Giresun",       "region7": "Karadeniz"},
-    {"code": "TR-29", "province": "Gümüşhane",     "region7": "Karadeniz"},
-    {"code": "TR-37", "province": "Kastamonu",     "region7": "Karadeniz"},
-    {"code": "TR-52", "province": "Ordu",          "region7": "Karadeniz"},
-    {"code": "TR-53", "province": "Rize",          "region7": "Karadeniz"},
-    {"code": "TR-55", "province": "Samsun",        "region7": "Karadeniz"},
-    {"code": "TR-57", "province": "Sinop",         "region7": "Karadeniz"},
-    {"code": "TR-60", "province": "Tokat",         "region7": "Karadeniz"},
-    {"code": "TR-61", "province": "Trabzon",       "region7": "Karadeniz"},
-    {"code": "TR-67", "province": "Zonguldak",     "region7": "Karadeniz"},
-    {"code": "TR-74", "province": "Bartın",        "region7": "Karadeniz"},
-    {"code": "TR-78", "province": "Karabük",       "region7": "Karadeniz"},
-    {"code": "TR-81", "province": "Düzce",         "region7": "Karadeniz"},
-    {"code": "TR-08", "province": "Artvin",        "region7": "Karadeniz"},
-    {"code": "TR-10", "province": "Balıkesir",     "region7": "Marmara"},  # Zaten yukarıda
-
-    # Doğu Anadolu
-    {"code": "TR-04", "province": "Ağrı",          "region7": "Doğu Anadolu"},
-    {"code": "TR-12", "province": "Bingöl",        "region7": "Doğu Anadolu"},
-    {"code": "TR-13", "province": "Bitlis",        "region7": "Doğu Anadolu"},
-    {"code": "TR-23", "province": "Elazığ",        "region7": "Doğu Anadolu"},
-    {"code": "TR-24", "province": "Erzincan",      "region7": "Doğu Anadolu"},
-    {"code": "TR-25", "province": "Erzurum",       "region7": "Doğu Anadolu"},
-    {"code": "TR-30", "province": "Hakkâri",       "region7": "Doğu Anadolu"},
-    {"code": "TR-36", "province": "Kars",          "region7": "Doğu Anadolu"},
-    {"code": "TR-44", "province": "Malatya",       "region7": "Doğu Anadolu"},
-    {"code": "TR-49", "province": "Muş",           "region7": "Doğu Anadolu"},
-    {"code": "TR-62", "province": "Tunceli",       "region7": "Doğu Anadolu"},
-    {"code": "TR-65", "province": "Van",           "region7": "Doğu Anadolu"},
-    {"code": "TR-75", "province": "Ardahan",       "region7": "Doğu Anadolu"},
-    {"code": "TR-76", "province": "Iğdır",         "region7": "Doğu Anadolu"},
-    {"code": "TR-79", "province": "Kilis",         "region7": "Güneydoğu Anadolu"},  # sınır ama GDA
-
-    # Güneydoğu Anadolu
-    {"code": "TR-02", "province": "Adıyaman",      "region7": "Güneydoğu Anadolu"},
-    {"code": "TR-21", "province": "Diyarbakır",    "region7": "Güneydoğu Anadolu"},
-    {"code": "TR-27", "province": "Gaziantep",     "region7": "Güneydoğu Anadolu"},
-    {"code": "TR-47", "province": "Mardin",        "region7": "Güneydoğu Anadolu"},
-    {"code": "TR-56", "province": "Siirt",         "region7": "Güneydoğu Anadolu"},
-    {"code": "TR-63", "province": "Şanlıurfa",     "region7": "Güneydoğu Anadolu"},
-    {"code": "TR-72", "province": "Batman",        "region7": "Güneydoğu Anadolu"},
-    {"code": "TR-73", "province": "Şırnak",        "region7": "Güneydoğu Anadolu"},
-]
-
-# Bazı iller yukarıda iki kez görünebilir (ör: Balıkesir), bunu merge ederken uniq alacağız.
-
-
-KW_LIST = ["anksiyete", "uykusuzluk", "stres", "panik atak", "mide yanması"]
-TIMEFRAME = "2018-01-01 2025-11-30"
-
-
-def collect_trends_provinces(out_file="google_trends_province_timeseries.csv"):
+# Backend: fetch(geo, kw_list, timeframe) -> DataFrame (date + keyword kolonları)
+# Boş DataFrame "veri yok" demektir; hata durumunda exception fırlatılır.
+
+def pytrends_fetcher(hl="tr-TR", tz=180):
     """
-    Her il (ISO code = TR-xx) için Google Trends zaman serisi çeker
-    ve tek bir CSV'de toplar.
+    pytrends tabanlı backend. TrendReq thread-safe olmadığı için her
+    iş parçacığı kendi oturumunu açar.
     """
-    print("[INFO] Google Trends oturumu açılıyor...")
-    pytrends = TrendReq(hl="tr-TR", tz=180)
+    from pytrends.request import TrendReq
 
-    all_dfs = []
+    local = threading.local()
+
+    def fetch(geo, kw_list, timeframe):
+        if not hasattr(local, "client"):
+            local.client = TrendReq(hl=hl, tz=tz)
+
+        local.client.build_payload(
+            kw_list=list(kw_list),
+            geo=geo,          # kritik nokta: TR-xx formatı
+            timeframe=timeframe
+        )
+        iot = local.client.interest_over_time().reset_index()
 
-    # Province listesi DataFrame'e dönsün (tekrarları da temizleriz)
-    provinces_df = pd.DataFrame(PROVINCES).drop_duplicates(subset=["code"])
+        if "isPartial" in iot.columns:
+            iot = iot.drop(columns=["isPartial"])
+        return iot
 
-    for _, row in provinces_df.iterrows():
-        code = row["code"]
-        province = row["province"]
-        region7 = row["region7"]
+    return fetch
 
-        print(f"[INFO] Çekiliyor: {province} ({code}) - Bölge: {region7}")
 
+def csv_stub_fetcher(source_file="google_trends_province_timeseries.csv"):
+    """
+    Çevrimdışı test için yerel backend: daha önce kaydedilmiş il bazlı
+    tablodan (CSV ya da Parquet) ilgili il + keyword + zaman aralığını döndürür.
+    """
+    src = read_table("trends", source_file)
+    by_code = {code: sub for code, sub in src.groupby("province_code", observed=True)}
+
+    def fetch(geo, kw_list, timeframe):
+        start, end = (pd.Timestamp(x) for x in timeframe.split())
+        sub = by_code.get(geo)
+        if sub is None:
+            return pd.DataFrame(columns=["date", *kw_list])
+        sub = sub[(sub["date"] >= start) & (sub["date"] <= end)]
+        return sub[["date", *kw_list]].reset_index(drop=True)
+
+    return fetch
+
+
+# --------------------------------------------------
+# Hız sınırlama + tekrar deneme
+# --------------------------------------------------
+
+class TokenBucket:
+    """
+    Basit token-bucket: saniyede `rate` istek, en fazla `capacity` birikme.
+    acquire() token yoksa bir sonraki token'a kadar bekler.
+    """
+
+    def __init__(self, rate=1.0, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def fetch_with_retry(fetch, bucket, geo, kw_list, timeframe,
+                     max_retries=4, backoff=2.0):
+    """
+    fetch'i token-bucket'tan izin alarak çağırır; hata olursa
+    backoff * 2^deneme (+ jitter) saniye bekleyip tekrar dener.
+    """
+    for attempt in range(max_retries + 1):
+        bucket.acquire()
+        t0 = time.perf_counter()
         try:
-            pytrends.build_payload(
-                kw_list=KW_LIST,
-                geo=code,          # kritik nokta: TR-xx formatı
-                timeframe=TIMEFRAME
-            )
+            return fetch(geo, kw_list, timeframe)
+        except Exception as e:
+            count("http_errors")
+            if attempt == max_retries:
+                raise
+            wait = backoff * (2 ** attempt) * (1 + random.random() * 0.25)
+            print(f"  [WARN] {geo} denemesi {attempt + 1} başarısız ({e}), "
+                  f"{wait:.1f} s sonra tekrar denenecek.")
+            time.sleep(wait)
+        finally:
+            observe("http", time.perf_counter() - t0)
 
-            iot = pytrends.interest_over_time().reset_index()
+
+# --------------------------------------------------
+# Disk cache (il başına checkpoint)
+# --------------------------------------------------
+
+def cache_path(cache_dir, code, kw_list, timeframe):
+    """(il, keyword seti, zaman aralığı) için cache dosya yolu."""
+    key = json.dumps([code, list(kw_list), timeframe], ensure_ascii=False)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{code}_{digest}.csv")
+
+
+def read_cache(path):
+    if not os.path.exists(path):
+        return None
+    df = pd.read_csv(path)
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def write_cache(df, path):
+    # Yarım dosya kalmaması için önce geçici dosyaya yaz, sonra taşı
+    tmp = f"{path}.tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def fetch_provinces(provinces_df, kw_list, timeframe,
+                    fetcher=None,
+                    cache_dir=CACHE_DIR,
+                    max_workers=4,
+                    rate_per_sec=1.0,
+                    max_retries=4,
+                    backoff=2.0):
+    """
+    provinces_df içindeki iller için (kw_list, timeframe) isteğini
+    havuzda çalıştırır. Cache'te olanlar diskten okunur.
+    Dönüş: {province_code: DataFrame}; boş dönen / hata alan iller yer almaz.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+
+    results = {}
+    todo = []
+    for row in provinces_df.itertuples(index=False):
+        path = cache_path(cache_dir, row.code, kw_list, timeframe)
+        cached = read_cache(path)
+        if cached is not None:
+            results[row.code] = cached
+        else:
+            todo.append((row, path))
+
+    count("cache_hit", len(results))
+    count("cache_miss", len(todo))
+    print(f"[INFO] Cache'ten gelen il sayısı: {len(results)}, çekilecek: {len(todo)}")
+
+    if not todo:
+        return results
+
+    if fetcher is None:
+        print("[INFO] Google Trends oturumu açılıyor...")
+        fetcher = pytrends_fetcher()
+
+    bucket = TokenBucket(rate=rate_per_sec, capacity=max_workers)
+
+    def work(row, path):
+        print(f"[INFO] Çekiliyor: {row.province} ({row.code}) - Bölge: {row.region7}")
+        iot = fetch_with_retry(fetcher, bucket, row.code, kw_list, timeframe,
+                               max_retries=max_retries, backoff=backoff)
+        if not iot.empty:
+            write_cache(iot, path)
+        return iot
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(work, row, path): row for row, path in todo}
+        for fut in as_completed(futures):
+            row = futures[fut]
+            try:
+                iot = fut.result()
+            except Exception as e:
+                print(f"  [ERROR] {row.province} ({row.code}) için hata: {e}")
+                continue
 
             if iot.empty:
-                print(f"  [WARN] {province} için boş veri döndü, atlanıyor.")
+                # Küçük illerde Trends boş dönebilir; il çıktıda yer almaz,
+                # indeks tarafında kapsamı düşürür (bkz. gap_region_index)
+                count("empty_result")
+                print(f"  [WARN] {row.province} için boş veri döndü, atlanıyor.")
                 continue
 
-            if "isPartial" in iot.columns:
-                iot = iot.drop(columns=["isPartial"])
+            results[row.code] = iot
 
-            iot["province_code"] = code
-            iot["province"] = province
-            iot["region7"] = region7
+    return results
 
-            all_dfs.append(iot)
 
-            # Google'a çok yüklenmemek için ufak bekleme
-            time.sleep(1)
+@instrument("collect_trends_provinces")
+def collect_trends_provinces(out_file="google_trends_province_timeseries.parquet",
+                             fetcher=None,
+                             cache_dir=CACHE_DIR,
+                             kw_list=KW_LIST,
+                             timeframe=TIMEFRAME,
+                             max_workers=4,
+                             rate_per_sec=1.0,
+                             max_retries=4,
+                             backoff=2.0):
+    """
+    Her il (ISO code = TR-xx) için Google Trends zaman serisi çeker
+    ve tek bir tabloda toplar (out_file: Parquet + CSV kopyası).
 
-        except Exception as e:
-            print(f"  [ERROR] {province} ({code}) için hata: {e}")
+    - fetcher: fetch(geo, kw_list, timeframe) backend'i (varsayılan: pytrends)
+    - Her il çekildiği anda cache_dir altına yazılır; cache'te olan iller
+      tekrar istenmez, böylece yarıda kalan çalıştırma kaldığı yerden devam eder.
+    """
+    provinces_df = pd.DataFrame(PROVINCES)
+
+    results = fetch_provinces(
+        provinces_df, kw_list, timeframe,
+        fetcher=fetcher, cache_dir=cache_dir, max_workers=max_workers,
+        rate_per_sec=rate_per_sec, max_retries=max_retries, backoff=backoff,
+    )
+
+    all_dfs = []
+    for row in provinces_df.itertuples(index=False):
+        iot = results.get(row.code)
+        if iot is None:
+            continue
+        iot = iot.copy()
+        iot["province_code"] = row.code
+        iot["province"] = row.province
+        iot["region7"] = row.region7
+        all_dfs.append(iot)
 
     if not all_dfs:
-        print("[ERROR] Hiç veri toplanamadı.")
-        return
+        raise RuntimeError("Hiç veri toplanamadı (tüm iller başarısız).")
+
+    missing = [row.province for row in provinces_df.itertuples(index=False)
+               if row.code not in results]
+    if missing:
+        print(f"[WARN] {len(missing)} il eksik ({', '.join(missing)}); "
+              f"tekrar çalıştırınca sadece bunlar çekilecek.")
 
     result = pd.concat(all_dfs, ignore_index=True)
+    record(rows_in=len(provinces_df), rows_out=len(result), missing_provinces=len(missing))
 
     # Çıktıyı kaydet
-    result.to_csv(out_file, index=False)
+    out_file = write_table(result, "trends", out_file)
     print(f"[OK] İl bazlı Google Trends zaman serileri '{out_file}' dosyasına kaydedildi.")
     print(result.head())
 
+    return result
+
+
+# --------------------------------------------------
+# Artımlı güncelleme (sadece yeni haftalar)
+# --------------------------------------------------
+
+@instrument("refresh_trends_provinces")
+def refresh_trends_provinces(out_file="google_trends_province_timeseries.parquet",
+                             fetcher=None,
+                             end_date=None,
+                             overlap_periods=3,
+                             cache_dir=CACHE_DIR,
+                             kw_list=KW_LIST,
+                             max_workers=4,
+                             rate_per_sec=1.0,
+                             max_retries=4,
+                             backoff=2.0):
+    """
+    Var olan il bazlı tabloyu tüm geçmişi tekrar çekmeden günceller.
+
+    - Tablodaki son tarihten overlap_periods dönem geriye giden kısa bir
+      pencere (.. end_date) her il için çekilir
+    - Trends değerleri pencereye göre göreli olduğu için, her ilin yeni
+      penceresi çakışan dönemlerdeki eski değerlere oranlanarak ölçeklenir
+    - Çakışan dönemler (özellikle önceki çalıştırmada henüz tamamlanmamış son
+      dönem) ölçeklenmiş yeni değerlerle değiştirilir, son tarihten sonraki
+      dönemler eklenir; tablo (Parquet + CSV) baştan yazılır
+    - Dönüş: değişen / eklenen satırlar
+    """
+    existing = read_table("trends", out_file)
+
+    last_date = existing["date"].max()
+    freq = _infer_freq(existing)
+    end = pd.Timestamp(end_date) if end_date is not None else pd.Timestamp.today().normalize()
+
+    if end < last_date + freq:
+        print(f"[INFO] '{out_file}' zaten güncel (son tarih: {last_date.date()}).")
+        return existing.iloc[0:0]
+
+    start = last_date - overlap_periods * freq
+    timeframe = f"{start:%Y-%m-%d} {end:%Y-%m-%d}"
+    print(f"[INFO] Artımlı güncelleme: {timeframe} (son tarih: {last_date.date()})")
+
+    provinces_df = (
+        pd.DataFrame(PROVINCES)
+        .query("code in @existing.province_code")
+    )
+
+    results = fetch_provinces(
+        provinces_df, kw_list, timeframe,
+        fetcher=fetcher, cache_dir=cache_dir, max_workers=max_workers,
+        rate_per_sec=rate_per_sec, max_retries=max_retries, backoff=backoff,
+    )
+
+    new_dfs = []
+    for row in provinces_df.itertuples(index=False):
+        window = results.get(row.code)
+        if window is None:
+            continue
+
+        old = existing.loc[existing["province_code"] == row.code].set_index("date")[kw_list]
+        fresh = rescale_window(old, window, kw_list, freq)
+        if fresh is None:
+            print(f"  [WARN] {row.province}: çakışan dönem yok, ölçeklenemedi, atlanıyor.")
+            continue
+        if fresh.empty:
+            continue
+
+        fresh = fresh.reset_index()
+        fresh["province_code"] = row.code
+        fresh["province"] = row.province
+        fresh["region7"] = row.region7
+        new_dfs.append(fresh)
+
+    if not new_dfs:
+        print("[INFO] Güncellenecek dönem bulunamadı.")
+        return existing.iloc[0:0]
+
+    updated = pd.concat(new_dfs, ignore_index=True)[existing.columns]
+    n_new = int((updated["date"] > last_date).sum())
+
+    # Çakışan (revize edilen) satırlar yenileriyle değiştirilir
+    key = ["province_code", "date"]
+    stale = existing.set_index(key).index.isin(updated.set_index(key).index)
+    result = (
+        pd.concat([existing.loc[~stale], updated], ignore_index=True)
+        .sort_values(key, kind="stable")
+        .reset_index(drop=True)
+    )
+    record(rows_in=len(existing), rows_out=len(result), rows_revised=len(updated) - n_new)
+    write_table(result, "trends", out_file)
+
+    print(f"[OK] '{out_file}': {n_new} yeni satır eklendi, "
+          f"{len(updated) - n_new} satır revize edildi.")
+    print(updated.head())
+
+    return updated
+
+
+def rescale_window(old, window, kw_list, freq):
+    """
+    Yeni pencereyi (window) eski serinin (old) ölçeğine çeker.
+
+    - window, eski serinin frekansına (ör. aylık) ortalama ile indirgenir
+    - ölçek = Σ eski / Σ yeni (çakışan dönemler, tüm keyword'ler üzerinde).
+      Trends aynı istekteki keyword'leri ortak bir maksimuma göre 0-100'e
+      çektiği için il başına tek katsayı yeterli; keyword bazında oranlamak
+      seyrek (hep 0) serilerde bölme hatası verir.
+    - Çakışan dönemde eski ya da yeni toplam 0 ise ölçek 1 kabul edilir
+    - Dönüş: ilk çakışan dönemden itibaren ölçeklenmiş satırlar (çakışan
+      dönemler eski değerlerin yerine geçer); çakışma yoksa None
+    """
+    window = window.copy()
+    window["date"] = pd.to_datetime(window["date"])
+    window = window.set_index("date")[kw_list].resample(freq).mean().dropna(how="all")
+
+    overlap = window.index.intersection(old.index)
+    if len(overlap) == 0:
+        return None
+
+    old_sum = old.loc[overlap].to_numpy(dtype=float).sum()
+    new_sum = window.loc[overlap].to_numpy(dtype=float).sum()
+    scale = old_sum / new_sum if old_sum > 0 and new_sum > 0 else 1.0
+
+    fresh = window.loc[window.index >= overlap.min()] * scale
+    return fresh.round(2)
+
+
+def _infer_freq(df):
+    # Tek bir ilin tarih dizisinden frekans (MS, W-SUN, D ...) çıkarır
+    dates = df.loc[df["province_code"] == df["province_code"].iloc[0], "date"]
+    dates = pd.DatetimeIndex(dates.sort_values().unique())
+    freq = pd.infer_freq(dates) if len(dates) >= 3 else None
+    if freq is None:
+        return pd.tseries.frequencies.to_offset(pd.Timedelta(dates.to_series().diff().median()))
+    return pd.tseries.frequencies.to_offset(freq)
+
 
 if __name__ == "__main__":
     collect_trends_provinces()
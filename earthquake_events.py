@@ -0,0 +1,201 @@
+"""
+earthquake_events.py
+
+Amaç:
+- AFAD deprem kataloğunu (earthquake.csv) okuyup zaman + konum indeksi kurar
+  (zamana göre sıralı dizi + 3B birim küre üzerinde KD-tree)
+- Gardner–Knopoff pencereleriyle artçı/öncü şokları ayıklar (declustering);
+  böylece tek bir ana şok, ardışık günlerde çok sayıda event üretmez
+- Her ana şoku en yakın il merkezine (data/province_centroids.csv) ve
+  o ilin region7 bölgesine bağlar
+
+Her ana şok için KD-tree'den sadece mesafe penceresindeki adaylar alınır,
+zaman penceresi bu adaylar üzerinde vektörize kontrol edilir; katalog
+yüz binlerce satır olsa da ikinci dereceden (O(n²)) bir döngü yoktur.
+
+Çalıştırma:
+    python earthquake_events.py
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from stress_store import load_source
+
+
+EARTH_RADIUS_KM = 6371.0
+PROVINCE_FILE = "data/province_centroids.csv"
+
+
+# --------------------------------------------------
+# Katalog + indeks
+# --------------------------------------------------
+
+def load_catalog(eq_file="earthquake.csv"):
+    """
+    AFAD CSV'sini okur; 'time' (datetime64) kolonu ekler ve zamana göre sıralar.
+    AFAD Date formatı: '31/10/2025 07:18:50' (gün/ay/yıl).
+    """
+    eq = load_source("earthquake", eq_file)
+    eq["time"] = eq["Date"]
+    eq = eq.dropna(subset=["time", "Latitude", "Longitude", "Magnitude"])
+    return eq.sort_values("time", kind="stable").reset_index(drop=True)
+
+
+def to_xyz(lat, lon):
+    """Enlem/boylamı (derece) EARTH_RADIUS_KM yarıçaplı küre üzerinde 3B noktaya çevirir."""
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    return EARTH_RADIUS_KM * np.column_stack([
+        np.cos(lat) * np.cos(lon),
+        np.cos(lat) * np.sin(lon),
+        np.sin(lat),
+    ])
+
+
+def chord_to_km(chord):
+    """3B kiriş uzunluğunu büyük çember mesafesine (km) çevirir."""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / (2 * EARTH_RADIUS_KM), 0, 1))
+
+
+def km_to_chord(km):
+    return 2 * EARTH_RADIUS_KM * np.sin(np.asarray(km) / (2 * EARTH_RADIUS_KM))
+
+
+def build_index(catalog):
+    """
+    Katalog için uzay-zaman indeksi:
+    - xyz:  (n, 3) küre koordinatları
+    - tree: xyz üzerinde cKDTree
+    - days: (n,) epoch'tan beri gün (float), katalog zamana göre sıralı
+    """
+    xyz = to_xyz(catalog["Latitude"], catalog["Longitude"])
+    days = catalog["time"].to_numpy("datetime64[s]").astype(np.int64) / 86400.0
+    return {"xyz": xyz, "tree": cKDTree(xyz), "days": days}
+
+
+# --------------------------------------------------
+# Gardner–Knopoff declustering
+# --------------------------------------------------
+
+def gk_window(mag):
+    """
+    Gardner & Knopoff (1974) pencereleri.
+    Dönüş: (mesafe_km, süre_gün)
+    """
+    mag = np.asarray(mag, dtype=np.float64)
+    dist_km = 10 ** (0.1238 * mag + 0.983)
+    days = np.where(mag >= 6.5,
+                    10 ** (0.032 * mag + 2.7389),
+                    10 ** (0.5409 * mag - 0.547))
+    return dist_km, days
+
+
+def decluster_gardner_knopoff(catalog, index=None):
+    """
+    Katalogdaki her depremi ana şok ya da bağımlı şok (öncü/artçı) olarak işaretler.
+
+    Depremler büyükten küçüğe işlenir; henüz bir kümeye atanmamış her deprem
+    ana şoktur ve GK penceresine (|Δt| ≤ T(M), mesafe ≤ L(M)) düşen atanmamış
+    depremler onun kümesine katılır.
+
+    Dönüş: catalog + 'mainshock' (bool) + 'cluster_id' (ana şokun satır indeksi)
+    """
+    if index is None:
+        index = build_index(catalog)
+
+    mag = catalog["Magnitude"].to_numpy(dtype=np.float64)
+    dist_km, win_days = gk_window(mag)
+    radius = km_to_chord(dist_km)
+    xyz, tree, days = index["xyz"], index["tree"], index["days"]
+
+    n = len(catalog)
+    assigned = np.zeros(n, dtype=bool)
+    mainshock = np.zeros(n, dtype=bool)
+    cluster = np.full(n, -1, dtype=np.int64)
+
+    # Büyükten küçüğe; eşit magnitüdde önce gelen önce
+    order = np.lexsort((days, -mag))
+
+    for i in order:
+        if assigned[i]:
+            continue
+
+        cand = np.asarray(tree.query_ball_point(xyz[i], radius[i]), dtype=np.int64)
+        cand = cand[~assigned[cand] & (np.abs(days[cand] - days[i]) <= win_days[i])]
+
+        assigned[cand] = True
+        cluster[cand] = i
+        assigned[i] = True
+        mainshock[i] = True
+        cluster[i] = i
+
+    out = catalog.copy()
+    out["mainshock"] = mainshock
+    out["cluster_id"] = cluster
+    return out
+
+
+# --------------------------------------------------
+# İl / bölge eşleştirme
+# --------------------------------------------------
+
+def load_provinces(province_file=PROVINCE_FILE):
+    return load_source("provinces", province_file)
+
+
+def attach_nearest_province(catalog, provinces=None):
+    """Her depreme en yakın il merkezini, bölgesini ve mesafesini (km) ekler."""
+    if provinces is None:
+        provinces = load_provinces()
+
+    tree = cKDTree(to_xyz(provinces["latitude"], provinces["longitude"]))
+    chord, idx = tree.query(to_xyz(catalog["Latitude"], catalog["Longitude"]), k=1)
+
+    out = catalog.copy()
+    out["province_code"] = provinces["code"].to_numpy()[idx]
+    out["province"] = provinces["province"].to_numpy()[idx]
+    out["region7"] = provinces["region7"].to_numpy()[idx]
+    out["province_dist_km"] = chord_to_km(chord)
+    return out
+
+
+# --------------------------------------------------
+# Event tablosu
+# --------------------------------------------------
+
+def earthquake_events(eq_file="earthquake.csv",
+                      mag_min=4.5, depth_min=0.0, depth_max=40.0,
+                      decluster=True, provinces=None):
+    """
+    mag_min ve derinlik filtresini geçen (declustering açıksa sadece ana şok)
+    depremleri il / bölge bilgisiyle döndürür.
+
+    Declustering yalnızca Magnitude ≥ mag_min alt kataloğunda yapılır: bir
+    depremin ana şok olup olmadığı sadece kendisinden büyük depremlere bağlı
+    olduğu için sonuç tam katalogla aynıdır. Derinlik filtresi declustering'den
+    sonra uygulanır (derin bir ana şokun sığ artçıları ana şok sayılmasın).
+    """
+    catalog = load_catalog(eq_file)
+    catalog = catalog[catalog["Magnitude"] >= mag_min].reset_index(drop=True)
+
+    if decluster:
+        catalog = decluster_gardner_knopoff(catalog)
+        catalog = catalog[catalog["mainshock"]]
+
+    mask_depth = (catalog["Depth"] >= depth_min) & (catalog["Depth"] <= depth_max)
+    catalog = catalog[mask_depth].reset_index(drop=True)
+
+    return attach_nearest_province(catalog, provinces)
+
+
+if __name__ == "__main__":
+    all_big = earthquake_events(decluster=False)
+    main = earthquake_events(decluster=True)
+
+    print(f"[INFO] Magnitüd/derinlik filtresinden geçen deprem: {len(all_big)} "
+          f"({all_big['time'].dt.date.nunique()} gün)")
+    print(f"[INFO] Declustering sonrası ana şok: {len(main)} "
+          f"({main['time'].dt.date.nunique()} gün)")
+    print(main[["time", "Magnitude", "Depth", "Location", "province", "region7",
+                "province_dist_km"]].head(10))
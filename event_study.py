@@ -0,0 +1,195 @@
+"""
+event_study.py
+
+Amaç:
+- build_event_panel her event'i tek bir delta_stress'e indirger; burada
+  event etrafındaki tüm tepki yolu (k = -K ... +K periyot) hesaplanır
+- Her event_type (ve istenirse deprem magnitüd aralığı) × bölge × k için
+  ortalama tepki, standart hata, güven aralığı ve event sayısı
+- Tüm lead/lag'ler tek seferde (tarih × bölge) matrisine fancy-indexing ile
+  toplanır: (n_event, 2K+1, n_region) "küp" bir kez kurulur; farklı
+  gruplamalar (event_type, magnitüd aralığı, baz periyot) bu küp üzerinden
+  grup one-hot matris çarpımıyla milisaniyeler içinde yeniden hesaplanır
+
+k = 0 event tarihini içeren periyottur (aylık veride event'in ayı).
+Varsayılan olarak her event'in yolu k = -1 değerine göre normalize edilir.
+
+Çalıştırma:
+    python event_study.py
+    python event_study.py --max-lag 12 --by-magnitude
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from stress_store import read_table, write_table
+
+
+MAX_LAG = 6
+MAG_BINS = [4.5, 5.0, 5.5, 6.0, 10.0]
+
+
+# --------------------------------------------------
+# Tepki küpü
+# --------------------------------------------------
+
+def region_matrix(region):
+    """Bölge indeksini (n_date, n_region) matrisine çevirir (eksik = NaN)."""
+    wide = (
+        region.groupby(["date", "region7"], observed=True)["stress_index"]
+        .mean()
+        .unstack("region7")
+        .sort_index()
+    )
+    regions = sorted(wide.columns.astype(str))
+    wide.columns = wide.columns.astype(str)
+    return {
+        "dates": wide.index.to_numpy(dtype="datetime64[ns]"),
+        "regions": regions,
+        "values": wide[regions].to_numpy(dtype=np.float64),
+    }
+
+
+def build_response_cube(region, events, max_lag=MAX_LAG):
+    """
+    Her event için k = -max_lag..max_lag periyotlarındaki bölge indeksleri.
+
+    Dönen sözlük:
+    - offsets: (L,) k değerleri, L = 2·max_lag + 1
+    - regions: bölge isimleri
+    - cube:    (n_event, L, n_region); seri dışına taşan k'lar NaN
+    - events:  küpteki satırlarla hizalı event tablosu (seri başlamadan
+               önceki event'ler çıkarılır)
+    """
+    mat = region_matrix(region)
+    dates, values = mat["dates"], mat["values"]
+
+    ev_dates = pd.to_datetime(events["event_date"]).to_numpy(dtype="datetime64[ns]")
+    anchor = np.searchsorted(dates, ev_dates, side="right") - 1
+    keep = anchor >= 0
+    anchor = anchor[keep]
+
+    offsets = np.arange(-max_lag, max_lag + 1)
+    idx = anchor[:, None] + offsets[None, :]           # (E, L)
+    valid = (idx >= 0) & (idx < len(dates))
+
+    cube = values[np.clip(idx, 0, len(dates) - 1)]      # (E, L, R)
+    cube[~valid] = np.nan
+
+    return {
+        "offsets": offsets,
+        "regions": mat["regions"],
+        "cube": cube,
+        "events": events.loc[keep].reset_index(drop=True),
+    }
+
+
+# --------------------------------------------------
+# Gruplama + ortalama tepki
+# --------------------------------------------------
+
+def attach_magnitude(events, eq_file="earthquake.csv", bins=MAG_BINS):
+    """Deprem event'lerine o günün en büyük magnitüdünü ve aralığını ekler."""
+    from province_event_panel import epicenters_by_day
+
+    epi = epicenters_by_day(eq_file)
+    day = pd.to_datetime(events["event_date"]).dt.normalize()
+    is_eq = events["event_type"].astype(str) == "earthquake"
+
+    out = events.copy()
+    out["magnitude"] = day.map(epi["Magnitude"]).where(is_eq)
+    out["mag_bucket"] = pd.cut(out["magnitude"], bins, right=False).astype(str)
+    out.loc[~is_eq, "mag_bucket"] = "-"
+    return out
+
+
+def response_curves(cube, by=("event_type",), baseline=-1, alpha_z=1.96):
+    """
+    Küpten grup × bölge × k ortalama tepki yolu.
+
+    - by:       cube["events"] kolonları (ör. ["event_type", "mag_bucket"])
+    - baseline: her event'in yolundan çıkarılacak k (None: ham indeks)
+
+    Standart hata: event'ler arası std (ddof=1) / √n. Hesap tek bir
+    (grup × event) one-hot matrisiyle toplu yapılır.
+    """
+    Y = cube["cube"]
+    offsets = cube["offsets"]
+    if baseline is not None:
+        b = int(np.flatnonzero(offsets == baseline)[0])
+        Y = Y - Y[:, b:b + 1, :]
+
+    n_events, n_lags, n_reg = Y.shape
+    flat = Y.reshape(n_events, -1)
+    observed = ~np.isnan(flat)
+    filled = np.where(observed, flat, 0.0)
+
+    by = list(by)
+    g_idx = cube["events"].groupby(by, sort=True, observed=True).ngroup().to_numpy()
+    groups = cube["events"][by].drop_duplicates().sort_values(by).reset_index(drop=True)
+    G = np.zeros((len(groups), n_events))
+    G[g_idx, np.arange(n_events)] = 1.0
+
+    n = G @ observed
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (G @ filled) / n
+        centered = np.where(observed, flat - (mean[g_idx]), 0.0)
+        var = (G @ centered ** 2) / (n - 1)
+        se = np.sqrt(var / n)
+
+    shape = (len(groups), n_lags, n_reg)
+    g, k, r = np.indices(shape).reshape(3, -1)
+    out = groups.iloc[g].reset_index(drop=True)
+    out["region7"] = np.asarray(cube["regions"])[r]
+    out["k"] = offsets[k]
+    out["mean"] = mean.reshape(-1)
+    out["se"] = se.reshape(-1)
+    out["ci_low"] = out["mean"] - alpha_z * out["se"]
+    out["ci_high"] = out["mean"] + alpha_z * out["se"]
+    out["n_events"] = n.reshape(-1).astype(np.int64)
+    return out
+
+
+def run_event_study(region_file="region_stress_index_weekly.parquet",
+                    events_file="event_dates.parquet",
+                    eq_file="earthquake.csv",
+                    max_lag=MAX_LAG, by_magnitude=False, baseline=-1,
+                    out_file="event_response_curves.parquet"):
+    t0 = time.perf_counter()
+    region = read_table("region_index", region_file)
+    events = read_table("events", events_file)
+
+    by = ["event_type"]
+    if by_magnitude:
+        events = attach_magnitude(events, eq_file)
+        by.append("mag_bucket")
+
+    cube = build_response_cube(region, events, max_lag)
+    t1 = time.perf_counter()
+    curves = response_curves(cube, by=by, baseline=baseline)
+    t2 = time.perf_counter()
+
+    print(f"[INFO] {len(cube['events'])} event × {len(cube['offsets'])} lag × "
+          f"{len(cube['regions'])} bölge küpü: {t1 - t0:.3f} s "
+          f"(okuma dahil), eğriler: {1000 * (t2 - t1):.1f} ms")
+
+    if out_file is not None:
+        out_file = write_table(curves, "response_curves", out_file)
+        print(f"[OK] Tepki eğrileri kaydedildi: {out_file}")
+
+    return curves
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Event-study tepki eğrileri")
+    parser.add_argument("--max-lag", type=int, default=MAX_LAG)
+    parser.add_argument("--by-magnitude", action="store_true")
+    parser.add_argument("--no-baseline", action="store_true")
+    args = parser.parse_args()
+
+    curves = run_event_study(max_lag=args.max_lag, by_magnitude=args.by_magnitude,
+                             baseline=None if args.no_baseline else -1)
+    print(curves[curves["k"].isin([-1, 0, 1])].head(20))
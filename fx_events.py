@@ -0,0 +1,271 @@
+"""
+fx_events.py
+
+Amaç:
+- Kur şoku event'lerini birden çok döviz çifti ve her frekans (günlük,
+  gün içi, haftalık) için tek vektörize geçişte üretir
+- investing.com "Historical Data" CSV'lerini tipli okur: sayısal kolonlar
+  doğrudan float64, "Vol." (12.5K / 3.1M / 1.2B) ve "Change %" ("0.27%")
+  kolonları string işlemleriyle sayıya çevrilir; genel read_csv +
+  to_numeric(errors="coerce") dolaşması yok
+- Eşik seçenekleri:
+    * abs:  |log-getiri| > threshold  (build_event_dates'in eski tanımı)
+    * z:    |getiri| / (geçmiş vol_window dönemin oynaklığı · √h) > z_threshold;
+            oynaklık yüksek dönemlerde (rejim) eşik kendiliğinden büyür
+- Çok ufuklu getiriler (horizons=(1, 5) → 1 ve 5 dönemlik log-getiri);
+  herhangi bir ufukta eşiği aşan gün şoktur
+- Kümelenmiş şok günleri birleştirilir: aynı çiftte aralarında min_gap_days
+  günden az olan şoklar tek kümedir, kümeden en büyük |z|'li gün kalır
+
+Çalıştırma:
+    python fx_events.py
+    python fx_events.py --method z --z 3 --horizons 1 4 --min-gap-days 7
+"""
+
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from stress_metrics import instrument, record
+from stress_store import cached_frame
+
+
+FX_FILE = "USD_TRY Historical Data.csv"
+FX_RET_THRESHOLD = 0.02
+Z_THRESHOLD = 3.0
+VOL_WINDOW = 20
+VOL_MIN_PERIODS = 10
+
+_NUMERIC = ["Price", "Open", "High", "Low"]
+_VOL_SUFFIX = {"K": 1e3, "M": 1e6, "B": 1e9}
+
+
+# --------------------------------------------------
+# Tipli okuma
+# --------------------------------------------------
+
+def load_fx(fx_file=FX_FILE, pair=None, date_format=None):
+    """
+    Tek bir investing.com CSV'sini (date, pair, price, open, high, low,
+    volume, change) tablosuna çevirir, tarihe göre sıralı.
+
+    date_format verilmezse '%m/%d/%Y' (saat içeriyorsa '%m/%d/%Y %H:%M:%S').
+    Parse edilmiş tablo stress_store cache'inde tutulur.
+    """
+    if pair is None:
+        pair = os.path.basename(fx_file).replace(" Historical Data.csv", "")
+    return cached_frame(fx_file, f"fx:v2:{pair}:{date_format}",
+                        lambda: _parse_fx(fx_file, pair, date_format))
+
+
+def _parse_fx(fx_file, pair, date_format):
+    # Tırnaklı, binlik ayraçlı sayılar pyarrow motorunda desteklenmediği için C motoru
+    raw = pd.read_csv(
+        fx_file,
+        encoding="utf-8-sig",
+        dtype={c: np.float64 for c in _NUMERIC} | {"Date": str, "Vol.": str, "Change %": str},
+        thousands=",",
+        keep_default_na=False,
+        na_values={c: [""] for c in _NUMERIC},
+    )
+
+    dates = raw["Date"]
+    if date_format is None:
+        date_format = "%m/%d/%Y %H:%M:%S" if dates.str.contains(":").any() else "%m/%d/%Y"
+
+    fx = pd.DataFrame({
+        "date": pd.to_datetime(dates, format=date_format, errors="coerce"),
+        "pair": pair,
+        "price": raw["Price"],
+        "open": raw["Open"],
+        "high": raw["High"],
+        "low": raw["Low"],
+        "volume": parse_volume(raw["Vol."]),
+        "change": parse_percent(raw["Change %"]),
+    })
+    fx = fx.dropna(subset=["date", "price"])
+    return fx.sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def parse_volume(col):
+    """'12.5K' / '3.10M' / '1.2B' / '' / '-' → float (boş ve '-': NaN)."""
+    s = col.str.strip().str.replace(",", "", regex=False)
+    # investing.com hacim olmayan günlerde '-' yazar
+    s = s.mask(s == "-", "")
+    suffix = s.str[-1:]
+    mult = suffix.map(_VOL_SUFFIX).fillna(1.0)
+    digits = s.where(~suffix.isin(list(_VOL_SUFFIX)), s.str[:-1])
+    return digits.mask(digits == "").astype(np.float64) * mult
+
+
+def parse_percent(col):
+    """'0.27%' → 0.0027 (boş ve '-': NaN)."""
+    s = col.str.strip().str.rstrip("%").str.replace(",", "", regex=False)
+    return s.mask(s.isin(["", "-"])).astype(np.float64) / 100.0
+
+
+def load_fx_pairs(files=None, pattern="* Historical Data.csv"):
+    """
+    Birden çok çifti tek uzun tabloda birleştirir.
+    files: {pair: dosya} sözlüğü ya da dosya listesi; verilmezse pattern ile aranır.
+    """
+    if files is None:
+        files = sorted(glob.glob(pattern))
+    if not isinstance(files, dict):
+        files = {None: f for f in files}
+    parts = [load_fx(path, pair) for pair, path in files.items()]
+    fx = pd.concat(parts, ignore_index=True)
+    fx["pair"] = fx["pair"].astype("category")
+    return fx.sort_values(["pair", "date"], kind="stable").reset_index(drop=True)
+
+
+# --------------------------------------------------
+# Şok tespiti
+# --------------------------------------------------
+
+def detect_fx_shocks(fx, method="abs", threshold=FX_RET_THRESHOLD, z_threshold=Z_THRESHOLD,
+                     horizons=(1,), vol_window=VOL_WINDOW, min_periods=VOL_MIN_PERIODS):
+    """
+    fx (pair, date sıralı uzun tablo) üzerinde tüm çiftler ve ufuklar için
+    getiri, geçmiş oynaklık ve z-score'u döngüsüz hesaplar. pair kolonu
+    yoksa tablo tek çift kabul edilir.
+
+    Dönüş: satır başına, eşiğe göre en güçlü ufuk ile
+    date, pair, horizon, ret, vol, z, shock
+    """
+    if "pair" not in fx:
+        fx = fx.assign(pair="")
+    fx = fx.sort_values(["pair", "date"], kind="stable").reset_index(drop=True)
+    n = len(fx)
+    pair_codes = pd.factorize(fx["pair"])[0]
+    lp = np.log(fx["price"].to_numpy(dtype=np.float64))
+
+    # Çift içindeki sıra: pos - (çiftin ilk satırı)
+    starts = np.r_[0, np.flatnonzero(np.diff(pair_codes)) + 1]
+    first = np.repeat(starts, np.diff(np.r_[starts, n]))
+    pos = np.arange(n) - first
+
+    # 1 dönemlik getiri ve geçmiş oynaklık (sadece önceki vol_window getiri)
+    r1 = np.full(n, np.nan)
+    r1[1:] = lp[1:] - lp[:-1]
+    r1[pos == 0] = np.nan
+    vol = _rolling_std_past(r1, pos, vol_window, min_periods)
+
+    horizons = sorted(set(int(h) for h in horizons))
+    if not horizons or horizons[0] < 1:
+        raise ValueError(f"Ufuklar 1 ya da daha büyük tam sayı olmalı: {horizons}")
+    rets = np.full((len(horizons), n), np.nan)
+    for j, h in enumerate(horizons):
+        ok = pos >= h
+        rets[j, h:] = lp[h:] - lp[:-h]
+        rets[j, ~ok] = np.nan
+
+    scale = np.sqrt(np.asarray(horizons, dtype=np.float64))[:, None] * vol[None, :]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = rets / scale
+
+    if method == "abs":
+        score = np.abs(rets) / threshold
+    elif method == "z":
+        score = np.abs(z) / z_threshold
+    else:
+        raise ValueError(f"Bilinmeyen şok yöntemi: {method}")
+
+    filled = np.where(np.isnan(score), -np.inf, score)
+    best = filled.argmax(axis=0)
+    idx = np.arange(n)
+
+    return pd.DataFrame({
+        "date": fx["date"].to_numpy(),
+        "pair": fx["pair"].to_numpy(),
+        "horizon": np.asarray(horizons)[best],
+        "ret": rets[best, idx],
+        "vol": vol,
+        "z": z[best, idx],
+        "shock": filled[best, idx] > 1.0,
+    })
+
+
+def _rolling_std_past(r, pos, window, min_periods):
+    # r[i - window .. i - 1] üzerinden std (ddof=1); çift başına sınırlı,
+    # kümülatif toplamlarla O(n)
+    obs = ~np.isnan(r)
+    x = np.where(obs, r, 0.0)
+    c1 = np.r_[0.0, np.cumsum(x)]
+    c2 = np.r_[0.0, np.cumsum(x * x)]
+    cn = np.r_[0, np.cumsum(obs)]
+
+    i = np.arange(len(r))
+    lo = np.maximum(i - window, i - pos)
+    n = cn[i] - cn[lo]
+    s1 = c1[i] - c1[lo]
+    s2 = c2[i] - c2[lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (s2 - s1 * s1 / n) / (n - 1)
+    std = np.sqrt(np.maximum(var, 0.0))
+    std[n < max(min_periods, 2)] = np.nan
+    return std
+
+
+def dedup_shocks(shocks, min_gap_days=0):
+    """
+    Aynı çiftte aralarında min_gap_days günden az olan şokları tek kümeye
+    toplar ve kümeden |z| (yoksa |ret|) en büyük günü bırakır. cluster_size
+    kolonu her zaman eklenir (birleştirme yoksa 1).
+    """
+    s = shocks[shocks["shock"]].sort_values(["pair", "date"], kind="stable").reset_index(drop=True)
+    if s.empty or min_gap_days <= 0:
+        return s.assign(cluster_size=np.ones(len(s), dtype=np.int64))
+
+    gap = s["date"].diff().dt.total_seconds() / 86400.0
+    new = (s["pair"] != s["pair"].shift()) | (gap >= min_gap_days)
+    cluster = new.cumsum()
+
+    strength = s["z"].abs().fillna(s["ret"].abs())
+    keep = strength.groupby(cluster).idxmax()
+    out = s.loc[keep].reset_index(drop=True)
+    out["cluster_size"] = cluster.value_counts().sort_index().to_numpy()
+    return out
+
+
+@instrument("fx_shock_events")
+def fx_shock_events(fx_files=FX_FILE, method="abs", threshold=FX_RET_THRESHOLD,
+                    z_threshold=Z_THRESHOLD, horizons=(1,), vol_window=VOL_WINDOW,
+                    min_periods=VOL_MIN_PERIODS, min_gap_days=0):
+    """
+    Dosya(lar)dan event tablosu: event_date (gün), event_type = "fx_shock",
+    pair, horizon, ret, z. Varsayılanlar build_event_dates'in eski
+    |log-getiri| > %2 tanımıyla aynı günleri verir.
+    """
+    files = [fx_files] if isinstance(fx_files, str) else fx_files
+    fx = load_fx_pairs(files)
+
+    shocks = detect_fx_shocks(fx, method=method, threshold=threshold,
+                              z_threshold=z_threshold, horizons=horizons,
+                              vol_window=vol_window, min_periods=min_periods)
+    shocks = dedup_shocks(shocks, min_gap_days)
+
+    events = shocks.assign(event_date=shocks["date"].dt.normalize(), event_type="fx_shock")
+    events = events[["event_date", "event_type", "pair", "horizon", "ret", "z"]]
+    record(rows_in=len(fx), rows_out=len(events))
+    return events
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kur şoku event'leri")
+    parser.add_argument("files", nargs="*", default=[FX_FILE])
+    parser.add_argument("--method", choices=["abs", "z"], default="abs")
+    parser.add_argument("--threshold", type=float, default=FX_RET_THRESHOLD)
+    parser.add_argument("--z", type=float, default=Z_THRESHOLD)
+    parser.add_argument("--horizons", type=int, nargs="+", default=[1])
+    parser.add_argument("--vol-window", type=int, default=VOL_WINDOW)
+    parser.add_argument("--min-gap-days", type=float, default=0)
+    args = parser.parse_args()
+
+    events = fx_shock_events(args.files, args.method, args.threshold, args.z,
+                             args.horizons, args.vol_window, min_gap_days=args.min_gap_days)
+    print(f"[INFO] {len(events)} kur şoku event'i")
+    print(events.head(20))
@@ -0,0 +1,144 @@
+"""
+index_spec.py
+
+Amaç:
+- Stres indekslerinin tanımını tek bir bildirime (data/index_spec.json) toplar:
+    * keywords:          Trends'ten çekilen ve indekste kullanılan keyword'ler
+    * timeframe:         Trends zaman aralığı
+    * geo:               coğrafi birimler dosyası (il kodu, ismi, bölgesi)
+    * region_overrides:  {il kodu: bölge} ile bölge eşlemesini değiştirme
+    * indices:           isimli indeksler ve keyword ağırlıkları
+                         (ör. sadece kaygı, sadece somatik, özel ağırlıklar)
+- collect_trends_provinces (KW_LIST, PROVINCES) ve build_region_stress_index
+  (VALUE_COLS) bu tanımdan beslenir; listeler artık elle senkron tutulmaz
+- Tanım bir kez okunur ve doğrulanır: tekrar eden keyword / il kodu / il
+  ismi, bölgesi boş il, tanımsız keyword'e ağırlık, negatif ya da toplamı
+  sıfır ağırlık → ValueError
+
+Çalıştırma:
+    python index_spec.py          # tanımı doğrular ve özetler
+"""
+
+import functools
+import json
+import os
+
+import pandas as pd
+
+
+INDEX_SPEC_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "data", "index_spec.json")
+
+
+@functools.lru_cache(maxsize=None)
+def load_index_spec(spec_file=INDEX_SPEC_FILE):
+    """
+    Tanımı okur, doğrular ve normalize eder. Aynı dosya için tekrar okunmaz.
+
+    Dönen sözlük: keywords, timeframe, provinces (code, province, region7
+    DataFrame'i), default_index, indices ({isim: {"weights": [K ağırlık]}})
+    """
+    with open(spec_file, encoding="utf-8") as f:
+        raw = json.load(f)
+
+    errors = []
+
+    keywords = list(raw.get("keywords", []))
+    if not keywords:
+        errors.append("keywords boş")
+    dup = sorted({k for k in keywords if keywords.count(k) > 1})
+    if dup:
+        errors.append(f"tekrar eden keyword: {dup}")
+
+    provinces = _load_geo(raw.get("geo", {}), raw.get("region_overrides", {}), errors)
+
+    indices = {}
+    for name, idx in raw.get("indices", {}).items():
+        weights = idx.get("weights", {})
+        unknown = sorted(set(weights) - set(keywords))
+        if unknown:
+            errors.append(f"{name}: tanımsız keyword ağırlığı {unknown}")
+        w = [float(weights.get(k, 0.0)) for k in keywords]
+        if any(x < 0 for x in w):
+            errors.append(f"{name}: negatif ağırlık")
+        if sum(w) <= 0:
+            errors.append(f"{name}: ağırlıkların toplamı sıfır")
+        indices[name] = {"weights": w}
+
+    default_index = raw.get("default_index", "stress_index")
+    if default_index not in indices:
+        errors.append(f"default_index '{default_index}' indices içinde yok")
+
+    if errors:
+        raise ValueError(f"Geçersiz indeks tanımı ({spec_file}):\n  - " + "\n  - ".join(errors))
+
+    return {
+        "keywords": keywords,
+        "timeframe": raw.get("timeframe"),
+        "provinces": provinces,
+        "default_index": default_index,
+        "indices": indices,
+    }
+
+
+def _load_geo(geo, overrides, errors):
+    # Göreli yollar repo köküne (bu dosyanın klasörü) göre
+    path = geo.get("file", "data/province_centroids.csv")
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+    cols = {geo.get("code", "code"): "code",
+            geo.get("name", "province"): "province",
+            geo.get("region", "region7"): "region7"}
+    df = pd.read_csv(path, usecols=list(cols)).rename(columns=cols)[["code", "province", "region7"]]
+
+    unknown = sorted(set(overrides) - set(df["code"]))
+    if unknown:
+        errors.append(f"region_overrides: bilinmeyen il kodu {unknown}")
+    df["region7"] = df["code"].map(overrides).fillna(df["region7"])
+
+    for col in ["code", "province"]:
+        dup = sorted(df.loc[df[col].duplicated(), col])
+        if dup:
+            errors.append(f"tekrar eden {col}: {dup}")
+    missing = sorted(df.loc[df["region7"].isna() | (df["region7"] == ""), "code"])
+    if missing:
+        errors.append(f"bölgesi olmayan il: {missing}")
+
+    return df
+
+
+def check_columns(df, keywords=None):
+    """Trends tablosunda keyword kolonlarının (verilmezse tanımdakiler) hepsi var mı."""
+    keywords = keywords if keywords is not None else load_index_spec()["keywords"]
+    missing = [k for k in keywords if k not in df.columns]
+    if missing:
+        raise ValueError(f"Trends tablosunda eksik keyword kolonları: {missing}")
+
+
+def index_weights(spec=None, names=None):
+    """
+    (isimler, (n_index, n_keyword) ağırlık listesi). names verilmezse sadece
+    default_index; "all" ise tanımdaki bütün indeksler.
+    """
+    spec = spec or load_index_spec()
+    if names is None:
+        names = [spec["default_index"]]
+    elif names == "all":
+        names = list(spec["indices"])
+    unknown = [n for n in names if n not in spec["indices"]]
+    if unknown:
+        raise ValueError(f"Tanımsız indeks: {unknown}")
+    return list(names), [spec["indices"][n]["weights"] for n in names]
+
+
+if __name__ == "__main__":
+    spec = load_index_spec()
+    print(f"[OK] İndeks tanımı geçerli: {INDEX_SPEC_FILE}")
+    print(f"[INFO] {len(spec['keywords'])} keyword: {', '.join(spec['keywords'])}")
+    print(f"[INFO] {len(spec['provinces'])} il, "
+          f"{spec['provinces']['region7'].nunique()} bölge")
+    print(spec["provinces"]["region7"].value_counts().sort_index())
+    for name, idx in spec["indices"].items():
+        used = {k: w for k, w in zip(spec["keywords"], idx["weights"]) if w}
+        print(f"[INFO] {name}: {used}")
@@ -0,0 +1,305 @@
+"""
+panel_regression.py
+
+Amaç:
+- run_anova'daki tek formüllü (delta_stress ~ C(region7)) OLS yerine
+  daha zengin bir panel regresyon katmanı:
+    * sabit etkiler (FE): bölge / il + event (iki yönlü), ya da hiç
+    * event_type etkileşimleri:     "C(region7):C(event_type)"
+    * sürekli kovaryatlar:          "magnitude", "fx_ret", "exposure",
+                                    "C(region7):magnitude" ...
+    * event tarihine göre kümelenmiş (clustered, CR1) standart hatalar
+- FE'ler dummy kolonu olarak eklenmez; y ve regresörler FE gruplarına göre
+  ardışık ortalamadan arındırılır (within / alternating projections).
+  Bu yüzden il panelinde (yüz binlerce - milyonlarca satır) bile tasarım
+  matrisi sadece ilgilenilen regresörler kadar geniştir
+- fit_specs birden çok spesifikasyonu tek geçişte çözer: grup kodları
+  (factorize) ve aynı FE kümesi için arındırılmış kolonlar önbellekte
+  tutulur, spesifikasyonlar arasında tekrar hesaplanmaz
+
+Spesifikasyon sözlüğü:
+    {"name": "twfe_type", "fe": ["region7", "event"],
+     "terms": ["C(region7):C(event_type)"]}
+"event" kolonu (event_date, event_type) çiftinden otomatik üretilir.
+fe boşsa modele sabit terim eklenir.
+
+Çalıştırma:
+    python panel_regression.py
+    python panel_regression.py --province
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from fx_events import load_fx
+from stress_store import read_table
+
+
+MAP_TOL = 1e-10
+MAP_MAXITER = 1000
+
+DEFAULT_SPECS = [
+    {"name": "anova", "fe": [], "terms": ["C(region7)"]},
+    {"name": "event_fe", "fe": ["event"], "terms": ["C(region7)"]},
+    {"name": "twfe_type", "fe": ["region7", "event"], "terms": ["C(region7):C(event_type)"]},
+    {"name": "twfe_mag_fx", "fe": ["region7", "event"],
+     "terms": ["C(region7):magnitude", "C(region7):fx_ret"]},
+]
+
+
+# --------------------------------------------------
+# Kovaryatlar
+# --------------------------------------------------
+
+def attach_covariates(panel, eq_file="earthquake.csv",
+                      fx_file="USD_TRY Historical Data.csv"):
+    """
+    Panele event düzeyinde kovaryat ekler:
+    - magnitude: deprem günlerinde o günün en büyük magnitüdü, diğerlerinde 0
+    - fx_ret:    event tarihindeki (ya da öncesindeki son) USD/TRY log-getirisi
+    """
+    from event_study import attach_magnitude
+
+    events = panel[["event_date", "event_type"]].drop_duplicates().reset_index(drop=True)
+    events = attach_magnitude(events, eq_file)
+
+    fx = load_fx(fx_file)
+    fx["fx_ret"] = np.log(fx["price"]).diff()
+
+    events = events.sort_values("event_date")
+    events["event_date"] = pd.to_datetime(events["event_date"])
+    events = pd.merge_asof(events, fx[["date", "fx_ret"]], left_on="event_date",
+                           right_on="date", direction="backward").drop(columns="date")
+
+    events["magnitude"] = events["magnitude"].fillna(0.0)
+    events["fx_ret"] = events["fx_ret"].fillna(0.0)
+
+    out = panel.copy()
+    out["event_date"] = pd.to_datetime(out["event_date"])
+    key = ["event_date", "event_type"]
+    events["event_type"] = events["event_type"].astype(out["event_type"].dtype)
+    return out.merge(events[key + ["magnitude", "fx_ret"]], on=key, how="left")
+
+
+# --------------------------------------------------
+# Önbellekli tasarım bağlamı
+# --------------------------------------------------
+
+def prepare_panel(panel, y="delta_stress", cluster="event_date"):
+    """
+    y'si NaN olmayan satırlar üzerinde spesifikasyonlar arası paylaşılan bağlam.
+    codes / within anahtarları fit sırasında doldurulur.
+    """
+    df = panel.dropna(subset=[y]).reset_index(drop=True)
+    if "event" not in df.columns:
+        df["event"] = df.groupby(["event_date", "event_type"], sort=True,
+                                 observed=True).ngroup()
+
+    ctx = {"df": df, "y": y, "codes": {}, "within": {}}
+    ctx["cluster"] = _codes(ctx, cluster)
+    return ctx
+
+
+def _codes(ctx, col):
+    # Kolon → (kodlar, seviyeler, grup büyüklükleri); bir kez factorize edilir
+    if col not in ctx["codes"]:
+        codes, levels = pd.factorize(ctx["df"][col], sort=True)
+        ctx["codes"][col] = (codes, np.asarray(levels),
+                             np.bincount(codes, minlength=len(levels)))
+    return ctx["codes"][col]
+
+
+def _term_columns(ctx, term):
+    """
+    "C(a):C(b):x" gibi bir terimin kolonları. Kategorik faktörlerin ilk
+    seviyesi referans olarak düşülür (treatment coding).
+    """
+    df = ctx["df"]
+    names = [""]
+    cols = [np.ones(len(df))]
+    for factor in term.split(":"):
+        factor = factor.strip()
+        if factor.startswith("C(") and factor.endswith(")"):
+            col = factor[2:-1]
+            codes, levels, _ = _codes(ctx, col)
+            new_names, new_cols = [], []
+            for j, level in enumerate(levels[1:], start=1):
+                dummy = (codes == j).astype(np.float64)
+                for name, c in zip(names, cols):
+                    new_names.append(f"{name}:{col}[{level}]" if name else f"{col}[{level}]")
+                    new_cols.append(c * dummy)
+            names, cols = new_names, new_cols
+        else:
+            x = df[factor].to_numpy(dtype=np.float64)
+            names = [f"{name}:{factor}" if name else factor for name in names]
+            cols = [c * x for c in cols]
+    return names, cols
+
+
+def demean(x, fe_codes, tol=MAP_TOL, maxiter=MAP_MAXITER):
+    """
+    x'i FE gruplarının hepsine göre ortalamadan arındırır (alternating
+    projections). Tek FE'de tek geçiş, dengeli iki yönlü panelde iki geçiş
+    yeter; dengesiz panelde değişim tol altına inene kadar tekrarlanır.
+    """
+    x = np.array(x, dtype=np.float64)
+    if not fe_codes:
+        return x
+    for _ in range(maxiter):
+        max_step = 0.0
+        for codes, _, counts in fe_codes:
+            means = np.bincount(codes, weights=x, minlength=len(counts)) / counts
+            step = means[codes]
+            x -= step
+            max_step = max(max_step, np.abs(step).max())
+        if len(fe_codes) == 1 or max_step < tol:
+            break
+    return x
+
+
+def _within(ctx, fe, key, values):
+    # Aynı FE kümesi + aynı kolon için arındırılmış vektör bir kez hesaplanır
+    cache_key = (tuple(fe), key)
+    if cache_key not in ctx["within"]:
+        ctx["within"][cache_key] = demean(values, [_codes(ctx, c) for c in fe])
+    return ctx["within"][cache_key]
+
+
+# --------------------------------------------------
+# Fit
+# --------------------------------------------------
+
+def fit_spec(ctx, spec, cov="cluster"):
+    """
+    Tek spesifikasyon. cov="cluster" (event tarihine göre CR1) ya da "iid".
+    Dönüş: {"coef": katsayı tablosu, "wald": terim başına ortak test}
+    """
+    fe = list(spec.get("fe", []))
+    df = ctx["df"]
+    n = len(df)
+
+    names, cols, term_of = [], [], []
+    if not fe:
+        names.append("Intercept")
+        cols.append(np.ones(n))
+        term_of.append("Intercept")
+    for term in spec["terms"]:
+        t_names, t_cols = _term_columns(ctx, term)
+        names += t_names
+        cols += [_within(ctx, fe, name, c) for name, c in zip(t_names, t_cols)]
+        term_of += [term] * len(t_names)
+
+    y = _within(ctx, fe, ctx["y"], df[ctx["y"]].to_numpy(dtype=np.float64))
+    X = np.column_stack(cols)
+
+    # FE tarafından yutulan (arındırma sonrası ~0) kolonlar tahmin edilemez
+    scale = np.sqrt((X ** 2).sum(axis=0))
+    keep = scale > 1e-8 * np.sqrt(n)
+    Xk = X[:, keep]
+    k = Xk.shape[1]
+
+    XtX_inv = np.linalg.inv(Xk.T @ Xk)
+    beta = XtX_inv @ (Xk.T @ y)
+    resid = y - Xk @ beta
+
+    # FE'lerin yuttuğu serbestlik derecesi (sabit terim dahil)
+    dof_fe = sum(len(_codes(ctx, c)[1]) for c in fe) - max(len(fe) - 1, 0)
+    cl_codes, _, cl_counts = ctx["cluster"]
+    n_clusters = len(cl_counts)
+
+    if cov == "cluster":
+        scores = Xk * resid[:, None]
+        S = np.column_stack([np.bincount(cl_codes, weights=scores[:, j], minlength=n_clusters)
+                             for j in range(k)])
+        # Küçük örnek düzeltmesi FE serbestlik derecelerini de sayar (dummy
+        # kolonlu OLS + cluster ile aynı sonuç; muhafazakâr seçim)
+        adj = n_clusters / (n_clusters - 1) * (n - 1) / (n - k - dof_fe)
+        V = adj * XtX_inv @ (S.T @ S) @ XtX_inv
+        df_resid = n_clusters - 1
+    elif cov == "iid":
+        df_resid = n - k - dof_fe
+        V = XtX_inv * (resid @ resid) / df_resid
+    else:
+        raise ValueError(f"Bilinmeyen kovaryans türü: {cov}")
+
+    se = np.sqrt(np.diag(V))
+    coef = pd.DataFrame({
+        "spec": spec["name"],
+        "term": np.asarray(term_of)[keep],
+        "name": np.asarray(names)[keep],
+        "coef": beta,
+        "se": se,
+    })
+    coef["t"] = coef["coef"] / coef["se"]
+    coef["p_value"] = 2 * stats.t.sf(coef["t"].abs(), df_resid)
+    coef["n_obs"] = n
+    coef["n_clusters"] = n_clusters if cov == "cluster" else np.nan
+
+    wald = []
+    for term in spec["terms"]:
+        idx = np.flatnonzero(coef["term"].to_numpy() == term)
+        if len(idx) == 0:
+            continue
+        b = beta[idx]
+        F = b @ np.linalg.solve(V[np.ix_(idx, idx)], b) / len(idx)
+        wald.append({"spec": spec["name"], "term": term, "df": len(idx),
+                     "F": F, "p_value": stats.f.sf(F, len(idx), df_resid)})
+
+    if (~keep).any():
+        dropped = ", ".join(np.asarray(names)[~keep])
+        print(f"  [WARN] {spec['name']}: FE ile çakışan kolonlar atlandı: {dropped}")
+
+    return {"coef": coef, "wald": pd.DataFrame(wald)}
+
+
+def fit_specs(panel, specs=DEFAULT_SPECS, y="delta_stress",
+              cluster="event_date", cov="cluster"):
+    """
+    Spesifikasyon listesini ortak bağlamla çözer.
+    Dönüş: (tüm katsayılar, tüm terim testleri) DataFrame'leri
+    """
+    ctx = panel if isinstance(panel, dict) else prepare_panel(panel, y, cluster)
+
+    coefs, walds = [], []
+    for spec in specs:
+        t0 = time.perf_counter()
+        res = fit_spec(ctx, spec, cov=cov)
+        print(f"[INFO] {spec['name']}: {len(res['coef'])} katsayı, "
+              f"{time.perf_counter() - t0:.3f} s")
+        coefs.append(res["coef"])
+        walds.append(res["wald"])
+
+    return pd.concat(coefs, ignore_index=True), pd.concat(walds, ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Panel regresyon spesifikasyonları")
+    parser.add_argument("--province", action="store_true",
+                        help="Bölge paneli yerine il × keyword panelini kullan")
+    parser.add_argument("--cov", choices=["cluster", "iid"], default="cluster")
+    args = parser.parse_args()
+
+    if args.province:
+        panel = read_table("province_panel", "province_event_panel.parquet")
+        specs = DEFAULT_SPECS + [
+            {"name": "prov_twfe_exposure", "fe": ["province", "event"],
+             "terms": ["exposure", "C(region7):C(event_type)"]},
+        ]
+    else:
+        panel = read_table("panel", "event_region_stress_panel.parquet")
+        specs = DEFAULT_SPECS
+
+    t0 = time.perf_counter()
+    panel = attach_covariates(panel)
+    coef, wald = fit_specs(panel, specs, cov=args.cov)
+    print(f"[INFO] {len(panel):,} satır, {len(specs)} spesifikasyon: "
+          f"{time.perf_counter() - t0:.2f} s")
+
+    print("\n--- Terim testleri ---")
+    print(wald)
+    print("\n--- Katsayılar ---")
+    print(coef.head(30))
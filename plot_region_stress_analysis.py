@@ -1,14 +1,68 @@
+"""
+plot_region_stress_analysis.py
+
+Amaç:
+- Event paneli ve haftalık bölge indeksi için figürler
+- Etkileşimli kullanımda figürler ekranda gösterilir (plt.show)
+- --out-dir verilirse render_all ile ekran açılmadan (Agg backend) tüm
+  figürler istenen formatlarda (png / svg / pdf) + tek bir çok sayfalı
+  Graphs.pdf olarak yazılır; figürler process havuzunda paralel çizilir
+- Veri değişmediyse (hash aynıysa) figürler yeniden çizilmez
+
+Çalıştırma:
+    python plot_region_stress_analysis.py
+    python plot_region_stress_analysis.py --out-dir figures --formats png svg pdf
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from matplotlib.backends.backend_pdf import PdfPages
+
+from stress_metrics import count, instrument, record, stage
+from stress_store import read_table
+
+
+def load_panel(panel_file="event_region_stress_panel.parquet"):
+    return read_table("panel", panel_file)
+
 
-def load_panel(panel_file="event_region_stress_panel.csv"):
-    df = pd.read_csv(panel_file)
-    df["event_date"] = pd.to_datetime(df["event_date"])
-    return df
+def load_region(region_file="region_stress_index_weekly.parquet"):
+    return read_table("region_index", region_file)
 
 
-def plot_delta_stress_by_region(df):
+def _finish(out_file):
+    # out_file verilirse figürü kaydedip kapatır, yoksa ekranda gösterir.
+    # out_file bir PdfPages ise figür o PDF'e yeni sayfa olarak eklenir.
+    if out_file is None:
+        plt.show()
+    elif isinstance(out_file, PdfPages):
+        out_file.savefig()
+        plt.close()
+    else:
+        plt.savefig(out_file, dpi=150)
+        plt.close()
+
+
+def plot_region_index(region, out_file=None):
+    plt.figure(figsize=(12, 6))
+    for reg in sorted(region["region7"].unique()):
+        sub = region[region["region7"] == reg]
+        plt.plot(sub["date"], sub["stress_index"], label=reg, alpha=0.8)
+    plt.title("7 Bölge İçin Haftalık Stres İndeksi (Google Trends)")
+    plt.xlabel("Tarih")
+    plt.ylabel("Stres İndeksi (z-score ortalaması)")
+    plt.legend()
+    plt.tight_layout()
+    _finish(out_file)
+
+
+def plot_delta_stress_by_region(df, out_file=None):
     plt.figure(figsize=(12, 6))
     sns.boxplot(data=df, x="region7", y="delta_stress")
     plt.axhline(0, color="black", linestyle="--", linewidth=1)
@@ -16,11 +70,11 @@ def plot_delta_stress_by_region(df):
     plt.ylabel("Δ Stress Index")
     plt.xlabel("Region")
     plt.tight_layout()
-    plt.show()
+    _finish(out_file)
 
 
-def plot_delta_stress_bar(df):
-    region_avg = df.groupby("region7")["delta_stress"].mean().reset_index()
+def plot_delta_stress_bar(df, out_file=None):
+    region_avg = df.groupby("region7", observed=True)["delta_stress"].mean().reset_index()
 
     plt.figure(figsize=(10, 5))
     sns.barplot(data=region_avg, x="region7", y="delta_stress")
@@ -29,38 +83,147 @@ def plot_delta_stress_bar(df):
     plt.ylabel("Mean Δ Stress")
     plt.xlabel("Region")
     plt.tight_layout()
-    plt.show()
+    _finish(out_file)
 
 
-def plot_event_timeline(df):
+def plot_event_timeline(df, out_file=None, max_labels=60):
     plt.figure(figsize=(14, 4))
     plt.scatter(df["event_date"], df["delta_stress"], c="red", alpha=0.7)
     plt.axhline(0, color="black", linestyle="--")
 
-    for _, row in df.iterrows():
-        plt.text(row["event_date"], row["delta_stress"],
-                 row["event_type"], fontsize=8, alpha=0.6)
+    # Etiketler event başına bir tane (bölge satırları aynı etiketi tekrar
+    # etmesin), en büyük Δ noktasında; çok event varsa en uç max_labels tanesi
+    labels = (
+        df.dropna(subset=["delta_stress"])
+        .groupby(["event_date", "event_type"], observed=True)["delta_stress"]
+        .max()
+        .reset_index()
+    )
+    if len(labels) > max_labels:
+        labels = labels.loc[labels["delta_stress"].abs().nlargest(max_labels).index]
+
+    for row in labels.itertuples(index=False):
+        plt.text(row.event_date, row.delta_stress,
+                 row.event_type, fontsize=8, alpha=0.6)
 
     plt.title("Event Timeline with Δ Stress")
     plt.ylabel("Δ Stress")
     plt.xlabel("Event Date")
     plt.tight_layout()
-    plt.show()
+    _finish(out_file)
 
 
-def plot_fx_vs_quake(df):
+def plot_fx_vs_quake(df, out_file=None):
     plt.figure(figsize=(8, 5))
     sns.boxplot(data=df, x="event_type", y="delta_stress")
     plt.title("Δ Stress: Earthquakes vs FX Shocks")
     plt.axhline(0, color="black", linestyle="--")
     plt.tight_layout()
-    plt.show()
+    _finish(out_file)
+
+
+# --------------------------
+# Toplu (headless) çizim
+# --------------------------
+
+# Dosya adı -> (çizim fonksiyonu, veri: "panel" ya da "region")
+FIGURES = {
+    "box_plot": (plot_delta_stress_by_region, "panel"),
+    "AverageStressByRegion": (plot_delta_stress_bar, "panel"),
+    "EventTimelineDeltaStress": (plot_event_timeline, "panel"),
+    "EarthquakesvsFX": (plot_fx_vs_quake, "panel"),
+    "WeeklyStressFigure": (plot_region_index, "region"),
+}
+
+
+def _render_task(names, data, out_path):
+    # İşçi süreçte: ekran backend'i olmadan çiz
+    plt.switch_backend("Agg")
+    with stage(f"plot:{os.path.basename(out_path)}"):
+        if out_path.endswith(".pdf") and len(names) > 1:
+            with PdfPages(out_path) as pdf:
+                for name in names:
+                    fn, kind = FIGURES[name]
+                    fn(data[kind], out_file=pdf)
+        else:
+            fn, kind = FIGURES[names[0]]
+            fn(data[kind], out_file=out_path)
+    return out_path
+
+
+def _data_hash(data, formats, pdf_file):
+    parts = [str(sorted(formats)), str(pdf_file)]
+    for kind in sorted(data):
+        hashed = pd.util.hash_pandas_object(data[kind], index=False)
+        parts.append(f"{kind}:{hashed.sum()}:{len(hashed)}")
+    return "|".join(parts)
+
+
+@instrument("render_all")
+def render_all(panel, region=None, out_dir=".", formats=("png",),
+               pdf_file="Graphs.pdf", workers=None, force=False):
+    """
+    Tüm figürleri plt.show() çağırmadan dosyalara yazar.
+
+    - formats:  her figür için yazılacak uzantılar (png / svg / pdf)
+    - pdf_file: tüm figürleri sayfa sayfa içeren tek PDF (None ise yazılmaz)
+    - Figürler process havuzunda paralel çizilir
+    - Panel / bölge verisi ve ayarlar değişmediyse (hash aynıysa) ve çıktılar
+      duruyorsa hiçbir şey çizilmez; force=True ile zorlanır
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    data = {"panel": panel}
+    if region is not None:
+        data["region"] = region
+    names = [n for n, (_, kind) in FIGURES.items() if kind in data]
+
+    tasks = [([n], os.path.join(out_dir, f"{n}.{ext}")) for n in names for ext in formats]
+    if pdf_file is not None:
+        tasks.append((names, os.path.join(out_dir, pdf_file)))
+    outputs = [path for _, path in tasks]
+    record(rows_in=sum(len(d) for d in data.values()), rows_out=len(outputs))
+
+    stamp_file = os.path.join(out_dir, ".render_hash.json")
+    stamp = _data_hash(data, formats, pdf_file)
+    if not force and os.path.exists(stamp_file) and all(os.path.exists(p) for p in outputs):
+        with open(stamp_file, encoding="utf-8") as f:
+            if json.load(f).get("hash") == stamp:
+                count("cache_hit")
+                print(f"[INFO] Veri değişmedi, figürler çizilmedi ({out_dir}).")
+                return outputs
+
+    count("cache_miss")
+    print(f"[INFO] {len(tasks)} çıktı çiziliyor -> {out_dir}")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_render_task, task_names, data, path)
+                   for task_names, path in tasks]
+        for fut in futures:
+            print(f"  [OK] {fut.result()}")
+
+    with open(stamp_file, "w", encoding="utf-8") as f:
+        json.dump({"hash": stamp}, f)
+
+    return outputs
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bölgesel stres figürleri")
+    parser.add_argument("--out-dir", default=None,
+                        help="Verilirse figürler ekrana değil bu klasöre yazılır")
+    parser.add_argument("--formats", nargs="+", default=["png"],
+                        choices=["png", "svg", "pdf"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
     df = load_panel()
 
-    plot_delta_stress_by_region(df)
-    plot_delta_stress_bar(df)
-    plot_event_timeline(df)
-    plot_fx_vs_quake(df)
+    if args.out_dir is not None:
+        render_all(df, load_region(), out_dir=args.out_dir, formats=args.formats,
+                   workers=args.workers, force=args.force)
+    else:
+        plot_delta_stress_by_region(df)
+        plot_delta_stress_bar(df)
+        plot_event_timeline(df)
+        plot_fx_vs_quake(df)
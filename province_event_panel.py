@@ -0,0 +1,184 @@
+"""
+province_event_panel.py
+
+Amaç:
+- Event panelini region7 yerine il × keyword düzeyinde kurar
+  (81 il × event × 5 keyword; bölge paneline göre ~100 kat hücre)
+- Doğrudan google_trends_province_timeseries tablosundan, il + keyword
+  z-score'ları üzerinden pre/post ortalamaları ve delta_stress hesaplar
+- Her satıra maruziyet (exposure) ağırlığı ekler:
+    * deprem: o günün en büyük depreminin merkez üssüne il merkezinin
+      uzaklığından (distance) ya da kaba bir şiddet azalımından (intensity);
+      "en büyük deprem" event günlerini üreten katalogdan (mag_min +
+      derinlik filtresi, isteğe bağlı declustering) seçilir
+    * kur şoku vb. ulusal event'ler: tüm iller için 1
+- Hesap (tarih × [il·keyword]) matrisi üzerinde kümülatif toplamlarla toplu
+  yapılır (analyze_region_stress.build_prefix); metin kolonları kategorik,
+  sayılar float32 tutulur
+
+Çalıştırma:
+    python province_event_panel.py
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from analyze_region_stress import build_prefix, window_means
+from build_event_dates import DEPTH_MAX, DEPTH_MIN, MAG_MIN
+from build_region_stress_index import VALUE_COLS, province_array, zscore_array
+from earthquake_events import chord_to_km, earthquake_events, load_provinces, to_xyz
+from stress_store import read_table, write_table
+
+
+DECAY_KM = 100.0
+
+
+# --------------------------------------------------
+# Maruziyet ağırlıkları
+# --------------------------------------------------
+
+def epicenters_by_day(eq_file="earthquake.csv", mag_min=MAG_MIN, depth_min=DEPTH_MIN,
+                      depth_max=DEPTH_MAX, decluster=False):
+    """
+    Her gün için en büyük depremin merkez üssü, magnitüdü ve derinliği.
+    Seçim build_event_dates ile aynı filtreden (mag_min, derinlik aralığı,
+    decluster) geçen depremler arasından yapılır; aksi hâlde aynı gün
+    filtre dışı (ör. 40 km'den derin) daha büyük bir deprem merkez üssü olurdu.
+    """
+    cat = earthquake_events(eq_file, mag_min=mag_min, depth_min=depth_min,
+                            depth_max=depth_max, decluster=decluster)
+    cat["event_date"] = cat["time"].dt.normalize()
+    idx = cat.groupby("event_date")["Magnitude"].idxmax()
+    return cat.loc[idx, ["event_date", "Latitude", "Longitude", "Magnitude", "Depth"]] \
+              .set_index("event_date")
+
+
+def exposure_weights(events, province_lat, province_lon, epicenters,
+                     method="distance", decay_km=DECAY_KM):
+    """
+    (n_events, n_provinces) maruziyet ağırlığı ve mesafe (km) matrisi.
+
+    - distance:  w = exp(-d / decay_km)
+    - intensity: w = max(0, M - 3·log10(R / 10 km)) / M, R = √(d² + derinlik²),
+                 R en az 10 km. Kalibre edilmiş bir azalım modeli değil; büyük
+                 depremin etkisinin daha uzağa yayılmasını kabaca yansıtır.
+    Deprem dışı event'lerde (ve merkez üssü bulunamayan günlerde) w = 1, d = NaN.
+    """
+    n_events, n_prov = len(events), len(province_lat)
+    weight = np.ones((n_events, n_prov), dtype=np.float32)
+    dist = np.full((n_events, n_prov), np.nan, dtype=np.float32)
+
+    ev_day = pd.to_datetime(events["event_date"]).dt.normalize()
+    is_eq = (events["event_type"].astype(str) == "earthquake").to_numpy() & \
+        ev_day.isin(epicenters.index).to_numpy()
+    if not is_eq.any():
+        return weight, dist
+
+    epi = epicenters.loc[ev_day[is_eq]]
+    xyz_e = to_xyz(epi["Latitude"], epi["Longitude"])
+    xyz_p = to_xyz(province_lat, province_lon)
+    d = chord_to_km(np.linalg.norm(xyz_e[:, None, :] - xyz_p[None, :, :], axis=-1))
+
+    if method == "distance":
+        w = np.exp(-d / decay_km)
+    elif method == "intensity":
+        mag = epi["Magnitude"].to_numpy()[:, None]
+        depth = epi["Depth"].fillna(10.0).to_numpy()[:, None]
+        r = np.maximum(np.sqrt(d ** 2 + depth ** 2), 10.0)
+        w = np.clip(mag - 3 * np.log10(r / 10.0), 0, None) / mag
+    else:
+        raise ValueError(f"Bilinmeyen exposure yöntemi: {method}")
+
+    weight[is_eq] = w
+    dist[is_eq] = d
+    return weight, dist
+
+
+# --------------------------------------------------
+# Panel
+# --------------------------------------------------
+
+def build_province_event_panel(
+    trends_file="google_trends_province_timeseries.parquet",
+    events_file="event_dates.parquet",
+    eq_file="earthquake.csv",
+    pre_days=30, post_days=30,
+    exposure="distance", decay_km=DECAY_KM,
+    mag_min=MAG_MIN, depth_min=DEPTH_MIN, depth_max=DEPTH_MAX, decluster=False,
+    out_file="province_event_panel.parquet"
+):
+    """
+    Her event × il × keyword için pre_mean, post_mean, delta_stress
+    (il + keyword z-score'u üzerinden) ve exposure ağırlığı.
+    Satır sırası: event → il → keyword. mag_min / depth_* / decluster,
+    events_file'ı üreten build_event_dates ayarlarıyla aynı olmalı.
+    """
+    t0 = time.perf_counter()
+    print(f"\n[INFO] İl paneli oluşturuluyor (pre={pre_days}, post={post_days}, "
+          f"exposure={exposure})...")
+
+    trends = read_table("trends", trends_file)
+    events = read_table("events", events_file)
+
+    arr = province_array(trends, VALUE_COLS)
+    z = zscore_array(arr["values"])                     # (P, K, T)
+    n_prov, n_kw, n_dates = z.shape
+
+    mat = z.reshape(n_prov * n_kw, n_dates).T           # (T, P·K)
+    observed = ~np.isnan(mat)
+    prefix = build_prefix(arr["dates"], np.where(observed, mat, 0.0), observed)
+
+    ev_dates = pd.to_datetime(events["event_date"]).to_numpy()
+    pre_mean, post_mean = window_means(prefix, ev_dates, pre_days, post_days)
+
+    # İl merkezleri (il ismine göre)
+    centroids = load_provinces().set_index("province").reindex(arr["provinces"])
+    weight, dist = exposure_weights(
+        events, centroids["latitude"].to_numpy(), centroids["longitude"].to_numpy(),
+        epicenters_by_day(eq_file, mag_min, depth_min, depth_max, decluster),
+        method=exposure, decay_km=decay_km,
+    )
+
+    n_events = len(events)
+    n_rows = n_events * n_prov * n_kw
+
+    # Kategorik kolonlar doğrudan kodlardan: satır başına metin kopyalanmaz
+    ev_codes = np.repeat(np.arange(n_events), n_prov * n_kw)
+    prov_codes = np.tile(np.repeat(np.arange(n_prov), n_kw), n_events)
+    kw_codes = np.tile(np.arange(n_kw), n_events * n_prov)
+
+    r_idx, regions = pd.factorize(arr["province_region"], sort=True)
+    type_idx, types = pd.factorize(events["event_type"].astype(str), sort=True)
+
+    panel = pd.DataFrame({
+        "event_date": ev_dates[ev_codes],
+        "event_type": pd.Categorical.from_codes(type_idx[ev_codes], types),
+        "province_code": pd.Categorical(centroids["code"].to_numpy())[prov_codes],
+        "province": pd.Categorical.from_codes(prov_codes, arr["provinces"]),
+        "region7": pd.Categorical.from_codes(r_idx[prov_codes], regions),
+        "keyword": pd.Categorical.from_codes(kw_codes, arr["keywords"]),
+        "pre_mean": pre_mean.reshape(-1).astype(np.float32),
+        "post_mean": post_mean.reshape(-1).astype(np.float32),
+        "delta_stress": (post_mean - pre_mean).reshape(-1).astype(np.float32),
+        "exposure": np.repeat(weight, n_kw, axis=1).reshape(-1),
+        "distance_km": np.repeat(dist, n_kw, axis=1).reshape(-1),
+    })
+    assert len(panel) == n_rows
+
+    elapsed = time.perf_counter() - t0
+    mb = panel.memory_usage(deep=True).sum() / 2**20
+    print(f"[INFO] {n_rows:,} satır ({n_events} event × {n_prov} il × {n_kw} keyword), "
+          f"{mb:.1f} MB, {elapsed:.2f} s")
+
+    if out_file is not None:
+        out_file = write_table(panel, "province_panel", out_file, export_csv=False)
+        print(f"[OK] İl paneli kaydedildi: {out_file}")
+
+    return panel
+
+
+if __name__ == "__main__":
+    panel = build_province_event_panel()
+    print(panel.head())
@@ -0,0 +1,218 @@
+"""
+resample_region_stress.py
+
+Amaç:
+- run_anova'daki tek OLS fit'ine ek olarak yeniden örnekleme tabanlı çıkarım:
+    * Event'ler üzerinde blok bootstrap → bölge başına ortalama delta_stress
+      için güven aralığı ve p değeri
+    * Bölge etiketlerinin (event içinde) permütasyon testi → F istatistiği için p değeri
+- Tasarım matrisi (bölge one-hot) bir kez kurulur; her replikasyon statsmodels
+  çağırmadan, B replikasyonluk matris çarpımlarıyla toplu çözülür
+- Replikasyonlar sabit boyutlu parçalara bölünüp process havuzunda çalışır;
+  her parçanın seed'i SeedSequence'tan türetildiği için sonuç işçi sayısından
+  bağımsız ve tekrarlanabilir
+
+Çalıştırma:
+    python resample_region_stress.py
+    python resample_region_stress.py --reps 20000 --jobs 8 --seed 42
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from stress_store import read_table
+
+
+CHUNK_REPS = 1000  # işçiye giden parça başına replikasyon
+
+
+# --------------------------------------------------
+# Tasarım
+# --------------------------------------------------
+
+def build_design(panel):
+    """
+    Paneli (delta_stress NaN olmayan satırlar) event sırasına dizip
+    yeniden örnekleme için gereken dizileri hazırlar.
+
+    Dönen sözlük:
+    - y:        (n,) delta_stress
+    - X:        (n, K) bölge one-hot tasarım matrisi
+    - regions:  K bölge ismi
+    - event:    (n,) event indeksi (0..E-1, kronolojik)
+    - n_events: E
+    """
+    df = (
+        panel.dropna(subset=["delta_stress"])
+        .sort_values(["event_date", "event_type", "region7"], kind="stable")
+        .reset_index(drop=True)
+    )
+
+    r_idx, regions = pd.factorize(df["region7"].astype(str), sort=True)
+    event = df.groupby(["event_date", "event_type"], sort=True, observed=True).ngroup().to_numpy()
+
+    X = np.zeros((len(df), len(regions)))
+    X[np.arange(len(df)), r_idx] = 1.0
+
+    return {
+        "y": df["delta_stress"].to_numpy(dtype=np.float64),
+        "X": X,
+        "regions": list(regions),
+        "event": event,
+        "n_events": int(event.max()) + 1 if len(event) else 0,
+    }
+
+
+def f_statistic(Y, X):
+    """
+    Tek yönlü ANOVA F istatistiği, Y'nin her satırı (replikasyon) için.
+    Y: (B, n), X: (n, K) one-hot. Dönüş: (B,)
+    """
+    n, k = X.shape
+    n_k = X.sum(axis=0)
+    group_sum = Y @ X
+    total = Y.sum(axis=1)
+
+    ss_between = (group_sum ** 2 / n_k).sum(axis=1) - total ** 2 / n
+    ss_total = (Y ** 2).sum(axis=1) - total ** 2 / n
+    ss_within = ss_total - ss_between
+
+    return (ss_between / (k - 1)) / (ss_within / (n - k))
+
+
+# --------------------------------------------------
+# İşçi fonksiyonları (process havuzu için modül seviyesinde)
+# --------------------------------------------------
+
+def _permutation_chunk(design, n_reps, seed, within_events):
+    rng = np.random.default_rng(seed)
+    y, X, event = design["y"], design["X"], design["event"]
+
+    # Event içinde karıştırma: event indeksi + [0, 1) gürültüye göre argsort
+    noise = rng.random((n_reps, len(y)))
+    keys = noise + event if within_events else noise
+    perm = np.argsort(keys, axis=1, kind="stable")
+
+    return f_statistic(y[perm], X)
+
+
+def _bootstrap_chunk(design, n_reps, seed, block_len):
+    rng = np.random.default_rng(seed)
+    y, X, event, n_events = design["y"], design["X"], design["event"], design["n_events"]
+
+    # Hareketli blok bootstrap: ardışık block_len event'lik bloklar çekilir
+    n_blocks = int(np.ceil(n_events / block_len))
+    starts = rng.integers(0, max(n_events - block_len + 1, 1), size=(n_reps, n_blocks))
+    picked = (starts[:, :, None] + np.arange(block_len)).reshape(n_reps, -1)[:, :n_events]
+
+    # Event ağırlıkları (kaç kez seçildi) → satır ağırlıkları
+    counts = np.zeros((n_reps, n_events))
+    np.add.at(counts, (np.arange(n_reps)[:, None], picked), 1.0)
+    W = counts[:, event]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return ((W * y) @ X) / (W @ X)
+
+
+# --------------------------------------------------
+# Testler
+# --------------------------------------------------
+
+def _run_chunks(worker, design, n_reps, seed, n_jobs, **kwargs):
+    sizes = [CHUNK_REPS] * (n_reps // CHUNK_REPS)
+    if n_reps % CHUNK_REPS:
+        sizes.append(n_reps % CHUNK_REPS)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if n_jobs == 1:
+        parts = [worker(design, s, sd, **kwargs) for s, sd in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(worker, design, s, sd, **kwargs)
+                       for s, sd in zip(sizes, seeds)]
+            parts = [f.result() for f in futures]
+
+    return np.concatenate(parts, axis=0)
+
+
+def permutation_test(panel, n_reps=10_000, seed=0, n_jobs=None, within_events=True):
+    """
+    H0: bölge etiketi delta_stress'i etkilemez.
+    Bölge etiketleri (varsayılan: her event'in kendi içinde) karıştırılır,
+    p = (1 + #{F* >= F}) / (1 + B).
+    """
+    design = build_design(panel)
+    n_jobs = n_jobs or os.cpu_count()
+
+    f_obs = f_statistic(design["y"][None, :], design["X"])[0]
+
+    t0 = time.perf_counter()
+    f_null = _run_chunks(_permutation_chunk, design, n_reps, seed, n_jobs,
+                         within_events=within_events)
+    elapsed = time.perf_counter() - t0
+
+    p_val = (1 + np.sum(f_null >= f_obs)) / (1 + n_reps)
+    print(f"[INFO] Permütasyon testi: F={f_obs:.4f}, p={p_val:.4f} "
+          f"({n_reps / elapsed:,.0f} replikasyon/s)")
+
+    return {"F": f_obs, "p_value": p_val, "null": f_null,
+            "reps_per_sec": n_reps / elapsed}
+
+
+def block_bootstrap(panel, n_reps=10_000, seed=0, n_jobs=None,
+                    block_len=5, alpha=0.05):
+    """
+    Event'ler kronolojik sırada block_len uzunluğunda bloklar hâlinde
+    yeniden örneklenir (zamanda çakışan event'lerin bağımlılığı korunur).
+    Bölge başına ortalama delta_stress için yüzdelik güven aralığı ve
+    H0: ortalama = 0 için iki yönlü bootstrap p değeri döner.
+    """
+    design = build_design(panel)
+    n_jobs = n_jobs or os.cpu_count()
+
+    y, X = design["y"], design["X"]
+    observed = (y @ X) / X.sum(axis=0)
+
+    t0 = time.perf_counter()
+    boot = _run_chunks(_bootstrap_chunk, design, n_reps, seed, n_jobs,
+                       block_len=block_len)
+    elapsed = time.perf_counter() - t0
+
+    lo, hi = np.nanpercentile(boot, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+    below = np.nanmean(boot <= 0, axis=0)
+    above = np.nanmean(boot >= 0, axis=0)
+
+    summary = pd.DataFrame({
+        "region7": design["regions"],
+        "mean_delta": observed,
+        "ci_low": lo,
+        "ci_high": hi,
+        "p_value": np.minimum(1.0, 2 * np.minimum(below, above)),
+    })
+
+    print(f"[INFO] Blok bootstrap (blok={block_len} event): "
+          f"{n_reps / elapsed:,.0f} replikasyon/s")
+    print(summary)
+
+    return {"summary": summary, "replicates": boot,
+            "reps_per_sec": n_reps / elapsed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bootstrap / permütasyon çıkarımı")
+    parser.add_argument("--panel", default="event_region_stress_panel.parquet")
+    parser.add_argument("--reps", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--block-len", type=int, default=5)
+    args = parser.parse_args()
+
+    panel = read_table("panel", args.panel)
+    permutation_test(panel, args.reps, args.seed, args.jobs)
+    block_bootstrap(panel, args.reps, args.seed, args.jobs, block_len=args.block_len)
+    print("\n[DONE] Yeniden örnekleme tamamlandı.")
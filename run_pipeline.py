@@ -0,0 +1,441 @@
+"""
+run_pipeline.py
+
+Amaç:
+- collect → build_event_dates → build_region_stress_index → analyze → plot
+  aşamalarını tek giriş noktasından, bağımlılık sırasıyla çalıştırır
+- Her aşama için girdi dosyalarının içeriği, parametreleri (MAG_MIN, DEPTH_MAX,
+  FX_RET_THRESHOLD, pre_days, post_days ...), aşama kodunun kendisi ve
+  üst aşamaların anahtarlarından bir hash (anahtar) üretir
+- Anahtarı değişmeyen aşama tekrar çalışmaz, çıktısı cache klasöründen gelir;
+  örn. sadece pre_days değişirse sadece panel → anova → plot yeniden hesaplanır
+- Cache klasörü boyut sınırını aşarsa en uzun süredir kullanılmayan
+  kayıtlar silinir
+
+Çalıştırma:
+    python run_pipeline.py
+    python run_pipeline.py --pre-days 60 --post-days 30
+    python run_pipeline.py --mag-min 5.0 --no-plots
+    python run_pipeline.py --force index
+    python run_pipeline.py --gaps interpolate
+"""
+
+import argparse
+import ast
+import functools
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+import analyze_region_stress
+import build_event_dates
+import build_region_stress_index
+import collect_trends_provinces
+import stress_metrics as metrics
+from stress_store import read_table, write_table
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+CACHE_DIR = ".pipeline_cache"
+MAX_CACHE_MB = 512
+
+DEFAULT_CONFIG = {
+    # Kaynak dosyalar
+    "eq_file": "earthquake.csv",
+    "fx_file": "USD_TRY Historical Data.csv",
+    "trends_file": "google_trends_province_timeseries.parquet",
+    # Yayınlanan çıktılar
+    "events_file": "event_dates.parquet",
+    "index_file": "region_stress_index_weekly.parquet",
+    "panel_file": "event_region_stress_panel.parquet",
+    "fig_dir": "figures",
+    # Parametreler
+    "collect": False,
+    "kw_list": collect_trends_provinces.KW_LIST,
+    "timeframe": collect_trends_provinces.TIMEFRAME,
+    "mag_min": build_event_dates.MAG_MIN,
+    "depth_min": build_event_dates.DEPTH_MIN,
+    "depth_max": build_event_dates.DEPTH_MAX,
+    "fx_ret_threshold": build_event_dates.FX_RET_THRESHOLD,
+    "decluster": False,
+    "gaps": None,
+    "pre_days": 30,
+    "post_days": 30,
+    "plots": True,
+}
+
+
+# --------------------------------------------------
+# Aşamalar
+# --------------------------------------------------
+# Her aşama:
+# - deps:    üst aşamalar (çıktıları run'a bu sırayla verilir)
+# - files:   içeriği hash'e giren kaynak dosya config anahtarları
+# - params:  hash'e giren parametre config anahtarları
+# - code:    içeriği değişince aşamayı geçersiz kılan kaynak dosyalar; .py
+#            dosyalarının import ettiği repo modülleri (stress_store,
+#            index_spec ...) dolaylı olarak eklenir (bkz. code_closure)
+# - run:     (cfg, *upstream çıktıları) -> çıktı
+# - publish: çıktıyı pipeline'ın normal dosya yoluna yazar (opsiyonel)
+# - volatile: cfg -> bool; True ise aşama cache'e bakmadan her seferinde
+#            çalışır ve anahtarı çalıştıktan sonra (files içeriğiyle)
+#            hesaplanır, ör. --collect ile Trends yeniden çekilirken
+
+def _run_trends(cfg):
+    if cfg["collect"]:
+        return collect_trends_provinces.collect_trends_provinces(
+            out_file=cfg["trends_file"],
+            kw_list=cfg["kw_list"],
+            timeframe=cfg["timeframe"],
+        )
+    return read_table("trends", cfg["trends_file"])
+
+
+def _run_events(cfg):
+    return build_event_dates.build_event_dates(
+        eq_file=cfg["eq_file"],
+        fx_file=cfg["fx_file"],
+        out_file=None,
+        mag_min=cfg["mag_min"],
+        depth_min=cfg["depth_min"],
+        depth_max=cfg["depth_max"],
+        fx_ret_threshold=cfg["fx_ret_threshold"],
+        decluster=cfg["decluster"],
+    )
+
+
+def _run_index(cfg, trends):
+    return build_region_stress_index.region_stress_index(trends, gaps=cfg["gaps"])
+
+
+def _run_panel(cfg, region, events):
+    return analyze_region_stress.build_event_panel(
+        region, events,
+        pre_days=cfg["pre_days"], post_days=cfg["post_days"],
+        out_file=None,
+    )
+
+
+def _run_anova(cfg, panel):
+    return analyze_region_stress.run_anova(panel)
+
+
+def _run_plot(cfg, panel):
+    # Figürler PNG byte'ları olarak cache'lenir, publish ile fig_dir'e yazılır
+    import io
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import plot_region_stress_analysis as plots
+
+    figures = {
+        "delta_stress_by_region.png": plots.plot_delta_stress_by_region,
+        "delta_stress_bar.png": plots.plot_delta_stress_bar,
+        "event_timeline.png": plots.plot_event_timeline,
+        "fx_vs_quake.png": plots.plot_fx_vs_quake,
+    }
+    rendered = {}
+    for name, fn in figures.items():
+        buf = io.BytesIO()
+        fn(panel, out_file=buf)
+        rendered[name] = buf.getvalue()
+    return rendered
+
+
+def _publish_plot(out, cfg):
+    os.makedirs(cfg["fig_dir"], exist_ok=True)
+    for name, data in out.items():
+        with open(os.path.join(cfg["fig_dir"], name), "wb") as f:
+            f.write(data)
+    print(f"[OK] {len(out)} figür '{cfg['fig_dir']}' klasörüne yazıldı.")
+
+
+STAGES = {
+    "trends": {
+        "deps": [],
+        "files": ["trends_file"],
+        "params": ["collect", "kw_list", "timeframe"],
+        "code": ["collect_trends_provinces.py", "data/index_spec.json",
+                 "data/province_centroids.csv"],
+        "run": _run_trends,
+        "publish": None,
+        "volatile": lambda cfg: cfg["collect"],
+    },
+    "events": {
+        "deps": [],
+        "files": ["eq_file", "fx_file"],
+        "params": ["mag_min", "depth_min", "depth_max", "fx_ret_threshold", "decluster"],
+        "code": ["build_event_dates.py", "data/province_centroids.csv"],
+        "run": _run_events,
+        "publish": lambda out, cfg: write_table(out, "events", cfg["events_file"]),
+    },
+    "index": {
+        "deps": ["trends"],
+        "files": [],
+        "params": ["gaps"],
+        "code": ["build_region_stress_index.py", "data/index_spec.json",
+                 "data/province_centroids.csv"],
+        "run": _run_index,
+        "publish": lambda out, cfg: write_table(out, "region_index", cfg["index_file"]),
+    },
+    "panel": {
+        "deps": ["index", "events"],
+        "files": [],
+        "params": ["pre_days", "post_days"],
+        "code": ["analyze_region_stress.py"],
+        "run": _run_panel,
+        "publish": lambda out, cfg: write_table(out, "panel", cfg["panel_file"]),
+    },
+    "anova": {
+        "deps": ["panel"],
+        "files": [],
+        "params": [],
+        "code": ["analyze_region_stress.py"],
+        "run": _run_anova,
+        "publish": lambda out, cfg: print(out),
+    },
+    "plot": {
+        "deps": ["panel"],
+        "files": [],
+        "params": [],
+        "code": ["plot_region_stress_analysis.py"],
+        "run": _run_plot,
+        "publish": _publish_plot,
+    },
+}
+
+
+# --------------------------------------------------
+# Hash'leme
+# --------------------------------------------------
+
+def file_digest(path):
+    """Dosya içeriğinin sha256'sı (collect kapalıyken trends CSV'si de dahil)."""
+    if path.endswith(".parquet") and not os.path.exists(path):
+        path = os.path.splitext(path)[0] + ".csv"
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def code_closure(files):
+    """
+    files + .py dosyalarının import ettiği (fonksiyon içindekiler ve dolaylı
+    olanlar dahil) repo modülleri. Böylece ör. stress_store.read_table
+    değişince onu kullanan tüm aşamalar geçersiz olur.
+    """
+    seen, todo = set(), list(files)
+    while todo:
+        f = todo.pop()
+        if f in seen:
+            continue
+        seen.add(f)
+        if not f.endswith(".py"):
+            continue
+        with open(os.path.join(HERE, f), encoding="utf-8") as fh:
+            tree = ast.parse(fh.read(), f)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module]
+            else:
+                continue
+            for mod in names:
+                local = mod.split(".")[0] + ".py"
+                if os.path.exists(os.path.join(HERE, local)):
+                    todo.append(local)
+    return sorted(seen)
+
+
+def stage_key(name, cfg, upstream_keys):
+    stage = STAGES[name]
+    payload = {
+        "stage": name,
+        "params": {p: cfg[p] for p in stage["params"]},
+        "files": {f: file_digest(cfg[f]) for f in stage["files"]},
+        "code": {f: file_digest(os.path.join(HERE, f)) for f in code_closure(tuple(stage["code"]))},
+        "upstream": upstream_keys,
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def topo_order(targets):
+    """Hedef aşamalar + tüm üst aşamaları, bağımlılık sırasıyla."""
+    order = []
+
+    def visit(name):
+        if name in order:
+            return
+        for dep in STAGES[name]["deps"]:
+            visit(dep)
+        order.append(name)
+
+    for t in targets:
+        visit(t)
+    return order
+
+
+# --------------------------------------------------
+# Cache
+# --------------------------------------------------
+
+def _cache_file(cache_dir, name, key):
+    return os.path.join(cache_dir, f"{name}-{key}.pkl")
+
+
+def _load_manifest(cache_dir):
+    path = os.path.join(cache_dir, "manifest.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, "manifest.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def evict_cache(cache_dir, max_bytes, keep=()):
+    """
+    Cache boyutu max_bytes'ı aşarsa en eski kullanılan (mtime) kayıtları siler.
+    keep içindeki dosyalara (bu çalıştırmada kullanılanlar) dokunulmaz.
+    """
+    entries = []
+    for fname in os.listdir(cache_dir):
+        if not fname.endswith(".pkl"):
+            continue
+        path = os.path.join(cache_dir, fname)
+        st = os.stat(path)
+        entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path in keep:
+            continue
+        os.remove(path)
+        total -= size
+        removed += 1
+
+    if removed:
+        print(f"[CACHE] {removed} kayıt silindi, cache boyutu: {total / 2**20:.1f} MB")
+
+
+# --------------------------------------------------
+# Runner
+# --------------------------------------------------
+
+def run_pipeline(config=None, targets=None, force=(),
+                 cache_dir=CACHE_DIR, max_cache_mb=MAX_CACHE_MB):
+    """
+    targets aşamalarını (varsayılan: hepsi) gerekli üst aşamalarla çalıştırır.
+
+    - force: anahtarı değişmese de yeniden çalışacak aşamalar
+    - Dönüş: {aşama: çıktı}
+    """
+    cfg = {**DEFAULT_CONFIG, **(config or {})}
+    if targets is None:
+        targets = [s for s in STAGES if cfg["plots"] or s != "plot"]
+
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _load_manifest(cache_dir)
+
+    keys, outputs, used = {}, {}, set()
+
+    for name in topo_order(targets):
+        stage = STAGES[name]
+        upstream = [keys[d] for d in stage["deps"]]
+
+        if stage.get("volatile", lambda _: False)(cfg):
+            # Kaynak dış dünyada (ör. Google Trends): her seferinde çalışır,
+            # pickle'lanmaz; anahtar yeni yazılan dosyadan hesaplanır ki alt
+            # aşamalar veri değişince yeniden çalışsın
+            with metrics.stage(f"pipeline:{name}"):
+                print(f"[RUN] {name} (cache'siz)")
+                metrics.count("cache_miss")
+                outputs[name] = stage["run"](cfg, *[outputs[d] for d in stage["deps"]])
+            keys[name] = stage_key(name, cfg, upstream)
+            continue
+
+        key = stage_key(name, cfg, upstream)
+        keys[name] = key
+        path = _cache_file(cache_dir, name, key)
+        used.add(path)
+
+        with metrics.stage(f"pipeline:{name}", key=key):
+            if os.path.exists(path) and name not in force:
+                out = pd.read_pickle(path)
+                os.utime(path)
+                metrics.count("cache_hit")
+                print(f"[CACHE] {name}: değişmedi ({key})")
+            else:
+                print(f"[RUN] {name} ({key})")
+                metrics.count("cache_miss")
+                t0 = time.perf_counter()
+                out = stage["run"](cfg, *[outputs[d] for d in stage["deps"]])
+                pd.to_pickle(out, path)
+                print(f"[RUN] {name} bitti: {time.perf_counter() - t0:.2f} s")
+
+            outputs[name] = out
+
+            if stage["publish"] is not None and manifest.get(name) != key:
+                stage["publish"](out, cfg)
+                manifest[name] = key
+
+    _save_manifest(cache_dir, manifest)
+    evict_cache(cache_dir, max_cache_mb * 2**20, keep=used)
+
+    return outputs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bölgesel stres pipeline'ı")
+    parser.add_argument("--collect", action="store_true",
+                        help="Trends verisini Google'dan yeniden çek")
+    parser.add_argument("--mag-min", type=float)
+    parser.add_argument("--depth-min", type=float)
+    parser.add_argument("--depth-max", type=float)
+    parser.add_argument("--fx-ret-threshold", type=float)
+    parser.add_argument("--decluster", action="store_true",
+                        help="Depremleri Gardner–Knopoff ile ayıkla")
+    parser.add_argument("--gaps", choices=build_region_stress_index.GAP_METHODS,
+                        help="İndekste eksik veri aşaması (boşluk doldurma + kapsam ağırlığı)")
+    parser.add_argument("--pre-days", type=int)
+    parser.add_argument("--post-days", type=int)
+    parser.add_argument("--no-plots", action="store_true")
+    parser.add_argument("--force", nargs="*", default=[], choices=list(STAGES))
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--max-cache-mb", type=float, default=MAX_CACHE_MB)
+    args = parser.parse_args()
+
+    overrides = {
+        k: v for k, v in {
+            "mag_min": args.mag_min,
+            "depth_min": args.depth_min,
+            "depth_max": args.depth_max,
+            "fx_ret_threshold": args.fx_ret_threshold,
+            "gaps": args.gaps,
+            "pre_days": args.pre_days,
+            "post_days": args.post_days,
+        }.items() if v is not None
+    }
+    overrides["collect"] = args.collect
+    overrides["decluster"] = args.decluster
+    overrides["plots"] = not args.no_plots
+
+    run_pipeline(overrides, force=args.force,
+                 cache_dir=args.cache_dir, max_cache_mb=args.max_cache_mb)
+    print("\n[DONE] Pipeline tamamlandı.")
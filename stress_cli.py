@@ -0,0 +1,189 @@
+"""
+stress_cli.py
+
+Amaç:
+- Pipeline adımları için tek giriş noktası; alt komutlar:
+    collect, events, index, panel, anova, plot
+- Bu dosya sadece standart kütüphaneyi import eder. Her alt komutun modülü
+  (ve onun ağır bağımlılıkları: pytrends, statsmodels, matplotlib,
+  seaborn, scipy) sadece o komut çalıştığında import edilir; örneğin
+  `events` matplotlib / statsmodels yüklemez
+- COMMANDS: komut → modül, çalışırken tembel import ettiği paketler (deps)
+  ve o komutta yüklenmemesi gereken paketler (forbidden);
+  benchmark_cli_startup.py soğuk başlangıç süresini ve bu listeyi denetler
+- Verilmeyen seçenekler fonksiyona iletilmez, varsayılanlar modüldeki
+  sabitlerden (MAG_MIN, DEPTH_MAX, ...) gelir
+
+Çalıştırma:
+    python stress_cli.py events --mag-min 5.0 --decluster
+    python stress_cli.py index --indices all
+    python stress_cli.py index --gaps interpolate
+    python stress_cli.py panel --pre-days 60 --post-days 30
+    python stress_cli.py anova
+    python stress_cli.py plot --out-dir figures --formats png pdf
+"""
+
+import argparse
+import importlib
+import sys
+
+
+COMMANDS = {
+    "collect": {
+        "module": "collect_trends_provinces",
+        "help": "Google Trends il serilerini çek (pytrends)",
+        "deps": ["pytrends.request"],
+        "forbidden": ["matplotlib", "seaborn", "statsmodels", "scipy"],
+    },
+    "events": {
+        "module": "build_event_dates",
+        "help": "Deprem + kur şoku event tarihleri",
+        "deps": [],
+        "forbidden": ["matplotlib", "seaborn", "statsmodels", "pytrends", "scipy"],
+    },
+    "index": {
+        "module": "build_region_stress_index",
+        "help": "Bölgesel stres indeksi",
+        "deps": [],
+        "forbidden": ["matplotlib", "seaborn", "statsmodels", "pytrends", "scipy"],
+    },
+    "panel": {
+        "module": "analyze_region_stress",
+        "help": "Event + bölge pre/post paneli",
+        "deps": [],
+        "forbidden": ["matplotlib", "seaborn", "statsmodels", "pytrends", "scipy"],
+    },
+    "anova": {
+        "module": "analyze_region_stress",
+        "help": "Bölgeler arası delta_stress ANOVA",
+        "deps": ["statsmodels.formula.api"],
+        "forbidden": ["matplotlib", "seaborn", "pytrends"],
+    },
+    "plot": {
+        "module": "plot_region_stress_analysis",
+        "help": "Figürleri dosyaya yaz",
+        "deps": [],
+        # seaborn kurulu mu diye sadece statsmodels kök paketini yükler
+        "forbidden": ["statsmodels.api", "statsmodels.formula", "pytrends"],
+    },
+}
+
+
+def load_command(name):
+    """Komutun modülünü import eder (ölçüm için de bu kullanılır)."""
+    return importlib.import_module(COMMANDS[name]["module"])
+
+
+def _given(args, *names):
+    # Sadece komut satırında verilen seçenekler
+    return {n: getattr(args, n) for n in names if getattr(args, n) is not None}
+
+
+# --------------------------------------------------
+# Alt komutlar
+# --------------------------------------------------
+
+def _collect(args):
+    mod = load_command("collect")
+    kwargs = _given(args, "out_file", "max_workers", "rate_per_sec")
+    if args.refresh:
+        mod.refresh_trends_provinces(**kwargs)
+    else:
+        mod.collect_trends_provinces(**kwargs)
+
+
+def _events(args):
+    mod = load_command("events")
+    mod.build_event_dates(**_given(args, "eq_file", "fx_file", "out_file", "mag_min",
+                                   "depth_min", "depth_max", "fx_ret_threshold"),
+                          decluster=args.decluster)
+
+
+def _index(args):
+    mod = load_command("index")
+    indices = "all" if args.indices == ["all"] else args.indices
+    mod.build_region_stress_index(**_given(args, "in_file", "out_file", "chunksize", "gaps"),
+                                  indices=indices)
+
+
+def _panel(args):
+    mod = load_command("panel")
+    region, events = mod.load_data(**_given(args, "region_file", "events_file"))
+    mod.build_event_panel(region, events, **_given(args, "pre_days", "post_days", "out_file"))
+
+
+def _anova(args):
+    mod = load_command("anova")
+    from stress_store import read_table
+
+    mod.run_anova(read_table("panel", args.panel_file))
+
+
+def _plot(args):
+    mod = load_command("plot")
+    panel = mod.load_panel(**_given(args, "panel_file"))
+    mod.render_all(panel, mod.load_region(), out_dir=args.out_dir, formats=args.formats,
+                   workers=args.workers, force=args.force)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="stress_cli", description="Bölgesel stres pipeline'ı")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add(name, run):
+        p = sub.add_parser(name, help=COMMANDS[name]["help"])
+        p.set_defaults(run=run)
+        return p
+
+    p = add("collect", _collect)
+    p.add_argument("--out-file")
+    p.add_argument("--max-workers", type=int)
+    p.add_argument("--rate-per-sec", type=float)
+    p.add_argument("--refresh", action="store_true", help="Sadece son dönemi güncelle")
+
+    p = add("events", _events)
+    p.add_argument("--eq-file")
+    p.add_argument("--fx-file")
+    p.add_argument("--out-file")
+    p.add_argument("--mag-min", type=float)
+    p.add_argument("--depth-min", type=float)
+    p.add_argument("--depth-max", type=float)
+    p.add_argument("--fx-ret-threshold", type=float)
+    p.add_argument("--decluster", action="store_true")
+
+    p = add("index", _index)
+    p.add_argument("--in-file")
+    p.add_argument("--out-file")
+    p.add_argument("--chunksize", type=int)
+    p.add_argument("--indices", nargs="+", help='index_spec içindeki isimler ya da "all"')
+    p.add_argument("--gaps", choices=["interpolate", "lowrank"],
+                   help="Eksik veri aşaması (boşluk doldurma + kapsam ağırlığı)")
+
+    p = add("panel", _panel)
+    p.add_argument("--region-file")
+    p.add_argument("--events-file")
+    p.add_argument("--out-file")
+    p.add_argument("--pre-days", type=int)
+    p.add_argument("--post-days", type=int)
+
+    p = add("anova", _anova)
+    p.add_argument("--panel-file", default="event_region_stress_panel.parquet")
+
+    p = add("plot", _plot)
+    p.add_argument("--panel-file")
+    p.add_argument("--out-dir", default="figures")
+    p.add_argument("--formats", nargs="+", default=["png"], choices=["png", "svg", "pdf"])
+    p.add_argument("--workers", type=int)
+    p.add_argument("--force", action="store_true")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.run(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
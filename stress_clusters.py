@@ -0,0 +1,408 @@
+"""
+stress_clusters.py
+
+Amaç:
+- Bölgeleri (7 bölge, haftalık indeks) ya da illeri (81 il × keyword,
+  Trends serileri) tüm zaman serisi üzerinden kümeler; notebook'taki
+  ortalama / maksimum / std + K-Means hücresinin yerini alır
+- Uzaklıklar:
+    * corr: 1 - Pearson korelasyonu (kanal başına, ortak gözlemler
+            üzerinden; kanallar arası ortalama)
+    * dtw:  Dynamic Time Warping (kanallar birlikte, isteğe bağlı
+            Sakoe-Chiba bandı); eksik kanal farkı 0 sayılır
+- Uzaklık matrisi cache'lenir (.npz). Yeni haftalar geldiğinde sadece
+  yeni tarihlerin katkısı eklenir:
+    * corr: çiftler için n, Σx, Σx², Σxy toplamları tutulur; yeni
+            sütunlar tek matris çarpımıyla eklenir
+    * dtw:  her çiftin birikimli maliyet matrisinin son satırı ve son
+            sütunu tutulur; DP sadece yeni satır / sütunlar için koşar
+  Seriler kanal başına ortalama / std ile normalize edilir; bu değerler
+  cache kurulurken dondurulur (--rebuild yeniler). Eski tarihlerin
+  değerleri değiştiyse (ör. Trends yeniden ölçeklediyse) cache otomatik
+  olarak baştan kurulur
+- Çift döngüsü yok: hesaplar tüm çiftler üzerinde vektörize, Python
+  döngüsü sadece zaman ekseninde (dtw)
+- Kümeleme: ortalama bağlantılı hiyerarşik kümeleme (scipy) +
+  silhouette skoru
+- Sonuç: data/region_clusters_{corr,dtw}.csv (region, mean_stress,
+  max_stress, std_stress, cluster) ya da data/province_clusters_{corr,dtw}.csv;
+  notebook'un K-Means sonucu olan data/region_clusters.csv'ye dokunulmaz
+
+Çalıştırma:
+    python stress_clusters.py
+    python stress_clusters.py --level province --metric dtw --window 8 --k 4
+"""
+
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.spatial.distance import squareform
+
+from build_region_stress_index import VALUE_COLS, province_array
+from stress_metrics import count, instrument, record
+from stress_store import read_table, write_table
+
+
+N_CLUSTERS = 3
+LINKAGE = "average"
+CACHE_FILE = "stress_cluster_{level}_{metric}.npz"
+DTW_BLOCK = 20_000  # aynı anda işlenen çift sayısı (bellek sınırı)
+
+
+# --------------------------------------------------
+# Seriler
+# --------------------------------------------------
+
+def unit_series(level="region", index_file=None, trends_file=None, value_cols=VALUE_COLS):
+    """
+    Kümelenecek birimlerin (n_unit, n_channel, n_date) dizisi.
+
+    - region:   birim = region7, kanal = indeks kolonları (stress_index, ...)
+    - province: birim = il, kanal = keyword (ham Trends değerleri)
+    """
+    if level == "region":
+        df = read_table("region_index", index_file)
+        channels = [c for c in df.columns if c not in ("date", "region7")]
+        arr = province_array(df.assign(province=df["region7"]), channels)
+    elif level == "province":
+        df = read_table("trends", trends_file)
+        arr = province_array(df, value_cols)
+    else:
+        raise ValueError(f"Bilinmeyen seviye: {level}")
+
+    return {
+        "level": level,
+        "units": arr["provinces"].astype(str),
+        "unit_region": np.asarray(arr["province_region"]).astype(str),
+        "channels": list(arr["keywords"]),
+        "dates": arr["dates"],
+        "values": arr["values"],
+    }
+
+
+def _normalize(values, loc, scale):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = (values - loc) / scale
+    return x
+
+
+def _norm_params(values):
+    # Kanal başına konum / ölçek; cache ile birlikte dondurulur
+    with np.errstate(invalid="ignore"):
+        loc = np.nanmean(values, axis=-1, keepdims=True)
+        scale = np.nanstd(values, axis=-1, keepdims=True)
+    loc = np.nan_to_num(loc)
+    scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+    return loc, scale
+
+
+def _digest(values):
+    return hashlib.sha256(np.ascontiguousarray(values).tobytes()).hexdigest()
+
+
+# --------------------------------------------------
+# Korelasyon uzaklığı (toplanabilir istatistikler)
+# --------------------------------------------------
+
+def corr_stats(x):
+    """
+    x: (N, C, T) normalize seriler. Kanal başına (C, N, N) çift toplamları:
+    n (ortak gözlem), sx (i'nin ortak gözlemlerdeki toplamı), sxx, sxy.
+    Tarihler üzerinde toplanabilir: stats(A ∪ B) = stats(A) + stats(B).
+    """
+    obs = ~np.isnan(x)
+    m = obs.transpose(1, 0, 2).astype(np.float64)          # (C, N, T)
+    x0 = np.where(obs, x, 0.0).transpose(1, 0, 2)
+    mt = m.transpose(0, 2, 1)
+    return {
+        "n": m @ mt,
+        "sx": x0 @ mt,
+        "sxx": (x0 * x0) @ mt,
+        "sxy": x0 @ x0.transpose(0, 2, 1),
+    }
+
+
+def corr_distance(stats):
+    """1 - kanallar arası ortalama korelasyon; ortak gözlem < 2 ise NaN kanal."""
+    n, sx, sxx, sxy = stats["n"], stats["sx"], stats["sxx"], stats["sxy"]
+    sy = sx.transpose(0, 2, 1)
+    syy = sxx.transpose(0, 2, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        corr = cov / np.sqrt(var)
+    corr[(n < 2) | ~np.isfinite(corr)] = np.nan
+
+    # Tanımsız kanallar ortalamaya girmez; hiç kanal yoksa korelasyon 0
+    valid = ~np.isnan(corr)
+    n_valid = valid.sum(axis=0)
+    mean_corr = np.where(valid, corr, 0.0).sum(axis=0) / np.maximum(n_valid, 1)
+    dist = 1.0 - np.clip(mean_corr, -1.0, 1.0)
+    np.fill_diagonal(dist, 0.0)
+    return dist
+
+
+# --------------------------------------------------
+# DTW uzaklığı (artımlı)
+# --------------------------------------------------
+
+def dtw_extend(a, b, t0=0, last_row=None, last_col=None, window=None):
+    """
+    Çiftler (P) üzerinde vektörize DTW. a, b: (P, C, T) seriler.
+
+    t0 > 0 ise ilk t0 tarihin birikimli maliyeti zaten hesaplanmıştır:
+    last_row = D[t0-1, :t0], last_col = D[:t0, t0-1] verilir ve sadece
+    yeni satır / sütunlar hesaplanır (O(P · T · yeni tarih)).
+
+    Dönüş: (uzaklık (P,), yeni last_row (P, T), yeni last_col (P, T))
+    """
+    p, _, t = a.shape
+    inf = np.full(p, np.inf)
+
+    def cost(i, cols):
+        d = a[:, :, i, None] - b[:, :, cols]
+        d = np.where(np.isnan(d), 0.0, d)
+        return (d * d).sum(axis=1)                         # (P, len(cols))
+
+    def band(i, j):
+        return window is None or abs(i - j) <= window
+
+    new_col = np.full((p, t), np.inf)
+    prev_row = None
+
+    # 1) Eski satırlar (i < t0) için yeni sütunlar (j ≥ t0)
+    if t0 > 0:
+        cols = np.arange(t0, t)
+        prev = np.full((p, t - t0), np.inf)                # D[i-1, t0:]
+        for i in range(t0):
+            c = cost(i, cols)
+            row = np.empty((p, t - t0))
+            left = last_col[:, i]                          # D[i, t0-1]
+            diag = last_col[:, i - 1] if i > 0 else inf    # D[i-1, t0-1]
+            for k, j in enumerate(cols):
+                best = np.minimum(np.minimum(prev[:, k], diag), left)
+                row[:, k] = c[:, k] + best if band(i, j) else np.inf
+                diag = prev[:, k]
+                left = row[:, k]
+            prev = row
+            new_col[:, i] = row[:, -1]
+        prev_row = np.concatenate([last_row, prev], axis=1)
+
+    # 2) Yeni satırlar (i ≥ t0), tüm sütunlar
+    cols = np.arange(t)
+    for i in range(t0, t):
+        c = cost(i, cols)
+        if prev_row is None:
+            # Sanal -1. satır: D[-1, -1] = 0, geri kalanı sonsuz
+            up = np.full((p, t), np.inf)
+            up_left = np.full((p, t), np.inf)
+            up_left[:, 0] = 0.0
+        else:
+            up = prev_row
+            up_left = np.concatenate([inf[:, None], prev_row[:, :-1]], axis=1)
+        vert = np.minimum(up, up_left)
+
+        row = np.empty((p, t))
+        left = inf
+        for j in range(t):
+            row[:, j] = c[:, j] + np.minimum(vert[:, j], left) if band(i, j) else np.inf
+            left = row[:, j]
+        new_col[:, i] = row[:, -1]
+        prev_row = row
+
+    return np.sqrt(prev_row[:, -1]), prev_row, new_col
+
+
+def dtw_distance(x, window=None, block=DTW_BLOCK, state=None):
+    """
+    x: (N, C, T). Tüm i < j çiftleri için DTW; state (önceki last_row /
+    last_col ve t0) verilirse artımlı. Dönüş: (uzaklık matrisi, yeni state)
+    """
+    n, _, t = x.shape
+    iu, ju = np.triu_indices(n, k=1)
+    t0 = 0 if state is None else int(state["t0"])
+
+    dist = np.zeros(len(iu))
+    rows = np.empty((len(iu), t))
+    cols = np.empty((len(iu), t))
+    for s in range(0, len(iu), block):
+        sl = slice(s, s + block)
+        lr = state["last_row"][sl] if state is not None else None
+        lc = state["last_col"][sl] if state is not None else None
+        dist[sl], rows[sl], cols[sl] = dtw_extend(x[iu[sl]], x[ju[sl]], t0, lr, lc, window)
+
+    mat = np.zeros((n, n))
+    mat[iu, ju] = dist
+    mat[ju, iu] = dist
+    return mat, {"t0": t, "last_row": rows, "last_col": cols}
+
+
+# --------------------------------------------------
+# Cache'li uzaklık matrisi
+# --------------------------------------------------
+
+def distance_matrix(series, metric="corr", window=None, cache_file=None, rebuild=False):
+    """
+    Birimler arası (N, N) uzaklık matrisi. cache_file varsa ve birimler /
+    kanallar / ayarlar aynıysa, cache'teki tarihler güncel tarihlerin
+    başıysa ve o tarihlerin değerleri değişmediyse sadece yeni tarihler işlenir.
+    """
+    values = series["values"]
+    dates = series["dates"].asi8
+    cache = None if rebuild or not cache_file else _load_cache(cache_file)
+
+    t0 = 0
+    if cache is not None:
+        t0 = len(cache["dates"])
+        same = (str(cache["metric"]) == metric
+                and int(cache["window"]) == (-1 if window is None else window)
+                and np.array_equal(cache["units"], series["units"])
+                and np.array_equal(cache["channels"], series["channels"])
+                and t0 <= len(dates)
+                and np.array_equal(cache["dates"], dates[:t0])
+                and str(cache["digest"]) == _digest(values[:, :, :t0]))
+        if not same:
+            print("[WARN] Uzaklık cache'i güncel verilerle uyuşmuyor, baştan hesaplanıyor.")
+            cache, t0 = None, 0
+
+    if cache is not None:
+        loc, scale = cache["loc"], cache["scale"]
+        count("cache_hit")
+        print(f"[INFO] Uzaklık cache'i kullanılıyor: {t0} tarih hazır, "
+              f"{len(dates) - t0} yeni tarih işlenecek")
+    else:
+        loc, scale = _norm_params(values)
+        count("cache_miss")
+
+    x = _normalize(values, loc, scale)
+
+    if metric == "corr":
+        stats = corr_stats(x[:, :, t0:])
+        if cache is not None:
+            stats = {k: stats[k] + cache[k] for k in stats}
+        dist = corr_distance(stats)
+        extra = stats
+    elif metric == "dtw":
+        state = None
+        if cache is not None and t0 > 0:
+            state = {"t0": t0, "last_row": cache["last_row"], "last_col": cache["last_col"][:, :t0]}
+        if t0 == len(dates) and cache is not None:
+            dist, extra = cache["dist"], {k: cache[k] for k in ("last_row", "last_col")}
+        else:
+            dist, extra = dtw_distance(x, window, state=state)
+            extra.pop("t0")
+    else:
+        raise ValueError(f"Bilinmeyen uzaklık: {metric}")
+
+    if cache_file:
+        _save_cache(cache_file, metric=metric, window=-1 if window is None else window,
+                    units=series["units"], channels=np.asarray(series["channels"], dtype=str),
+                    dates=dates, digest=_digest(values), loc=loc, scale=scale,
+                    dist=dist, **extra)
+    return dist
+
+
+def _load_cache(cache_file):
+    if not os.path.exists(cache_file):
+        return None
+    with np.load(cache_file, allow_pickle=False) as data:
+        return {k: data[k] for k in data.files}
+
+
+def _save_cache(cache_file, **arrays):
+    # Yarım yazılmış dosya kalmasın diye önce geçici dosyaya yaz
+    tmp = cache_file + ".tmp.npz"
+    np.savez(tmp, **{k: np.asarray(v) for k, v in arrays.items()})
+    os.replace(tmp, cache_file)
+
+
+# --------------------------------------------------
+# Kümeleme
+# --------------------------------------------------
+
+def cluster_units(dist, n_clusters=N_CLUSTERS, method=LINKAGE):
+    """Önceden hesaplanmış uzaklıklarla hiyerarşik kümeleme; 0'dan başlayan etiketler."""
+    if len(dist) <= n_clusters:
+        return np.arange(len(dist))
+    z = linkage(squareform(dist, checks=False), method=method)
+    return fcluster(z, t=n_clusters, criterion="maxclust") - 1
+
+
+def silhouette(dist, labels):
+    """Önceden hesaplanmış uzaklıklardan ortalama silhouette skoru."""
+    labels = np.asarray(labels)
+    k = labels.max() + 1
+    if k < 2 or k >= len(labels):
+        return np.nan
+
+    onehot = np.eye(k)[labels]                             # (N, k)
+    size = onehot.sum(axis=0)
+    mean_to = dist @ onehot                                # (N, k) toplam uzaklık
+    own = size[labels] - 1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        a = mean_to[np.arange(len(labels)), labels] / own
+        other = mean_to / size
+    other[np.arange(len(labels)), labels] = np.inf
+    b = other.min(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s = (b - a) / np.maximum(a, b)
+    s[own == 0] = 0.0
+    return float(np.nanmean(s))
+
+
+def cluster_table(series, labels):
+    """Birim başına özet (ortalama / maksimum / std) + küme etiketi."""
+    v = np.nanmean(series["values"], axis=1) if series["values"].shape[1] > 1 else series["values"][:, 0]
+    with np.errstate(invalid="ignore"):
+        out = pd.DataFrame({
+            "mean_stress": np.nanmean(v, axis=1),
+            "max_stress": np.nanmax(v, axis=1),
+            "std_stress": np.nanstd(v, axis=1, ddof=1),
+            "cluster": labels,
+        })
+    if series["level"] == "region":
+        out.insert(0, "region", series["units"])
+    else:
+        out.insert(0, "province", series["units"])
+        out.insert(1, "region7", series["unit_region"])
+    return out
+
+
+@instrument("stress_clusters")
+def run_clustering(level="region", metric="corr", n_clusters=N_CLUSTERS, window=None,
+                   cache_file=None, rebuild=False, out_file=None,
+                   index_file=None, trends_file=None):
+    series = unit_series(level, index_file, trends_file)
+    if cache_file is None:
+        cache_file = CACHE_FILE.format(level=level, metric=metric)
+
+    print(f"[INFO] {len(series['units'])} birim × {len(series['channels'])} kanal × "
+          f"{len(series['dates'])} tarih, uzaklık: {metric}")
+    dist = distance_matrix(series, metric, window, cache_file, rebuild)
+
+    labels = cluster_units(dist, n_clusters)
+    table = cluster_table(series, labels)
+    print(f"[INFO] Silhouette skoru: {silhouette(dist, labels):.4f}")
+    record(rows_in=int(series["values"].size), rows_out=len(table))
+
+    name = f"{level}_clusters_{metric}"
+    out_file = write_table(table, name, out_file)
+    print(f"[OK] Kümeler kaydedildi: {out_file}")
+    print(table)
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bölge / il stres kümeleme")
+    parser.add_argument("--level", choices=["region", "province"], default="region")
+    parser.add_argument("--metric", choices=["corr", "dtw"], default="corr")
+    parser.add_argument("--k", type=int, default=N_CLUSTERS, help="Küme sayısı")
+    parser.add_argument("--window", type=int, default=None, help="DTW Sakoe-Chiba bandı")
+    parser.add_argument("--rebuild", action="store_true", help="Cache'i yok say")
+    args = parser.parse_args()
+
+    run_clustering(args.level, args.metric, args.k, args.window, rebuild=args.rebuild)
@@ -0,0 +1,250 @@
+"""
+stress_metrics.py
+
+Amaç:
+- Pipeline modülleri için hafif ölçüm (instrumentation) katmanı
+- Her aşama `with stage("isim"):` bloğuyla ya da @instrument("isim")
+  dekoratörüyle sarılır; blok bitince run_log.jsonl dosyasına tek bir JSON
+  satırı yazılır:
+    * wall_s, rows_in / rows_out (aşama record(rows_in=...) ile doldurur)
+    * RSS (başlangıç, bitiş, fark) ve sürecin tepe RSS'i
+    * sayaçlar: HTTP istek sayısı / süreleri, cache hit / miss, hata sayısı ...
+    * status (ok / error) ve hata mesajı
+- İsteğe bağlı (opt-in) profil: STRESS_PROFILE=cprofile ve/veya tracemalloc
+    * cprofile:    profiles/<run_id>_<aşama>.prof + en pahalı 5 fonksiyon;
+                   sadece en dıştaki aşama profillenir (iç aşamalar onun
+                   .prof dosyasında yer alır, Python'da aynı anda tek
+                   profiler açık olabilir)
+    * tracemalloc: tepe Python ayırması + en çok ayıran 3 satır
+- Böylece production'da yavaş ya da aşırı yüklenmiş bir çalıştırma,
+  profiler altında tekrar çalıştırmadan log'dan teşhis edilebilir
+
+Ortam değişkenleri:
+    STRESS_RUN_LOG   log dosyası (varsayılan run_log.jsonl, "" ise yazılmaz)
+    STRESS_PROFILE   "", "cprofile", "tracemalloc" ya da "cprofile,tracemalloc"
+    STRESS_RUN_ID    çalıştırma kimliği (verilmezse zaman damgası + pid)
+
+Özet:
+    python stress_metrics.py              # son çalıştırmanın aşama tablosu
+    python stress_metrics.py --all        # tüm çalıştırmalar
+"""
+
+import argparse
+import cProfile
+import functools
+import json
+import os
+import pstats
+import resource
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+RUN_LOG = os.environ.get("STRESS_RUN_LOG", "run_log.jsonl")
+PROFILE = os.environ.get("STRESS_PROFILE", "")
+PROFILE_DIR = "profiles"
+RUN_ID = os.environ.get("STRESS_RUN_ID") or f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+_lock = threading.Lock()
+_active = []  # açık aşamalar (iç içe); sayaçlar hepsine eklenir
+_profiling = False  # açık bir aşama cProfile çalıştırıyor mu
+
+
+def configure(run_log=None, profile=None, profile_dir=None):
+    """Modül ayarlarını koddan değiştirmek için (ortam değişkenleri yerine)."""
+    global RUN_LOG, PROFILE, PROFILE_DIR
+    if run_log is not None:
+        RUN_LOG = run_log
+    if profile is not None:
+        PROFILE = profile
+    if profile_dir is not None:
+        PROFILE_DIR = profile_dir
+
+
+# --------------------------------------------------
+# Sayaçlar
+# --------------------------------------------------
+
+def count(key, n=1):
+    """Açık aşamaların sayacını artırır (iş parçacıklarından da çağrılabilir)."""
+    with _lock:
+        for rec in _active:
+            rec["counters"][key] = rec["counters"].get(key, 0) + n
+
+
+def record(**fields):
+    """En içteki açık aşamaya alan yazar (ör. record(rows_in=n, rows_out=m))."""
+    with _lock:
+        if _active:
+            _active[-1].update(fields)
+
+
+def observe(key, seconds):
+    """Süre gözlemi: <key>_count, <key>_total_s, <key>_max_s."""
+    with _lock:
+        for rec in _active:
+            c = rec["counters"]
+            c[f"{key}_count"] = c.get(f"{key}_count", 0) + 1
+            c[f"{key}_total_s"] = c.get(f"{key}_total_s", 0.0) + seconds
+            c[f"{key}_max_s"] = max(c.get(f"{key}_max_s", 0.0), seconds)
+
+
+def _rss_mb():
+    # Güncel RSS (Linux: /proc), yoksa tepe RSS
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# --------------------------------------------------
+# Aşama
+# --------------------------------------------------
+
+@contextmanager
+def stage(name, **fields):
+    """
+    Bir aşamayı ölçer. Yield edilen sözlüğe aşama kendi alanlarını
+    (rows_in, rows_out, ...) yazabilir. Aşamalar ana iş parçacığında
+    açılmalı; sayaçlar ise herhangi bir iş parçacığından artırılabilir.
+    """
+    rec = {
+        "run_id": RUN_ID,
+        "stage": name,
+        "parent": _active[-1]["stage"] if _active else None,
+        "started": pd.Timestamp.now().isoformat(timespec="milliseconds"),
+        "pid": os.getpid(),
+        **fields,
+        "counters": {},
+    }
+    global _profiling
+    modes = {m.strip() for m in PROFILE.split(",") if m.strip()}
+
+    profiler = cProfile.Profile() if "cprofile" in modes and not _profiling else None
+    own_trace = "tracemalloc" in modes and not tracemalloc.is_tracing()
+    if own_trace:
+        tracemalloc.start()
+
+    rss_start = _rss_mb()
+    with _lock:
+        _active.append(rec)
+    t0 = time.perf_counter()
+    if profiler is not None:
+        try:
+            profiler.enable()
+            _profiling = True
+        except ValueError:
+            # Dışarıdan başka bir profiler açık (Python ≥ 3.12)
+            profiler = None
+
+    try:
+        yield rec
+        rec["status"] = "ok"
+    except BaseException as e:
+        rec["status"] = "error"
+        rec["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            _profiling = False
+        rec["wall_s"] = time.perf_counter() - t0
+        with _lock:
+            _active.remove(rec)
+
+        rss_end = _rss_mb()
+        rec["rss_start_mb"] = rss_start
+        rec["rss_end_mb"] = rss_end
+        rec["mem_delta_mb"] = rss_end - rss_start
+        rec["rss_peak_mb"] = _peak_rss_mb()
+
+        if profiler is not None:
+            rec["profile"] = _save_profile(profiler, name)
+        if own_trace:
+            rec["alloc"] = _trace_summary()
+            tracemalloc.stop()
+
+        _write(rec)
+
+
+def instrument(name=None):
+    """Fonksiyonu stage(...) ile saran dekoratör."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with stage(name or fn.__name__):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def _save_profile(profiler, name):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+    path = os.path.join(PROFILE_DIR, f"{RUN_ID}_{safe}.prof")
+    profiler.dump_stats(path)
+
+    stats = pstats.Stats(profiler).stats
+    top = []
+    for func, (_, ncalls, _, cum, _) in sorted(stats.items(), key=lambda kv: -kv[1][3])[:5]:
+        top.append({"func": f"{os.path.basename(func[0])}:{func[1]}:{func[2]}",
+                    "calls": ncalls, "cum_s": cum})
+    return {"file": path, "top": top}
+
+
+def _trace_summary():
+    _, peak = tracemalloc.get_traced_memory()
+    stats = tracemalloc.take_snapshot().statistics("lineno")[:3]
+    return {
+        "peak_mb": peak / 2**20,
+        "top": [{"line": str(s.traceback[0]), "mb": s.size / 2**20} for s in stats],
+    }
+
+
+def _write(rec):
+    if not RUN_LOG:
+        return
+    line = json.dumps(rec, ensure_ascii=False, default=str)
+    with _lock:
+        with open(RUN_LOG, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+# --------------------------------------------------
+# Log okuma
+# --------------------------------------------------
+
+def load_run_log(run_log=None):
+    """Run log'u düz bir DataFrame'e çevirir (sayaçlar kolon olur)."""
+    run_log = run_log or RUN_LOG
+    with open(run_log, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    df = pd.json_normalize(records)
+    df.columns = [c.replace("counters.", "") for c in df.columns]
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run log özeti")
+    parser.add_argument("run_log", nargs="?", default=RUN_LOG)
+    parser.add_argument("--all", action="store_true", help="Tüm çalıştırmaları göster")
+    args = parser.parse_args()
+
+    df = load_run_log(args.run_log)
+    if not args.all:
+        df = df[df["run_id"] == df["run_id"].iloc[-1]]
+
+    cols = [c for c in ["run_id", "stage", "status", "wall_s", "rows_in", "rows_out",
+                        "mem_delta_mb", "rss_peak_mb", "http_count", "http_total_s",
+                        "http_max_s", "cache_hit", "cache_miss"] if c in df.columns]
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(df[cols].round(3).to_string(index=False))
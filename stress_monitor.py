@@ -0,0 +1,332 @@
+"""
+stress_monitor.py
+
+Amaç:
+- build_region_stress_index'in akış (streaming) karşılığı: yeni bir hafta
+  geldiğinde tüm geçmişi yeniden okuyup z-score hesaplamak yerine
+  il + keyword başına koşan istatistikler tutulur
+    * welford: tüm geçmiş üzerinden sayı / ortalama / M2 (batch z-score ile
+      aynı ortalama ve std'ye yakınsar)
+    * ew:      üstel ağırlıklı ortalama / varyans (alpha), yakın geçmişe
+      daha duyarlı
+- Her yeni gözlem (tarih, il, keyword değerleri) sabit sürede işlenir:
+  o hücrenin istatistiği güncellenir, z-score'u hesaplanır ve ilin
+  bölgesinin o tarihteki toplamına eklenir → 7 bölge indeksi O(1) güncel
+- Alarm sadece tarih kapandığında (yeni tarihe geçişte ve update_frame
+  sonunda) kapanış indeksine göre üretilir: bir bölgenin kapanış değeri
+  eşiği yukarı doğru geçtiğinde alarm (konsola + stress_alerts.jsonl);
+  bölge bir tarihi eşiğin altında kapatınca alarm sıfırlanır. İller
+  geldikçe oluşan kısmi toplamlar alarm üretmez
+- Durum (il × keyword dizileri) .npz olarak saklanır, bir sonraki çalıştırma
+  kaldığı tarihten devam eder
+
+Çalıştırma:
+    python stress_monitor.py
+    python stress_monitor.py --method ew --alpha 0.1 --threshold 1.0
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from build_region_stress_index import VALUE_COLS
+from stress_store import read_table
+
+
+STATE_FILE = "stress_monitor_state.npz"
+ALERT_FILE = "stress_alerts.jsonl"
+THRESHOLD = 1.0
+EW_ALPHA = 0.1
+
+
+# --------------------------------------------------
+# Durum
+# --------------------------------------------------
+
+def init_state(provinces, province_region, keywords=VALUE_COLS,
+               method="welford", alpha=EW_ALPHA, threshold=THRESHOLD):
+    """
+    Boş monitör durumu. Tüm sayısal alanlar sabit boyutlu NumPy dizileri:
+
+    - n, mean, m2:       (P, K) il + keyword istatistikleri (ew'de m2 = varyans)
+    - cell_z:            (P, K) güncel tarihteki z-score (gözlenmediyse NaN)
+    - base_n/mean/m2:    (P, K) ilin güncel tarihteki ilk gözleminden önceki
+                         istatistikleri; aynı (tarih, il) tekrar gelirse geri
+                         yüklenir, gözlem iki kez sayılmaz
+    - seen:              (P,) il güncel tarihte gözlendi mi
+    - z_sum, n_obs:      (R,) güncel tarihte bölge başına z toplamı / hücre sayısı
+    - alerting:          (R,) bölge için alarm verildi mi (eşiğin üstünde)
+    - current_date:      işlenen son tarih
+    """
+    provinces = np.asarray(provinces, dtype=str)
+    province_region = np.asarray(province_region, dtype=str)
+    r_idx, regions = pd.factorize(province_region, sort=True)
+    n_prov, n_kw, n_reg = len(provinces), len(keywords), len(regions)
+
+    state = {
+        "method": method,
+        "alpha": float(alpha),
+        "threshold": float(threshold),
+        "provinces": provinces,
+        "keywords": np.asarray(keywords, dtype=str),
+        "regions": np.asarray(regions, dtype=str),
+        "province_region": r_idx.astype(np.int64),
+        "n": np.zeros((n_prov, n_kw)),
+        "mean": np.zeros((n_prov, n_kw)),
+        "m2": np.zeros((n_prov, n_kw)),
+        "cell_z": np.full((n_prov, n_kw), np.nan),
+        "base_n": np.zeros((n_prov, n_kw)),
+        "base_mean": np.zeros((n_prov, n_kw)),
+        "base_m2": np.zeros((n_prov, n_kw)),
+        "seen": np.zeros(n_prov, dtype=bool),
+        "z_sum": np.zeros(n_reg),
+        "n_obs": np.zeros(n_reg),
+        "alerting": np.zeros(n_reg, dtype=bool),
+        "current_date": np.datetime64("NaT", "ns"),
+    }
+    _index_lookup(state)
+    return state
+
+
+def _index_lookup(state):
+    # İl ismi → satır; kaydedilmez, yüklemede yeniden kurulur
+    state["_province_idx"] = {p: i for i, p in enumerate(state["provinces"])}
+
+
+def save_state(state, state_file=STATE_FILE):
+    # Yarım yazılmış dosya kalmasın diye önce geçici dosyaya yaz
+    arrays = {k: np.asarray(v) for k, v in state.items() if not k.startswith("_")}
+    tmp = state_file + ".tmp.npz"
+    np.savez(tmp, **arrays)
+    os.replace(tmp, state_file)
+
+
+def load_state(state_file=STATE_FILE):
+    with np.load(state_file, allow_pickle=False) as data:
+        state = {k: data[k] for k in data.files}
+    for key in ("method",):
+        state[key] = str(state[key])
+    for key in ("alpha", "threshold"):
+        state[key] = float(state[key])
+    # Tekrar takibi olmayan eski durum dosyaları
+    for key in ("base_n", "base_mean", "base_m2"):
+        state.setdefault(key, np.zeros(state["n"].shape))
+    state.setdefault("seen", np.zeros(len(state["provinces"]), dtype=bool))
+    for key in ("n", "mean", "m2", "cell_z", "base_n", "base_mean", "base_m2", "seen",
+                "z_sum", "n_obs", "alerting"):
+        state[key] = state[key].copy()
+    state["current_date"] = np.datetime64(state["current_date"], "ns")
+    _index_lookup(state)
+    return state
+
+
+# --------------------------------------------------
+# Güncelleme
+# --------------------------------------------------
+
+def region_indices(state):
+    """Güncel tarihteki bölge indeksleri (gözlem yoksa NaN)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return state["z_sum"] / state["n_obs"]
+
+
+def update(state, date, province, values):
+    """
+    Bir ilin bir tarihteki K keyword değerini işler (K sabit → O(1)).
+
+    - Tarih ilerlediyse önceki tarih kapatılır (alarm kontrolü, bkz.
+      close_date) ve bölge toplamları yeni tarih için sıfırlanır
+    - Güncel tarihten eski gözlemler sadece istatistikleri günceller
+    - Aynı tarihte aynı il tekrar gelirse önceki katkısı ve istatistik
+      güncellemesi geri alınır (son gelen değer geçerli)
+
+    Dönüş: kapanan tarihin alarmları (tarih değişmediyse boş)
+    """
+    i = state["_province_idx"].get(province)
+    if i is None:
+        print(f"  [WARN] Monitör durumunda olmayan il atlandı: {province}")
+        return []
+
+    date = np.datetime64(pd.Timestamp(date), "ns")
+    current = state["current_date"]
+    alerts = []
+    if np.isnat(current) or date > current:
+        alerts = close_date(state)
+        state["current_date"] = date
+        state["cell_z"][:] = np.nan
+        state["seen"][:] = False
+        state["z_sum"][:] = 0.0
+        state["n_obs"][:] = 0.0
+
+    x = np.asarray(values, dtype=np.float64)
+    obs = ~np.isnan(x)
+
+    if date < state["current_date"]:
+        _update_stats(state, i, x, obs)
+        return alerts
+
+    if state["seen"][i]:
+        # Tekrar: istatistikleri ilin bu tarihteki ilk gözleminden önceki haline al
+        for key in ("n", "mean", "m2"):
+            state[key][i] = state["base_" + key][i]
+    else:
+        for key in ("n", "mean", "m2"):
+            state["base_" + key][i] = state[key][i]
+        state["seen"][i] = True
+    z = _update_stats(state, i, x, obs)
+
+    r = state["province_region"][i]
+    prev = state["cell_z"][i]
+    prev_obs = ~np.isnan(prev)
+    state["z_sum"][r] += z[obs].sum() - prev[prev_obs].sum()
+    state["n_obs"][r] += obs.sum() - prev_obs.sum()
+    state["cell_z"][i] = np.where(obs, z, np.nan)
+
+    return alerts
+
+
+def _update_stats(state, i, x, obs):
+    n, mean, m2 = state["n"][i], state["mean"][i], state["m2"][i]
+
+    if state["method"] == "welford":
+        n[obs] += 1
+        delta = x[obs] - mean[obs]
+        mean[obs] += delta / n[obs]
+        m2[obs] += delta * (x[obs] - mean[obs])
+        var = np.where(n > 0, m2 / np.maximum(n, 1), 0.0)
+    elif state["method"] == "ew":
+        a = state["alpha"]
+        first = obs & (n == 0)
+        rest = obs & (n > 0)
+        mean[first] = x[first]
+        delta = x[rest] - mean[rest]
+        mean[rest] += a * delta
+        m2[rest] = (1 - a) * (m2[rest] + a * delta ** 2)
+        n[obs] += 1
+        var = m2
+    else:
+        raise ValueError(f"Bilinmeyen monitör yöntemi: {state['method']}")
+
+    # batch zscore_array ile aynı kural: std = 0 ise z = 0
+    std = np.sqrt(var)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(std > 0, (x - mean) / std, 0.0)
+    return z
+
+
+def close_date(state):
+    """
+    Güncel tarihi kapanış değerleriyle (z_sum / n_obs) değerlendirir:
+    eşiği yukarı doğru geçen bölgeler için alarm döner, alarm durumunu
+    kapanış değerine göre yeniler. Aynı tarih için tekrar çağrılırsa yeni
+    alarm üretmez.
+    """
+    if np.isnat(state["current_date"]):
+        return []
+
+    value = region_indices(state)
+    with np.errstate(invalid="ignore"):
+        above = value >= state["threshold"]
+    crossed = np.flatnonzero(above & ~state["alerting"])
+    state["alerting"][:] = above
+
+    date = str(pd.Timestamp(state["current_date"]).date())
+    return [{
+        "date": date,
+        "region7": str(state["regions"][r]),
+        "stress_index": float(value[r]),
+        "threshold": state["threshold"],
+    } for r in crossed]
+
+
+def update_frame(state, df, keywords=VALUE_COLS):
+    """
+    Geniş Trends tablosunun satırlarını tarih sırasıyla işler; son tarih de
+    kapatılır. Dönüş: (oluşan alarmlar, her tarihin sonundaki bölge
+    indeksleri tablosu)
+    """
+    df = df.sort_values("date", kind="stable")
+    dates = pd.to_datetime(df["date"]).to_numpy()
+    provinces = df["province"].astype(str).to_numpy()
+    values = df[list(keywords)].to_numpy(dtype=np.float64)
+
+    alerts, rows = [], []
+    for j in range(len(df)):
+        alerts += update(state, dates[j], provinces[j], values[j])
+        if j == len(df) - 1 or dates[j + 1] != dates[j]:
+            rows.append(region_indices(state).copy())
+    alerts += close_date(state)
+
+    snap_dates = pd.unique(dates)
+    index = pd.DataFrame(rows, columns=state["regions"], index=pd.DatetimeIndex(snap_dates, name="date"))
+    return alerts, index
+
+
+def write_alerts(alerts, alert_file=ALERT_FILE):
+    # Dashboard için satır başına bir JSON
+    with open(alert_file, "a", encoding="utf-8") as f:
+        for alert in alerts:
+            f.write(json.dumps(alert, ensure_ascii=False) + "\n")
+
+
+# --------------------------------------------------
+# Çalıştırma
+# --------------------------------------------------
+
+def run_monitor(trends_file="google_trends_province_timeseries.parquet",
+                state_file=STATE_FILE, alert_file=ALERT_FILE,
+                method="welford", alpha=EW_ALPHA, threshold=THRESHOLD):
+    """
+    Kayıtlı durum varsa yükler ve sadece son işlenen tarihten sonraki
+    satırları işler; yoksa tüm geçmişi baştan akıtır. Durumu kaydeder.
+    """
+    trends = read_table("trends", trends_file)
+
+    if os.path.exists(state_file):
+        state = load_state(state_file)
+        print(f"[INFO] Monitör durumu yüklendi: {state_file} "
+              f"(son tarih: {pd.Timestamp(state['current_date']).date()})")
+        new = trends[trends["date"] > pd.Timestamp(state["current_date"])]
+    else:
+        first = trends.drop_duplicates("province")
+        state = init_state(first["province"].astype(str), first["region7"].astype(str),
+                           method=method, alpha=alpha, threshold=threshold)
+        print(f"[INFO] Yeni monitör durumu ({method}), tüm geçmiş işlenecek.")
+        new = trends
+
+    if new.empty:
+        print("[INFO] Yeni gözlem yok.")
+        alerts = []
+    else:
+        alerts, index = update_frame(state, new)
+        print(f"[INFO] {len(new)} satır işlendi ({index.index.min().date()} → "
+              f"{index.index.max().date()}).")
+
+    for alert in alerts:
+        print(f"  [WARN] {alert['date']} {alert['region7']}: "
+              f"indeks {alert['stress_index']:.3f} ≥ {alert['threshold']}")
+    if alerts:
+        write_alerts(alerts, alert_file)
+
+    save_state(state, state_file)
+    print(f"[OK] Monitör durumu kaydedildi: {state_file}")
+
+    current = pd.Series(region_indices(state), index=state["regions"], name="stress_index")
+    print(current)
+    return state, alerts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Akış tabanlı bölgesel stres monitörü")
+    parser.add_argument("--trends", default="google_trends_province_timeseries.parquet")
+    parser.add_argument("--state", default=STATE_FILE)
+    parser.add_argument("--alerts", default=ALERT_FILE)
+    parser.add_argument("--method", choices=["welford", "ew"], default="welford")
+    parser.add_argument("--alpha", type=float, default=EW_ALPHA)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    run_monitor(args.trends, args.state, args.alerts, args.method, args.alpha, args.threshold)
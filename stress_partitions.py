@@ -0,0 +1,286 @@
+"""
+stress_partitions.py
+
+Amaç:
+- Çok ülke / çok yıl / günlük veri için "ölçek modu": tablolar
+  country=<..>/region7=<..>/year=<..>/part-NNNNN.parquet klasörlerine
+  bölünür (Hive tarzı), hiçbir aşama tüm tabloyu belleğe almaz
+- partition_table:  tek dosyayı parça parça (chunksize) okuyup bölümlere yazar
+- build_region_stress_index_partitioned:
+    1. geçiş: her bölüm için il + keyword istatistikleri (n, mean, M2),
+       ana süreçte il başına birleştirilir (yıllar arası, Chan)
+    2. geçiş: her bölüm z-score + bölge-tarih indeksini hesaplar ve kendi
+       çıktı bölümüne yazar; bölüm bölgeye göre ayrıldığı için bölümler
+       arası toplama gerekmez
+- build_event_panel_partitioned: (ülke, bölge, event yılı) başına iş;
+  sadece pencereleri kapsayan yılların indeks bölümleri okunur,
+  analyze_region_stress'in prefix-sum pencere ortalamaları kullanılır
+- İşler bir süreç havuzunda koşar; tepe bellek ≈ workers × en büyük bölüm,
+  toplam veri boyutundan bağımsız
+
+Çalıştırma:
+    python stress_partitions.py split  google_trends_province_timeseries.parquet partitions/trends
+    python stress_partitions.py index  partitions/trends partitions/region_index --workers 4
+    python stress_partitions.py panel  partitions/region_index partitions/panel --pre-days 30 --post-days 30
+"""
+
+import argparse
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from analyze_region_stress import _panel_frame, build_region_prefix, window_means
+from build_region_stress_index import (
+    VALUE_COLS,
+    _combine_stats,
+    finish_region_sums,
+    index_weight_matrix,
+    province_stats,
+    region_sums,
+)
+from stress_metrics import instrument, record
+from stress_store import iter_table_chunks, read_table, write_table
+
+
+PARTITION_KEYS = ("country", "region7", "year")
+DEFAULT_COUNTRY = "TR"
+CHUNKSIZE = 500_000
+
+_PART_RE = re.compile(r"^([^=]+)=(.*)$")
+
+
+# --------------------------------------------------
+# Bölümler
+# --------------------------------------------------
+
+def partition_dir(root, country, region, year):
+    return os.path.join(root, f"country={country}", f"region7={region}", f"year={int(year)}")
+
+
+def partition_table(name, in_file, out_root, date_col="date", country=DEFAULT_COUNTRY,
+                    chunksize=CHUNKSIZE):
+    """
+    Dataset'i (country, region7, year) bölümlerine yazar. Dosya parça parça
+    okunur; her parça her bölüme ayrı bir part-NNNNN dosyası ekler.
+    Tabloda country kolonu yoksa hepsi `country` kabul edilir.
+
+    Bu çalıştırmanın yazdığı bölüm klasörleri ilk yazmadan önce
+    temizlenir; aynı out_root'a (farklı chunksize ile) tekrar bölmek eski
+    part dosyalarını bırakıp satırları çoğaltmaz.
+    """
+    print(f"[INFO] Bölümleniyor: {in_file} → {out_root} (chunksize={chunksize})")
+    n_rows, parts = 0, set()
+    for i, chunk in enumerate(iter_table_chunks(name, in_file, chunksize)):
+        if "country" not in chunk.columns:
+            chunk["country"] = country
+        chunk[date_col] = pd.to_datetime(chunk[date_col])
+        year = chunk[date_col].dt.year
+
+        for (c, r, y), part in chunk.groupby([chunk["country"], chunk["region7"], year],
+                                             observed=True, sort=False):
+            path = partition_dir(out_root, c, r, y)
+            if (c, r, y) not in parts:
+                shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path, exist_ok=True)
+            write_table(part.drop(columns="country"), name,
+                        os.path.join(path, f"part-{i:05d}.parquet"), export_csv=False)
+            parts.add((c, r, y))
+        n_rows += len(chunk)
+
+    print(f"[OK] {n_rows} satır, {len(parts)} bölüm yazıldı.")
+    return sorted(parts)
+
+
+def list_partitions(root):
+    """root altındaki bölümler: country, region7, year, path, files."""
+    rows = []
+    for path, _, files in os.walk(root):
+        data = sorted(f for f in files if f.endswith((".parquet", ".csv")))
+        if not data:
+            continue
+        keys = dict(_PART_RE.match(p).groups() for p in
+                    os.path.relpath(path, root).split(os.sep) if _PART_RE.match(p))
+        rows.append({
+            "country": keys.get("country", DEFAULT_COUNTRY),
+            "region7": keys.get("region7"),
+            "year": int(keys["year"]) if "year" in keys else None,
+            "path": path,
+            "files": [os.path.join(path, f) for f in data],
+        })
+    cols = ["country", "region7", "year", "path", "files"]
+    return pd.DataFrame(rows, columns=cols).sort_values(cols[:3], ignore_index=True)
+
+
+def read_partition(name, files):
+    """Bir bölümün part dosyalarını tek tabloda okur."""
+    return pd.concat([read_table(name, f) for f in files], ignore_index=True)
+
+
+def read_partitions(name, root, countries=None, regions=None, years=None):
+    """Filtreye uyan bölümleri okur (country kolonu eklenir); sadece küçük sonuçlar için."""
+    parts = list_partitions(root)
+    if countries is not None:
+        parts = parts[parts["country"].isin(countries)]
+    if regions is not None:
+        parts = parts[parts["region7"].isin(regions)]
+    if years is not None:
+        parts = parts[parts["year"].isin(years)]
+    frames = [read_partition(name, p.files).assign(country=p.country)
+              for p in parts.itertuples()]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _run_tasks(fn, tasks, workers):
+    # workers=1: aynı süreçte (hata ayıklama / küçük veri)
+    if workers == 1:
+        return [fn(*t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fn, *t) for t in tasks]
+        return [f.result() for f in futures]
+
+
+# --------------------------------------------------
+# Bölgesel indeks
+# --------------------------------------------------
+
+def _stats_task(files, value_cols):
+    return province_stats(read_partition("trends", files), value_cols)
+
+
+def _index_task(files, out_path, stats, value_cols, names, weights):
+    df = read_partition("trends", files)
+    z_sum, n_obs = region_sums(df, stats, value_cols, names, weights)
+    out = finish_region_sums(z_sum, n_obs)
+    os.makedirs(out_path, exist_ok=True)
+    write_table(out, "region_index", os.path.join(out_path, "part-00000.parquet"), export_csv=False)
+    return len(df), len(out)
+
+
+@instrument("build_region_stress_index_partitioned")
+def build_region_stress_index_partitioned(in_root, out_root, value_cols=VALUE_COLS,
+                                          indices=None, workers=None):
+    """
+    Bölümlenmiş Trends verisinden bölümlenmiş bölgesel indeks. Sonuç,
+    build_region_stress_index ile aynı (bölüm başına aynı tarih-bölge satırları).
+    """
+    names, weights = index_weight_matrix(value_cols, indices)
+    parts = list_partitions(in_root)
+    print(f"[INFO] {len(parts)} bölüm, {parts['country'].nunique()} ülke, "
+          f"{parts['year'].nunique()} yıl")
+
+    # 1. geçiş: bölüm başına istatistik, ülke + il başına birleştir
+    part_stats = _run_tasks(_stats_task, [(p.files, value_cols) for p in parts.itertuples()], workers)
+    stats = {}
+    for country, st in zip(parts["country"], part_stats):
+        stats[country] = st if country not in stats else _combine_stats(stats[country], st)
+
+    print("[INFO] Z-score + bölge indeksi (bölüm başına)...")
+
+    # 2. geçiş: her bölüm sadece kendi illerinin istatistiğini alır
+    tasks = []
+    for p, st in zip(parts.itertuples(), part_stats):
+        own = {k: stats[p.country][k].loc[st["n"].index] for k in ("n", "mean", "m2")}
+        tasks.append((p.files, partition_dir(out_root, p.country, p.region7, p.year),
+                      own, value_cols, names, weights))
+    counts = _run_tasks(_index_task, tasks, workers)
+
+    rows_in = sum(c[0] for c in counts)
+    rows_out = sum(c[1] for c in counts)
+    record(rows_in=rows_in, rows_out=rows_out, partitions=len(parts))
+    print(f"[OK] Bölgesel stres indeksi bölümleri yazıldı: {out_root} ({rows_out} satır)")
+    return out_root
+
+
+# --------------------------------------------------
+# Event paneli
+# --------------------------------------------------
+
+def _panel_task(files, events, pre_days, post_days, out_path):
+    region = read_partition("region_index", files)
+    prefix = build_region_prefix(region)
+
+    ev_dates = pd.to_datetime(events["event_date"]).to_numpy()
+    pre_mean, post_mean = window_means(prefix, ev_dates, pre_days, post_days)
+    panel = _panel_frame(prefix, events, pre_mean, post_mean)
+
+    os.makedirs(out_path, exist_ok=True)
+    write_table(panel, "panel", os.path.join(out_path, "part-00000.parquet"), export_csv=False)
+    return len(panel)
+
+
+@instrument("build_event_panel_partitioned")
+def build_event_panel_partitioned(index_root, events, out_root, pre_days=30, post_days=30,
+                                  workers=None):
+    """
+    Bölümlenmiş bölgesel indeks + event tablosundan bölümlenmiş panel
+    (country / region7 / event yılı). events'te country kolonu varsa event
+    sadece o ülkenin bölgelerine, yoksa tüm ülkelere uygulanır.
+    """
+    print(f"\n[INFO] Bölümlenmiş event panel (pre={pre_days}, post={post_days})...")
+    parts = list_partitions(index_root)
+    events = events.assign(event_date=pd.to_datetime(events["event_date"]))
+    ev_year = events["event_date"].dt.year
+
+    pre_td = pd.Timedelta(days=int(pre_days))
+    post_td = pd.Timedelta(days=int(post_days))
+
+    tasks = []
+    for (country, region), grp in parts.groupby(["country", "region7"], sort=True):
+        ev_c = events if "country" not in events else events[events["country"] == country]
+        by_year = grp.set_index("year")["files"]
+        for year, ev in ev_c.groupby(ev_year.loc[ev_c.index], sort=True):
+            # Pencerelerin kapsadığı yılların bölümleri
+            lo = (ev["event_date"].min() - pre_td).year
+            hi = (ev["event_date"].max() + post_td).year
+            files = [f for y in range(lo, hi + 1) if y in by_year.index for f in by_year[y]]
+            if not files:
+                continue
+            ev = ev.drop(columns="country", errors="ignore").reset_index(drop=True)
+            tasks.append((files, ev, pre_days, post_days,
+                          partition_dir(out_root, country, region, year)))
+
+    rows = _run_tasks(_panel_task, tasks, workers)
+    record(rows_in=len(events), rows_out=sum(rows), partitions=len(tasks))
+    print(f"[OK] Event panel bölümleri yazıldı: {out_root} ({sum(rows)} satır, {len(tasks)} bölüm)")
+    return out_root
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bölümlenmiş (ölçek modu) pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("split", help="Trends tablosunu bölümlere ayır")
+    p.add_argument("in_file")
+    p.add_argument("out_root")
+    p.add_argument("--country", default=DEFAULT_COUNTRY)
+    p.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+
+    p = sub.add_parser("index", help="Bölümlenmiş bölgesel indeks")
+    p.add_argument("in_root")
+    p.add_argument("out_root")
+    p.add_argument("--indices", nargs="+", default=None)
+    p.add_argument("--workers", type=int, default=None)
+
+    p = sub.add_parser("panel", help="Bölümlenmiş event paneli")
+    p.add_argument("index_root")
+    p.add_argument("out_root")
+    p.add_argument("--events-file", default="event_dates.parquet")
+    p.add_argument("--pre-days", type=int, default=30)
+    p.add_argument("--post-days", type=int, default=30)
+    p.add_argument("--workers", type=int, default=None)
+
+    args = parser.parse_args()
+    if args.command == "split":
+        partition_table("trends", args.in_file, args.out_root,
+                        country=args.country, chunksize=args.chunksize)
+    elif args.command == "index":
+        indices = "all" if args.indices == ["all"] else args.indices
+        build_region_stress_index_partitioned(args.in_root, args.out_root,
+                                              indices=indices, workers=args.workers)
+    else:
+        events = read_table("events", args.events_file)
+        build_event_panel_partitioned(args.index_root, events, args.out_root,
+                                      args.pre_days, args.post_days, args.workers)
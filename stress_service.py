@@ -0,0 +1,448 @@
+"""
+stress_service.py
+
+Amaç:
+- Dashboard'ların gün içinde tekrar tekrar sorduğu soruları ("X bölgesinin
+  şu tarihler arası stresi", "Y tipindeki event'lerin W pencereli
+  delta_stress'i") analyze_region_stress.py'yi script olarak yeniden
+  çalıştırmadan cevaplayan küçük, yerel bir asyncio HTTP servisi
+- Haftalık indeks ve event paneli bir kez okunur, indekslenmiş dizilere
+  çevrilir:
+    * indeks: (tarih × bölge) matrisi + her indeks kolonu için TwoSum
+      düzeltmeli kümülatif toplamlar (build_prefix); aralık ortalaması
+      searchsorted + prefix farkı ile O(log n)
+    * panel: (event_type, bölge) gruplarına göre sıralı, grup içinde tarih
+      sıralı; delta_stress toplam / kare toplam / sayı prefix'leri ile
+      tarih aralığı özetleri O(log n)
+    * farklı pencere (pre_days / post_days) istenirse deltalar indeks
+      prefix'inden window_means ile anında hesaplanır
+- Aynı sorgular LRU cache'ten döner (QUERY_CACHE_SIZE)
+- Pipeline yeni çıktı yayınladığında (dosya mtime'ı değişince) veri arka
+  planda yeniden yüklenir ve atomik olarak değiştirilir; cache temizlenir.
+  Yükleme hata verirse (ör. dosya yazılırken) eski veri ile devam edilir
+
+Uç noktalar (GET, JSON):
+    /health
+    /regions
+    /stress?region=Marmara&start=2023-01-01&end=2023-12-31[&index=stress_index][&series=1]
+    /delta?event_type=earthquake&region=all&start=2020-01-01&end=2024-12-31
+    /delta?event_type=fx_shock&pre_days=60&post_days=14
+
+Çalıştırma:
+    python stress_service.py --port 8765
+    curl "http://127.0.0.1:8765/stress?region=Marmara&start=2023-01-01&end=2023-06-30"
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from analyze_region_stress import _range_mean, build_prefix, window_means
+from stress_store import read_table, resolved_path
+
+
+HOST = "127.0.0.1"
+PORT = 8765
+RELOAD_INTERVAL = 5.0
+QUERY_CACHE_SIZE = 1024
+
+FILES = {
+    "region_index": "region_stress_index_weekly.parquet",
+    "panel": "event_region_stress_panel.parquet",
+    "events": "event_dates.parquet",
+}
+
+
+# --------------------------------------------------
+# Veri yükleme + indeksleme
+# --------------------------------------------------
+
+def load_store(files=None):
+    """Çıktıları okur ve sorgu dizilerini hazırlar (tek seferlik)."""
+    files = {**FILES, **(files or {})}
+    paths = {name: resolved_path(name, path) for name, path in files.items()}
+    mtimes = {name: os.stat(path).st_mtime_ns for name, path in paths.items()}
+
+    region = read_table("region_index", paths["region_index"])
+    panel = read_table("panel", paths["panel"])
+    events = read_table("events", paths["events"])
+
+    return {
+        "paths": paths,
+        "mtimes": mtimes,
+        "loaded_at": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "index": _index_arrays(region),
+        "panel": _panel_arrays(panel),
+        "events": events[["event_date", "event_type"]].drop_duplicates().reset_index(drop=True),
+        "cache": OrderedDict(),
+        "hits": 0,
+        "misses": 0,
+    }
+
+
+def _index_arrays(region):
+    # (tarih × bölge) değer matrisi ve her indeks kolonu için prefix yapısı
+    dates, regions = [pd.Index(sorted(region[c].unique())) for c in ("date", "region7")]
+    ti = dates.get_indexer(region["date"])
+    ri = regions.get_indexer(region["region7"])
+    columns = [c for c in region.columns if c not in ("date", "region7")]
+
+    values, prefix = {}, {}
+    for col in columns:
+        mat = np.full((len(dates), len(regions)), np.nan)
+        mat[ti, ri] = region[col].to_numpy(dtype=np.float64)
+        observed = ~np.isnan(mat)
+        values[col] = mat
+        prefix[col] = build_prefix(dates, np.where(observed, mat, 0.0), observed.astype(np.int64))
+
+    return {
+        "dates": np.asarray(dates, dtype="datetime64[ns]"),
+        "regions": [str(r) for r in regions],
+        "columns": columns,
+        "values": values,
+        "prefix": prefix,
+    }
+
+
+def _panel_arrays(panel):
+    # (event_type, region7, event_date) sıralı; grup sınırları + delta prefix'leri
+    panel = panel.sort_values(["event_type", "region7", "event_date"], kind="stable")
+    panel = panel.reset_index(drop=True)
+    delta = panel["delta_stress"].to_numpy(dtype=np.float64)
+    observed = ~np.isnan(delta)
+    d0 = np.where(observed, delta, 0.0)
+
+    groups = {}
+    keys = panel[["event_type", "region7"]].astype(str)
+    bounds = np.flatnonzero((keys != keys.shift()).any(axis=1).to_numpy())
+    for lo, hi in zip(bounds, np.r_[bounds[1:], len(panel)]):
+        groups[(keys.iat[lo, 0], keys.iat[lo, 1])] = (int(lo), int(hi))
+
+    return {
+        "dates": panel["event_date"].to_numpy(dtype="datetime64[ns]"),
+        "groups": groups,
+        "csum": np.r_[0.0, np.cumsum(d0)],
+        "csq": np.r_[0.0, np.cumsum(d0 * d0)],
+        "ccnt": np.r_[0, np.cumsum(observed)],
+    }
+
+
+# --------------------------------------------------
+# Sorgular
+# --------------------------------------------------
+
+def query(store, path, params):
+    """
+    Tek bir sorguyu cevaplar (HTTP'den bağımsız). Sonuç LRU cache'te tutulur
+    (/health hariç).
+    Hatalı parametrede ValueError, bilinmeyen yolda KeyError.
+    """
+    if path not in ROUTES:
+        raise KeyError(path)
+    if path == "/health":
+        return _health(store, params)
+
+    key = (path, tuple(sorted(params.items())))
+    cache = store["cache"]
+    if key in cache:
+        cache.move_to_end(key)
+        store["hits"] += 1
+        return cache[key]
+
+    store["misses"] += 1
+    result = ROUTES[path](store, params)
+    cache[key] = result
+    if len(cache) > QUERY_CACHE_SIZE:
+        cache.popitem(last=False)
+    return result
+
+
+def _health(store, params):
+    return {
+        "status": "ok",
+        "loaded_at": store["loaded_at"],
+        "files": store["paths"],
+        "cache": {"size": len(store["cache"]), "hits": store["hits"], "misses": store["misses"]},
+    }
+
+
+def _regions(store, params):
+    return {
+        "regions": store["index"]["regions"],
+        "indices": store["index"]["columns"],
+        "event_types": sorted({t for t, _ in store["panel"]["groups"]}),
+        "dates": [_iso(store["index"]["dates"][0]), _iso(store["index"]["dates"][-1])],
+    }
+
+
+def _stress(store, params):
+    idx = store["index"]
+    col = params.get("index", idx["columns"][0])
+    if col not in idx["prefix"]:
+        raise ValueError(f"Bilinmeyen indeks: {col}")
+    regions = _pick(params.get("region", "all"), idx["regions"], "bölge")
+    lo, hi = _date_bounds(idx["dates"], params)
+    cols = [idx["regions"].index(r) for r in regions]
+
+    prefix = idx["prefix"][col]
+    mean = _range_mean(prefix, np.full(1, lo), np.full(1, hi))[0]
+    n = prefix["ccnt"][hi] - prefix["ccnt"][lo]
+    block = idx["values"][col][lo:hi]
+
+    out = {"index": col, "start": params.get("start"), "end": params.get("end"), "regions": {}}
+    for r, c in zip(regions, cols):
+        vals = block[:, c]
+        out["regions"][r] = {
+            "mean": _num(mean[c]),
+            "n": int(n[c]),
+            "min": _num(np.nanmin(vals)) if n[c] else None,
+            "max": _num(np.nanmax(vals)) if n[c] else None,
+        }
+        if params.get("series") in ("1", "true"):
+            ok = ~np.isnan(vals)
+            out["regions"][r]["series"] = [[_iso(d), float(v)]
+                                           for d, v in zip(idx["dates"][lo:hi][ok], vals[ok])]
+    return out
+
+
+def _delta(store, params):
+    if "pre_days" in params or "post_days" in params:
+        return _delta_window(store, params)
+
+    pan = store["panel"]
+    types = _pick(params.get("event_type", "all"), sorted({t for t, _ in pan["groups"]}), "event_type")
+    regions = _pick(params.get("region", "all"), store["index"]["regions"], "bölge")
+    start, end = _parse_range(params)
+
+    out = {"window": "panel", "by_region": {}}
+    total = np.zeros(3)
+    for r in regions:
+        acc = np.zeros(3)
+        for t in types:
+            if (t, r) not in pan["groups"]:
+                continue
+            g_lo, g_hi = pan["groups"][(t, r)]
+            d = pan["dates"][g_lo:g_hi]
+            lo = g_lo + np.searchsorted(d, start, side="left")
+            hi = g_lo + np.searchsorted(d, end, side="right")
+            acc += [pan["ccnt"][hi] - pan["ccnt"][lo],
+                    pan["csum"][hi] - pan["csum"][lo],
+                    pan["csq"][hi] - pan["csq"][lo]]
+        out["by_region"][r] = _summary(*acc)
+        total += acc
+    out["all"] = _summary(*total)
+    return out
+
+
+def _delta_window(store, params):
+    # Yayınlanan panelden farklı pencere: deltalar indeks prefix'inden
+    idx = store["index"]
+    pre_days = _days(params, "pre_days")
+    post_days = _days(params, "post_days")
+    col = params.get("index", idx["columns"][0])
+    if col not in idx["prefix"]:
+        raise ValueError(f"Bilinmeyen indeks: {col}")
+
+    events = store["events"]
+    types = _pick(params.get("event_type", "all"), sorted(events["event_type"].astype(str).unique()),
+                  "event_type")
+    regions = _pick(params.get("region", "all"), idx["regions"], "bölge")
+    start, end = _parse_range(params)
+
+    ev_dates = events["event_date"].to_numpy(dtype="datetime64[ns]")
+    keep = events["event_type"].astype(str).isin(types).to_numpy() & (ev_dates >= start) & (ev_dates <= end)
+    pre_mean, post_mean = window_means(idx["prefix"][col], ev_dates[keep], pre_days, post_days)
+    delta = post_mean - pre_mean
+
+    out = {"window": {"pre_days": pre_days, "post_days": post_days}, "by_region": {}}
+    for r in regions:
+        d = delta[:, idx["regions"].index(r)]
+        d = d[~np.isnan(d)]
+        out["by_region"][r] = _summary(len(d), d.sum(), (d * d).sum())
+    d = delta[:, [idx["regions"].index(r) for r in regions]].ravel()
+    d = d[~np.isnan(d)]
+    out["all"] = _summary(len(d), d.sum(), (d * d).sum())
+    return out
+
+
+ROUTES = {
+    "/health": _health,
+    "/regions": _regions,
+    "/stress": _stress,
+    "/delta": _delta,
+}
+
+
+def _summary(n, s, sq):
+    n = int(n)
+    if n == 0:
+        return {"n": 0, "mean": None, "std": None, "se": None}
+    mean = s / n
+    var = max(sq - n * mean * mean, 0.0) / (n - 1) if n > 1 else np.nan
+    std = np.sqrt(var)
+    return {"n": n, "mean": _num(mean), "std": _num(std), "se": _num(std / np.sqrt(n))}
+
+
+def _pick(value, available, label):
+    if value == "all":
+        return list(available)
+    wanted = value.split(",")
+    unknown = [v for v in wanted if v not in available]
+    if unknown:
+        raise ValueError(f"Bilinmeyen {label}: {unknown}")
+    return wanted
+
+
+def _parse_range(params):
+    try:
+        start = np.datetime64(pd.Timestamp(params.get("start", "1900-01-01")), "ns")
+        end = np.datetime64(pd.Timestamp(params.get("end", "2262-01-01")), "ns")
+    except ValueError as e:
+        raise ValueError(f"Geçersiz tarih: {e}") from None
+    if start > end:
+        raise ValueError(f"start ({_iso(start)}) end'den ({_iso(end)}) sonra olamaz")
+    return start, end
+
+
+def _days(params, name, default=30):
+    # Pencere uzunluğu: 0 ya da pozitif tam sayı (gün)
+    value = params.get(name, str(default))
+    try:
+        days = int(value)
+    except ValueError:
+        raise ValueError(f"{name} tam sayı olmalı: {value!r}") from None
+    if days < 0:
+        raise ValueError(f"{name} negatif olamaz: {days}")
+    return days
+
+
+def _date_bounds(dates, params):
+    start, end = _parse_range(params)
+    return (int(np.searchsorted(dates, start, side="left")),
+            int(np.searchsorted(dates, end, side="right")))
+
+
+def _num(x):
+    x = float(x)
+    return x if np.isfinite(x) else None
+
+
+def _iso(d):
+    return str(np.datetime64(d, "D"))
+
+
+# --------------------------------------------------
+# Hot reload
+# --------------------------------------------------
+
+def changed(store):
+    """Yayınlanan dosyalardan biri (mtime) değişti mi."""
+    for name, path in store["paths"].items():
+        try:
+            if os.stat(path).st_mtime_ns != store["mtimes"][name]:
+                return True
+        except OSError:
+            return False  # dosya yeniden yazılıyor; bir sonraki turda bak
+    return False
+
+
+async def reload_loop(state, files, interval=RELOAD_INTERVAL):
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        if not changed(state["store"]):
+            continue
+        try:
+            store = await loop.run_in_executor(None, load_store, files)
+        except Exception as e:
+            print(f"[WARN] Yeniden yükleme başarısız, eski veri ile devam: {e}")
+            continue
+        state["store"] = store
+        print(f"[OK] Yeni çıktılar yüklendi ({store['loaded_at']})")
+
+
+# --------------------------------------------------
+# HTTP
+# --------------------------------------------------
+
+async def handle(reader, writer, state):
+    try:
+        request = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass  # başlıklar kullanılmıyor
+
+        parts = request.decode("latin-1").split()
+        if len(parts) < 2 or parts[0] != "GET":
+            status, body = 405, {"error": "Sadece GET desteklenir"}
+        else:
+            url = urlsplit(parts[1])
+            params = dict(parse_qsl(url.query))
+            t0 = time.perf_counter()
+            if url.path not in ROUTES:
+                status, body = 404, {"error": f"Bilinmeyen yol: {url.path}"}
+            else:
+                try:
+                    body = query(state["store"], url.path, params)
+                    status = 200
+                except ValueError as e:
+                    status, body = 400, {"error": str(e)}
+                except Exception as e:
+                    # Handler hatası: 404 / 400 gibi görünmesin
+                    print(f"[ERROR] {parts[1]}: {type(e).__name__}: {e}")
+                    status, body = 500, {"error": f"Sunucu hatası: {type(e).__name__}"}
+            if state["verbose"]:
+                print(f"[INFO] {status} {parts[1]} {1e3 * (time.perf_counter() - t0):.2f} ms")
+
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                  500: "Internal Server Error"}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + payload
+        )
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(host=HOST, port=PORT, files=None, reload_interval=RELOAD_INTERVAL, verbose=False):
+    state = {"store": load_store(files), "verbose": verbose}
+    idx = state["store"]["index"]
+    print(f"[INFO] {len(idx['regions'])} bölge × {len(idx['dates'])} tarih, "
+          f"{len(state['store']['panel']['groups'])} panel grubu yüklendi")
+
+    server = await asyncio.start_server(lambda r, w: handle(r, w, state), host, port)
+    reloader = asyncio.create_task(reload_loop(state, files, reload_interval))
+    print(f"[OK] Servis çalışıyor: http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        reloader.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stres indeksi / event paneli sorgu servisi")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--index-file", default=FILES["region_index"])
+    parser.add_argument("--panel-file", default=FILES["panel"])
+    parser.add_argument("--events-file", default=FILES["events"])
+    parser.add_argument("--reload-interval", type=float, default=RELOAD_INTERVAL)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    files = {"region_index": args.index_file, "panel": args.panel_file, "events": args.events_file}
+    try:
+        asyncio.run(serve(args.host, args.port, files, args.reload_interval, args.verbose))
+    except KeyboardInterrupt:
+        print("[INFO] Servis durduruldu.")
@@ -0,0 +1,504 @@
+"""
+stress_store.py
+
+Amaç:
+- Pipeline aşamalarının ara çıktıları için ortak okuma/yazma katmanı
+- Varsayılan format Parquet (kolon bazlı): region7 / province / event_type
+  gibi tekrar eden metinler kategorik, tarih kolonları datetime64 olarak saklanır,
+  her okumada tarih tekrar parse edilmez
+- Okurken tarih aralığı ve bölge filtresi Parquet'e (predicate pushdown) iletilir
+- Uyumluluk için CSV hâlâ destekleniyor:
+    * .parquet yolu yoksa yanındaki .csv okunur
+    * yazarken varsayılan olarak aynı isimli .csv de güncellenir (EXPORT_CSV)
+    * pyarrow kurulu değilse her şey CSV ile çalışır
+- Ham kaynak dosyalar (AFAD deprem kataloğu, il merkezleri) için sabit
+  şemalar (SOURCES): kesin tarih formatı, kolon tipleri, kategorikler;
+  load_source ile okunur
+- CSV'ler pyarrow varsa pyarrow motoruyla okunur (CSV_ENGINE)
+- Parse edilmiş CSV tabloları .stress_cache/ altında kolon başına .npy
+  dosyaları olarak saklanır ve memory-map ile açılır (copy-on-write);
+  kaynak dosyanın mtime + boyutu değişmediyse tekrar parse edilmez,
+  sadece mtime değiştiyse içerik hash'i kontrol edilir (STRESS_CACHE=0
+  ile kapatılır)
+
+Kullanım:
+    from stress_store import read_table, write_table, load_source
+    region = read_table("region_index", date_range=("2023-01-01", "2023-12-31"),
+                        regions=["Marmara"])
+    eq = load_source("earthquake")
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+# Yazarken .csv kopyasını da güncelle (notebook ve eski scriptler için)
+EXPORT_CSV = True
+
+DATASETS = {
+    "trends": {
+        "path": "google_trends_province_timeseries.parquet",
+        "dates": ["date"],
+        "categories": ["province_code", "province", "region7"],
+    },
+    "region_index": {
+        "path": "region_stress_index_weekly.parquet",
+        "dates": ["date"],
+        "categories": ["region7"],
+    },
+    "events": {
+        "path": "event_dates.parquet",
+        "dates": ["event_date"],
+        "categories": ["event_type"],
+    },
+    "panel": {
+        "path": "event_region_stress_panel.parquet",
+        "dates": ["event_date"],
+        "categories": ["event_type", "region7"],
+    },
+    "panel_sweep": {
+        "path": "event_region_stress_sweep.parquet",
+        "dates": ["event_date"],
+        "categories": ["event_type", "region7"],
+    },
+    "province_panel": {
+        "path": "province_event_panel.parquet",
+        "dates": ["event_date"],
+        "categories": ["event_type", "province_code", "province", "region7", "keyword"],
+    },
+    "response_curves": {
+        "path": "event_response_curves.parquet",
+        "dates": [],
+        "categories": ["event_type", "mag_bucket", "region7"],
+    },
+    # stress_clusters.py çıktıları; data/region_clusters.csv notebook'taki
+    # K-Means sonucu olduğu için ayrı isimler
+    "region_clusters_corr": {
+        "path": "data/region_clusters_corr.csv",
+        "dates": [],
+        "categories": [],
+    },
+    "region_clusters_dtw": {
+        "path": "data/region_clusters_dtw.csv",
+        "dates": [],
+        "categories": [],
+    },
+    "province_clusters_corr": {
+        "path": "data/province_clusters_corr.csv",
+        "dates": [],
+        "categories": ["region7"],
+    },
+    "province_clusters_dtw": {
+        "path": "data/province_clusters_dtw.csv",
+        "dates": [],
+        "categories": ["region7"],
+    },
+}
+
+
+# Ham kaynak dosyaların şemaları
+SOURCES = {
+    "earthquake": {
+        "path": "earthquake.csv",
+        "encoding": "utf-8-sig",
+        # AFAD: '31/10/2025 07:18:50' (gün/ay/yıl)
+        "dates": {"Date": "%d/%m/%Y %H:%M:%S"},
+        "dtypes": {"Longitude": "float64", "Latitude": "float64", "Depth": "float64",
+                   "Rms": "float64", "Magnitude": "float64", "EventID": "int64"},
+        "categories": ["Type", "Location"],
+    },
+    "provinces": {
+        "path": "data/province_centroids.csv",
+        "encoding": "utf-8",
+        "dates": {},
+        "dtypes": {"code": "str", "province": "str", "region7": "str",
+                   "latitude": "float64", "longitude": "float64"},
+        "categories": [],
+    },
+}
+
+CACHE_DIR = os.environ.get("STRESS_CACHE_DIR", ".stress_cache")
+USE_CACHE = os.environ.get("STRESS_CACHE", "1") != "0"
+# _read_table_csv / _read_source parse mantığı değişince artırılır
+# (şema değişiklikleri zaten tag'deki hash ile ayrılır)
+PARSER_VERSION = 1
+
+
+def has_parquet():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+CSV_ENGINE = "pyarrow" if has_parquet() else "c"
+
+
+def dataset_path(name, path=None):
+    """Dataset için yol; verilmezse DATASETS içindeki varsayılan."""
+    return path if path is not None else DATASETS[name]["path"]
+
+
+def csv_sibling(path):
+    return os.path.splitext(path)[0] + ".csv"
+
+
+def _is_parquet(path):
+    return str(path).endswith(".parquet")
+
+
+# --------------------------------------------------
+# Yazma
+# --------------------------------------------------
+
+def write_table(df, name, path=None, export_csv=EXPORT_CSV):
+    """
+    df'yi şemaya göre tiplendirip yazar. Yol .parquet ise Parquet (+ istenirse
+    .csv kopyası), .csv ise sadece CSV yazılır. Yazılan ana yolu döndürür.
+    """
+    path = dataset_path(name, path)
+    df = apply_schema(df, name)
+
+    if _is_parquet(path) and not has_parquet():
+        print(f"  [WARN] pyarrow yok, '{path}' yerine CSV yazılıyor.")
+        path = csv_sibling(path)
+
+    if _is_parquet(path):
+        df.to_parquet(path, index=False)
+        if export_csv:
+            df.to_csv(csv_sibling(path), index=False)
+    else:
+        df.to_csv(path, index=False)
+
+    return path
+
+
+def append_table(df, name, path=None, export_csv=EXPORT_CSV):
+    """
+    Var olan tabloya satır ekler. CSV'de dosyanın sonuna yazar (mode="a");
+    Parquet tek dosya olduğu için mevcut tablo + yeni satırlar tekrar yazılır.
+    """
+    path = dataset_path(name, path)
+    df = apply_schema(df, name)
+
+    if _is_parquet(path) and has_parquet() and os.path.exists(path):
+        old = pd.read_parquet(path)
+        full = apply_schema(pd.concat([old, df], ignore_index=True), name)
+        full.to_parquet(path, index=False)
+        csv_path = csv_sibling(path) if export_csv else None
+    else:
+        csv_path = path if not _is_parquet(path) else csv_sibling(path)
+
+    if csv_path is not None:
+        df.to_csv(csv_path, mode="a", header=not os.path.exists(csv_path), index=False)
+
+    return path
+
+
+def apply_schema(df, name):
+    """Tarih kolonlarını datetime64, tekrar eden metin kolonlarını kategorik yapar."""
+    spec = DATASETS[name]
+    df = df.copy()
+    for col in spec["dates"]:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
+    for col in spec["categories"]:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+# --------------------------------------------------
+# Okuma
+# --------------------------------------------------
+
+def read_table(name, path=None, date_range=None, regions=None, columns=None):
+    """
+    Dataset'i okur.
+
+    - date_range: (başlangıç, bitiş) dahil; None uçlar açık
+    - regions:    region7 değerleri listesi
+    - columns:    sadece bu kolonlar
+
+    Parquet'te filtreler dosyaya iletilir (row group istatistikleriyle
+    gereksiz bloklar okunmaz); CSV'de okuduktan sonra uygulanır.
+    """
+    path = resolved_path(name, path)
+    spec = DATASETS[name]
+    date_col = spec["dates"][0] if spec["dates"] else None
+
+    filters = _filters(date_col, date_range, regions)
+
+    if _is_parquet(path):
+        df = pd.read_parquet(path, columns=columns, filters=filters or None)
+    else:
+        df = cached_frame(path, _cache_tag("table", name, spec), lambda: _read_table_csv(path, spec))
+        if columns is not None:
+            df = df[list(columns)]
+        df = _apply_filters(df, filters)
+
+    for col in spec["categories"]:
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+
+    return df
+
+
+def resolved_path(name, path=None):
+    """read_table'ın gerçekte okuyacağı dosya (.parquet yoksa / okunamıyorsa .csv)."""
+    path = dataset_path(name, path)
+    if _is_parquet(path) and (not os.path.exists(path) or not has_parquet()):
+        path = csv_sibling(path)
+    return path
+
+
+def _read_table_csv(path, spec):
+    dtypes = {c: "category" for c in spec["categories"]}
+    df = pd.read_csv(path, dtype=dtypes, engine=CSV_ENGINE)
+    for col in spec["dates"]:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format="ISO8601")
+    return df
+
+
+def load_source(name, path=None):
+    """
+    Ham kaynak dosyayı SOURCES şemasıyla okur: tarih kolonları kesin
+    formatla datetime64 (parse edilemeyen satır NaT), sayısal kolonlar
+    verilen tiplerle, tekrar eden metinler kategorik. Sonuç cache'lenir.
+    """
+    spec = SOURCES[name]
+    path = path if path is not None else spec["path"]
+    return cached_frame(path, _cache_tag("source", name, spec), lambda: _read_source(path, spec))
+
+
+def _cache_tag(kind, name, spec):
+    # Şema (DATASETS / SOURCES girdisi), parser sürümü ve CSV motoru değişirse
+    # eski parse kullanılmaz
+    digest = hashlib.sha1(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return f"{kind}:{name}:v{PARSER_VERSION}:{CSV_ENGINE}:{digest}"
+
+
+def _read_source(path, spec):
+    dtypes = {c: "category" for c in spec["categories"]}
+    dtypes |= {c: (str if t == "str" else t) for c, t in spec["dtypes"].items()}
+    dtypes |= {c: str for c in spec["dates"]}
+    df = pd.read_csv(path, dtype=dtypes, encoding=spec["encoding"], engine=CSV_ENGINE)
+    for col, fmt in spec["dates"].items():
+        df[col] = pd.to_datetime(df[col], format=fmt, errors="coerce")
+    return df
+
+
+# --------------------------------------------------
+# Memory-map'li binary cache
+# --------------------------------------------------
+
+def cached_frame(path, tag, loader):
+    """
+    loader() ile parse edilen tabloyu, kaynak dosya (path) değişmedikçe
+    CACHE_DIR'den döndürür. tag, aynı dosyanın farklı okuma şekillerini
+    (şema, parser sürümü) ayırır; şema değişirse tag da değişmeli.
+
+    Geçerlilik: mtime + boyut aynıysa cache kullanılır; mtime değişip
+    içerik hash'i aynıysa (ör. dosya kopyalandı / touch) cache yenilenmeden
+    kullanılır. Diğer durumlarda loader tekrar çalışır.
+
+    Cache birden çok süreç (notebook, batch işleri) tarafından aynı anda
+    kullanılabilir: okunamayan / yazılamayan kayıt sadece cache miss sayılır.
+    """
+    if not USE_CACHE:
+        return loader()
+
+    key = hashlib.sha1(f"{os.path.abspath(path)}|{tag}".encode("utf-8")).hexdigest()[:16]
+    cache_dir = os.path.join(CACHE_DIR, key)
+    stat = os.stat(path)
+    meta = _read_meta(cache_dir)
+
+    if meta is not None and meta["tag"] == tag and meta["size"] == stat.st_size:
+        fresh = meta["mtime_ns"] == stat.st_mtime_ns
+        if not fresh and meta["sha256"] == _file_sha256(path):
+            fresh = True
+            meta["mtime_ns"] = stat.st_mtime_ns
+            try:
+                _write_meta(cache_dir, meta)
+            except OSError:
+                pass
+        if fresh:
+            try:
+                return _load_frame(cache_dir, meta)
+            except (OSError, ValueError):
+                # Kayıt bu arada başka bir süreç tarafından değiştirildi
+                pass
+
+    df = loader()
+    _save_frame(cache_dir, df, {
+        "tag": tag,
+        "source": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": _file_sha256(path),
+    })
+    return df
+
+
+def clear_cache(cache_dir=None):
+    shutil.rmtree(cache_dir or CACHE_DIR, ignore_errors=True)
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _read_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(cache_dir, meta):
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", prefix="meta.json.", dir=cache_dir)
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(cache_dir, "meta.json"))
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _save_frame(cache_dir, df, meta):
+    # Her yazma kendi geçici klasörüne (mkdtemp) yazıp atomik rename ile
+    # yayımlar; aynı kaydı aynı anda yazan süreçler birbirinin klasörünü
+    # silmez. Yazma hatası ya da kaybedilen yarış cache'siz devam etmek demek.
+    root = os.path.dirname(cache_dir)
+    try:
+        os.makedirs(root, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=root)
+    except OSError:
+        return
+
+    try:
+        columns = _write_columns(tmp, df)
+        if columns is None:
+            return
+        meta["columns"] = columns
+        meta["rows"] = len(df)
+        _write_meta(tmp, meta)
+        _publish_dir(tmp, cache_dir)
+    except OSError:
+        pass
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _publish_dir(tmp, cache_dir):
+    # Eski kayıt önce kenara alınır, sonra yenisi yerine taşınır (ikisi de
+    # rename). Arada başka bir süreç yayımlarsa son rename OSError verir ve
+    # onun kaydı kalır.
+    if os.path.exists(cache_dir):
+        old = tmp + ".old"
+        try:
+            os.rename(cache_dir, old)
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(old, ignore_errors=True)
+    os.rename(tmp, cache_dir)
+
+
+def _write_columns(tmp, df):
+    # Kolon başına .npy; metinler kod + kategori listesi olarak saklanır.
+    # Desteklenmeyen bir kolon varsa (tz'li tarih, karışık nesne) None döner,
+    # cache yazılmaz.
+    columns = []
+    for i, col in enumerate(df.columns):
+        s = df[col]
+        entry = {"name": col, "file": f"{i}.npy"}
+        if isinstance(s.dtype, pd.CategoricalDtype) or s.dtype == object:
+            cat = s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")
+            categories = cat.cat.categories
+            if categories.dtype != object or not all(isinstance(c, str) for c in categories):
+                return None
+            entry["kind"] = "category" if isinstance(s.dtype, pd.CategoricalDtype) else "str"
+            entry["categories"] = list(categories)
+            values = cat.cat.codes.to_numpy()
+        elif s.dtype.kind == "M" and getattr(s.dtype, "tz", None) is None:
+            entry["kind"] = "datetime"
+            entry["dtype"] = str(s.dtype)
+            values = s.to_numpy().view(np.int64)
+        elif s.dtype.kind in "biuf":
+            entry["kind"] = "numeric"
+            values = s.to_numpy()
+        else:
+            return None
+        np.save(os.path.join(tmp, entry["file"]), values)
+        columns.append(entry)
+    return columns
+
+
+def _load_frame(cache_dir, meta):
+    # mmap_mode="c": sayfalar ihtiyaç oldukça okunur, yazmalar dosyaya gitmez
+    data = {}
+    for entry in meta["columns"]:
+        values = np.load(os.path.join(cache_dir, entry["file"]), mmap_mode="c")
+        kind = entry["kind"]
+        if kind == "numeric":
+            data[entry["name"]] = values
+        elif kind == "datetime":
+            data[entry["name"]] = values.view(entry["dtype"])
+        else:
+            cat = pd.Categorical.from_codes(values, categories=entry["categories"])
+            data[entry["name"]] = cat if kind == "category" else np.asarray(cat, dtype=object)
+    return pd.DataFrame(data, copy=False)
+
+
+def iter_table_chunks(name, path=None, chunksize=100_000):
+    """Dataset'i en fazla chunksize satırlık DataFrame parçaları hâlinde okur."""
+    path = resolved_path(name, path)
+    spec = DATASETS[name]
+
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            for col in spec["dates"]:
+                if col in chunk.columns:
+                    chunk[col] = pd.to_datetime(chunk[col])
+            yield chunk
+
+
+def _filters(date_col, date_range, regions):
+    filters = []
+    if date_range is not None:
+        start, end = date_range
+        if start is not None:
+            filters.append((date_col, ">=", pd.Timestamp(start)))
+        if end is not None:
+            filters.append((date_col, "<=", pd.Timestamp(end)))
+    if regions is not None:
+        filters.append(("region7", "in", list(regions)))
+    return filters
+
+
+def _apply_filters(df, filters):
+    mask = pd.Series(True, index=df.index)
+    for col, op, value in filters:
+        if op == ">=":
+            mask &= df[col] >= value
+        elif op == "<=":
+            mask &= df[col] <= value
+        elif op == "in":
+            mask &= df[col].isin(value)
+    return df.loc[mask].reset_index(drop=True)
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Testler repo'daki .stress_cache'e ve run_log.jsonl'e yazmasın
+os.environ.setdefault("STRESS_CACHE", "0")
+os.environ.setdefault("STRESS_RUN_LOG", "")
+
+from stress_store import read_table  # noqa: E402
+
+
+def root_file(name):
+    return os.path.join(ROOT, name)
+
+
+def sorted_frame(df, keys):
+    # Karşılaştırma için sıralı, kategoriler metin
+    out = df.sort_values(keys).reset_index(drop=True)
+    for col in ("region7", "event_type"):
+        if col in out.columns:
+            out[col] = out[col].astype(str)
+    return out
+
+
+def write_catalog(path, rows):
+    """AFAD şemasında küçük deprem kataloğu: rows = (tarih, boylam, enlem, derinlik, M)."""
+    with open(path, "w", encoding="utf-8-sig") as f:
+        f.write("Date,Longitude,Latitude,Depth,Rms,Type,Magnitude,Location,EventID\n")
+        for i, (date, lon, lat, depth, mag) in enumerate(rows):
+            f.write(f'"{date}",{lon},{lat},{depth},0.5,"MW",{mag},"Test",{i + 1}\n')
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def trends():
+    return read_table("trends", root_file("google_trends_province_timeseries.csv"))
+
+
+@pytest.fixture(scope="session")
+def region():
+    return read_table("region_index", root_file("region_stress_index_weekly.csv"))
+
+
+@pytest.fixture(scope="session")
+def events():
+    return read_table("events", root_file("event_dates.csv"))
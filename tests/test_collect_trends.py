@@ -0,0 +1,141 @@
+"""
+collect_trends_provinces: eşzamanlı toplama (hız sınırı, tekrar deneme,
+disk cache), artımlı güncelleme ve pencere ölçekleme.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import collect_trends_provinces as ctp
+from stress_store import read_table, write_table
+
+KW = ["a", "b"]
+FREQ = pd.tseries.frequencies.to_offset("MS")
+
+
+def frame(dates, a, b):
+    return pd.DataFrame({"date": pd.to_datetime(dates), "a": a, "b": b})
+
+
+def test_rescale_keeps_overlap_level_and_revises_overlap():
+    old = frame(["2024-01-01", "2024-02-01", "2024-03-01"], [10, 20, 6], [0, 10, 4]).set_index("date")
+    window = frame(["2024-02-01", "2024-03-01", "2024-04-01"], [5, 10, 20], [5, 10, 10])
+
+    fresh = ctp.rescale_window(old, window, KW, FREQ)
+
+    # Çakışan dönemler (şubat, eksik kalmış mart) da döner ve değişir
+    assert list(fresh.index) == list(pd.to_datetime(["2024-02-01", "2024-03-01", "2024-04-01"]))
+    overlap = fresh.index[:2]
+    assert fresh.loc[overlap].to_numpy().sum() == pytest.approx(old.loc[overlap].to_numpy().sum())
+    scale = 40 / 30
+    np.testing.assert_allclose(fresh.loc["2024-04-01"], np.round([20 * scale, 10 * scale], 2))
+
+
+def test_rescale_falls_back_to_unit_scale_when_old_overlap_is_zero():
+    old = frame(["2024-01-01", "2024-02-01"], [0, 0], [0, 0]).set_index("date")
+    window = frame(["2024-02-01", "2024-03-01"], [3, 7], [1, 2])
+
+    fresh = ctp.rescale_window(old, window, KW, FREQ)
+    np.testing.assert_array_equal(fresh.to_numpy(), window.set_index("date")[KW].to_numpy())
+
+
+def test_rescale_without_overlap_returns_none():
+    old = frame(["2024-01-01"], [1], [1]).set_index("date")
+    window = frame(["2024-03-01"], [1], [1])
+    assert ctp.rescale_window(old, window, KW, FREQ) is None
+
+
+def test_refresh_appends_new_periods_and_replaces_overlap(trends, tmp_path):
+    dates = np.sort(trends["date"].unique())
+    cut = dates[-4]
+    existing = trends.loc[trends["date"] <= cut].astype({kw: float for kw in ctp.KW_LIST})
+    # Son dönem önceki çalıştırmada eksik (kısmi) çekilmiş olsun
+    last = existing["date"] == cut
+    existing.loc[last, ctp.KW_LIST] = (existing.loc[last, ctp.KW_LIST] * 0.5).round(2)
+    out_file = str(tmp_path / "trends.parquet")
+    write_table(existing, "trends", out_file)
+
+    source = str(tmp_path / "source.parquet")
+    write_table(trends, "trends", source, export_csv=False)
+
+    updated = ctp.refresh_trends_provinces(
+        out_file=out_file, fetcher=ctp.csv_stub_fetcher(source), end_date=dates[-1],
+        overlap_periods=2, cache_dir=str(tmp_path / "cache"), rate_per_sec=1000.0,
+    )
+    assert (updated["date"] == cut).any()
+
+    result = read_table("trends", out_file)
+    assert not result.duplicated(["province_code", "date"]).any()
+    assert set(result["date"]) == set(trends["date"])
+    # CSV kopyası da aynı tabloyu taşır
+    csv = read_table("trends", str(tmp_path / "trends.csv"))
+    assert len(csv) == len(result)
+
+    # Revize edilen kısmi dönem eski (yarıya düşürülmüş) değerde kalmamalı
+    key = ["province_code", "date"]
+    got = result.set_index(key)[ctp.KW_LIST].sort_index()
+    old = existing.set_index(key)[ctp.KW_LIST].sort_index()
+    rows = updated.set_index(key).index
+    assert not np.allclose(got.loc[rows.intersection(old.index)].to_numpy(),
+                           old.loc[rows.intersection(old.index)].to_numpy())
+
+
+# --------------------------------------------------
+# Havuz, hız sınırı, tekrar deneme, cache
+# --------------------------------------------------
+
+def test_token_bucket_limits_rate():
+    bucket = ctp.TokenBucket(rate=50.0, capacity=1)
+    t0 = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # İlk token hazır, sonraki 5'i 1/50 s aralıkla
+    assert time.monotonic() - t0 >= 5 / 50 * 0.9
+
+
+def test_fetch_with_retry_retries_then_raises():
+    bucket = ctp.TokenBucket(rate=1000.0, capacity=10)
+    calls = []
+
+    def flaky(geo, kw_list, timeframe):
+        calls.append(geo)
+        if len(calls) < 3:
+            raise ConnectionError("429")
+        return frame(["2024-01-01"], [1], [2])
+
+    out = ctp.fetch_with_retry(flaky, bucket, "TR-06", KW, "x", max_retries=2, backoff=0.0)
+    assert len(calls) == 3 and len(out) == 1
+
+    calls.clear()
+    with pytest.raises(ConnectionError):
+        ctp.fetch_with_retry(flaky, bucket, "TR-06", KW, "x", max_retries=1, backoff=0.0)
+    assert len(calls) == 2
+
+
+def test_fetch_provinces_resumes_from_cache(tmp_path):
+    provinces = pd.DataFrame(ctp.PROVINCES).head(6)
+    bad = provinces["code"].iloc[2]
+    fetched = []
+
+    def fetch(geo, kw_list, timeframe):
+        fetched.append(geo)
+        if geo == bad:
+            raise ConnectionError("bağlantı koptu")
+        return frame(["2024-01-01", "2024-02-01"], [1, 2], [3, 4])
+
+    kwargs = dict(cache_dir=str(tmp_path), max_workers=3, rate_per_sec=1000.0,
+                  max_retries=0, backoff=0.0)
+    first = ctp.fetch_provinces(provinces, KW, "2024-01-01 2024-02-29", fetcher=fetch, **kwargs)
+    assert set(first) == set(provinces["code"]) - {bad}
+    assert sorted(fetched) == sorted(provinces["code"])
+
+    # İkinci çalıştırma sadece eksik ili çeker, diğerleri cache'ten aynen gelir
+    fetched.clear()
+    bad = None
+    second = ctp.fetch_provinces(provinces, KW, "2024-01-01 2024-02-29", fetcher=fetch, **kwargs)
+    assert fetched == [provinces["code"].iloc[2]]
+    assert set(second) == set(provinces["code"])
+    for code, df in first.items():
+        pd.testing.assert_frame_equal(second[code], df, check_dtype=False)
@@ -0,0 +1,78 @@
+"""
+Gardner–Knopoff declustering: elle hesaplanmış küçük katalog ve KD-ağaçsız
+kaba kuvvet referansı.
+"""
+import numpy as np
+import pandas as pd
+
+from conftest import root_file, write_catalog
+from earthquake_events import (
+    chord_to_km,
+    decluster_gardner_knopoff,
+    earthquake_events,
+    gk_window,
+    load_catalog,
+    to_xyz,
+)
+
+# GK pencereleri: M6.0 → ~53 km / ~499 gün, M4.8 → ~38 km / ~112 gün;
+# 0.1° enlem ≈ 11 km
+ROWS = [
+    ("05/01/2024 03:00:00", 30.0, 38.1, 10.0, 4.6),   # C: A'nın öncüsü
+    ("10/01/2024 12:00:00", 30.0, 38.0, 10.0, 6.0),   # A: ana şok
+    ("12/01/2024 08:00:00", 30.0, 38.2, 10.0, 5.0),   # B: A'nın artçısı
+    ("01/03/2024 00:00:00", 30.0, 39.0, 10.0, 4.8),   # D: A'dan ~111 km, ana şok
+    ("10/03/2024 00:00:00", 30.0, 39.1, 10.0, 4.5),   # E: D'nin artçısı
+    ("01/06/2026 00:00:00", 30.0, 38.0, 10.0, 5.0),   # F: A'nın penceresi dışında
+]
+
+
+def test_gk_window_values():
+    dist, days = gk_window([6.0, 4.8, 7.0])
+    np.testing.assert_allclose(dist, 10 ** (0.1238 * np.array([6.0, 4.8, 7.0]) + 0.983))
+    np.testing.assert_allclose(days[:2], 10 ** (0.5409 * np.array([6.0, 4.8]) - 0.547))
+    assert days[2] == 10 ** (0.032 * 7.0 + 2.7389)
+
+
+def test_hand_computed_catalog(tmp_path):
+    cat = load_catalog(write_catalog(tmp_path / "eq.csv", ROWS))
+    out = decluster_gardner_knopoff(cat).set_index("EventID")
+
+    # EventID = ROWS sırası + 1 (A=2, B=3, C=1, D=4, E=5, F=6)
+    assert out.loc[out["mainshock"]].index.tolist() == [2, 4, 6]
+    ids = cat["EventID"].to_numpy()
+    parent = {eid: ids[c] for eid, c in zip(out.index, out["cluster_id"])}
+    assert parent == {1: 2, 2: 2, 3: 2, 4: 4, 5: 4, 6: 6}
+
+
+def test_events_keep_only_mainshock_days(tmp_path):
+    eq_file = write_catalog(tmp_path / "eq.csv", ROWS)
+    main = earthquake_events(eq_file, mag_min=4.5, decluster=True)
+    assert sorted(main["time"].dt.strftime("%Y-%m-%d")) == ["2024-01-10", "2024-03-01", "2026-06-01"]
+    assert len(earthquake_events(eq_file, mag_min=4.5, decluster=False)) == len(ROWS)
+
+
+def naive_decluster(cat):
+    mag = cat["Magnitude"].to_numpy(dtype=np.float64)
+    days = cat["time"].to_numpy("datetime64[s]").astype(np.int64) / 86400.0
+    xyz = to_xyz(cat["Latitude"], cat["Longitude"])
+    dist_km, win_days = gk_window(mag)
+
+    assigned = np.zeros(len(cat), dtype=bool)
+    main = np.zeros(len(cat), dtype=bool)
+    for i in np.lexsort((days, -mag)):
+        if assigned[i]:
+            continue
+        d = chord_to_km(np.linalg.norm(xyz - xyz[i], axis=1))
+        near = ~assigned & (d <= dist_km[i]) & (np.abs(days - days[i]) <= win_days[i])
+        assigned |= near
+        assigned[i] = main[i] = True
+    return main
+
+
+def test_indexed_matches_brute_force_on_catalog():
+    cat = load_catalog(root_file("earthquake.csv"))
+    cat = cat[cat["Magnitude"] >= 4.0].reset_index(drop=True)
+    out = decluster_gardner_knopoff(cat)
+    np.testing.assert_array_equal(out["mainshock"].to_numpy(), naive_decluster(cat))
+    assert pd.Series(out["cluster_id"]).between(0, len(cat) - 1).all()
@@ -0,0 +1,35 @@
+"""
+Vektörize event paneli: döngülü referansla ve repodaki baseline
+event_region_stress_panel.csv ile aynı sonucu vermeli.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analyze_region_stress import build_event_panel
+from benchmark_event_panel import build_event_panel_loop
+from conftest import root_file
+
+VALUE_COLS = ["pre_mean", "post_mean", "delta_stress"]
+
+
+@pytest.fixture(scope="module")
+def panel(region, events):
+    return build_event_panel(region, events, out_file=None)
+
+
+def test_panel_matches_loop_reference(region, events, panel):
+    ref = build_event_panel_loop(region, events)
+    got = panel.reset_index(drop=True)
+    for col in VALUE_COLS:
+        np.testing.assert_array_equal(got[col].to_numpy(), ref[col].to_numpy(), err_msg=col)
+    assert (got["region7"].astype(str).to_numpy() == ref["region7"].astype(str).to_numpy()).all()
+
+
+def test_panel_reproduces_baseline_csv_bytes(events):
+    # Baseline script'in okuduğu gibi (pandas C motoru) okunan indeksle
+    # panel CSV'si bayt bayt aynı çıkmalı
+    region = pd.read_csv(root_file("region_stress_index_weekly.csv"), parse_dates=["date"])
+    panel = build_event_panel(region, events, out_file=None)
+    with open(root_file("event_region_stress_panel.csv"), encoding="utf-8") as f:
+        assert panel.to_csv(index=False) == f.read()
@@ -0,0 +1,52 @@
+"""
+Event-study küpü ve tepki eğrileri: döngülü / groupby referanslarıyla.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from event_study import build_response_cube, region_matrix, response_curves
+
+MAX_LAG = 3
+
+
+@pytest.fixture(scope="module")
+def cube(region, events):
+    return build_response_cube(region, events, MAX_LAG)
+
+
+def test_cube_matches_loop_lookup(region, events, cube):
+    mat = region_matrix(region)
+    dates = pd.DatetimeIndex(mat["dates"])
+    ev = cube["events"]
+    assert len(ev) == (pd.to_datetime(events["event_date"]) >= dates[0]).sum()
+
+    for e, date in enumerate(pd.to_datetime(ev["event_date"])):
+        anchor = dates.get_indexer([dates[dates <= date][-1]])[0]
+        for j, k in enumerate(cube["offsets"]):
+            t = anchor + k
+            expected = mat["values"][t] if 0 <= t < len(dates) else np.full(len(mat["regions"]), np.nan)
+            np.testing.assert_array_equal(cube["cube"][e, j], expected)
+
+
+def test_curves_match_groupby(cube):
+    curves = response_curves(cube, by=["event_type"], baseline=-1)
+
+    Y = cube["cube"] - cube["cube"][:, [MAX_LAG - 1], :]
+    e, k, r = np.indices(Y.shape).reshape(3, -1)
+    long = pd.DataFrame({
+        "event_type": cube["events"]["event_type"].astype(str).to_numpy()[e],
+        "k": cube["offsets"][k],
+        "region7": np.asarray(cube["regions"])[r],
+        "y": Y.reshape(-1),
+    }).dropna()
+    ref = long.groupby(["event_type", "region7", "k"])["y"].agg(["mean", "std", "count"])
+
+    got = curves.assign(event_type=curves["event_type"].astype(str)) \
+                .set_index(["event_type", "region7", "k"]).loc[ref.index]
+    np.testing.assert_allclose(got["mean"], ref["mean"], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(got["se"], ref["std"] / np.sqrt(ref["count"]), rtol=1e-9)
+    np.testing.assert_array_equal(got["n_events"], ref["count"])
+
+    base = curves[curves["k"] == -1]
+    np.testing.assert_array_equal(base["mean"].fillna(0.0), 0.0)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+import pandas as pd
+
+from conftest import root_file
+from fx_events import dedup_shocks, detect_fx_shocks, load_fx, parse_percent, parse_volume
+
+
+def test_parse_volume_placeholders():
+    got = parse_volume(pd.Series(["12.5K", "3.10M", "1.2B", "", "-", " - ", "1,234"]))
+    expected = [12.5e3, 3.10e6, 1.2e9, np.nan, np.nan, np.nan, 1234.0]
+    np.testing.assert_allclose(got.to_numpy(), expected)
+
+
+def test_parse_percent_placeholders():
+    got = parse_percent(pd.Series(["0.27%", "-1.50%", "", "-"]))
+    np.testing.assert_allclose(got.to_numpy(), [0.0027, -0.015, np.nan, np.nan])
+
+
+def test_detect_fx_shocks_without_pair_column():
+    fx = load_fx(root_file("USD_TRY Historical Data.csv"))
+    with_pair = detect_fx_shocks(fx)
+    without = detect_fx_shocks(fx.drop(columns="pair"))
+    pd.testing.assert_frame_equal(with_pair.drop(columns="pair"), without.drop(columns="pair"))
+    assert (without["pair"] == "").all()
+
+
+@pytest.mark.parametrize("horizons", [(0,), (1, 0), (-2,), ()])
+def test_detect_fx_shocks_rejects_bad_horizons(horizons):
+    fx = pd.DataFrame({"date": pd.date_range("2024-01-01", periods=5), "price": [1.0, 2, 3, 4, 5]})
+    with pytest.raises(ValueError, match="Ufuklar"):
+        detect_fx_shocks(fx, horizons=horizons)
+
+
+def test_multi_horizon_returns_match_log_differences():
+    price = np.array([10.0, 10.5, 9.8, 11.0, 12.1, 11.7])
+    fx = pd.DataFrame({"date": pd.date_range("2024-01-01", periods=6), "price": price})
+    out = detect_fx_shocks(fx, horizons=(1, 3), threshold=10.0)
+    lp = np.log(price)
+    # Eşik çok yüksek: en güçlü ufuk |ret| en büyük olan
+    for i in range(1, 6):
+        cands = {h: lp[i] - lp[i - h] for h in (1, 3) if i >= h}
+        h = max(cands, key=lambda k: abs(cands[k]))
+        assert out["horizon"].iloc[i] == h
+        assert out["ret"].iloc[i] == pytest.approx(cands[h])
+
+
+@pytest.mark.parametrize("min_gap_days", [0, -1, 3])
+def test_dedup_always_reports_cluster_size(min_gap_days):
+    shocks = pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-10"]),
+        "pair": "USD_TRY",
+        "ret": [0.03, -0.05, 0.04],
+        "z": np.nan,
+        "shock": True,
+    })
+    out = dedup_shocks(shocks, min_gap_days)
+    if min_gap_days > 0:
+        assert out["cluster_size"].tolist() == [2, 1]
+        assert out["ret"].tolist() == [-0.05, 0.04]
+    else:
+        assert out["cluster_size"].tolist() == [1, 1, 1]
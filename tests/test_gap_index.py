@@ -0,0 +1,79 @@
+"""
+Eksik veri aşaması: toplu boşluk doldurma ve kapsam ağırlıklı bölge indeksi.
+"""
+import numpy as np
+import pandas as pd
+
+from build_region_stress_index import (
+    gap_mask,
+    gap_region_index,
+    interpolate_gaps,
+    lowrank_gaps,
+    region_stress_index,
+)
+
+
+def random_gaps(seed=0, shape=(6, 3, 40), missing=0.3):
+    rng = np.random.default_rng(seed)
+    z = rng.normal(size=shape)
+    mask = rng.random(shape) > missing
+    mask[0, 0] = False            # hiç gözlemi olmayan seri
+    mask[1, 0, :] = False
+    mask[1, 0, 5] = True          # tek gözlemli seri
+    return z, mask
+
+
+def test_interpolate_keeps_observed_and_matches_pandas():
+    z, mask = random_gaps()
+    out = interpolate_gaps(z, mask)
+
+    np.testing.assert_array_equal(out[mask], z[mask])
+    assert np.isnan(out[0, 0]).all()
+
+    ref = (
+        pd.DataFrame(np.where(mask, z, np.nan).reshape(-1, z.shape[-1]).T)
+        .interpolate(limit_direction="both")
+        .to_numpy().T.reshape(z.shape)
+    )
+    np.testing.assert_allclose(out, ref, rtol=0, atol=1e-12)
+
+
+def test_lowrank_keeps_observed_cells():
+    z, mask = random_gaps(seed=1)
+    out = lowrank_gaps(z, mask)
+
+    np.testing.assert_array_equal(out[mask], z[mask])
+    assert np.isnan(out[0, 0]).all()
+    assert np.isfinite(out[1:]).all()
+
+
+def test_zero_cells_count_as_observed_by_default():
+    values = np.array([[[0.0, np.nan, 3.0]]])
+    np.testing.assert_array_equal(gap_mask(values), [[[True, False, True]]])
+    np.testing.assert_array_equal(gap_mask(values, zero_missing=True), [[[False, False, True]]])
+
+
+def test_gap_index_without_gaps_equals_plain_index(trends):
+    plain = region_stress_index(trends)
+    for method in ("interpolate", "lowrank"):
+        gap = region_stress_index(trends, gaps=method)
+        assert (gap["coverage"] <= 1).all()
+        np.testing.assert_allclose(gap["stress_index"], plain["stress_index"], rtol=0, atol=1e-12)
+
+
+def test_filled_cells_weigh_by_region_week_coverage():
+    dates = pd.date_range("2024-01-01", periods=4, freq="MS")
+    arr = {
+        "province_region": np.array(["R", "R"]),
+        "dates": dates,
+        "values": np.array([[[1.0, 2.0, 3.0, 4.0]], [[4.0, np.nan, np.nan, 1.0]]]),
+    }
+    out = gap_region_index(arr, np.ones((1, 1)), ["stress_index"], min_coverage=0.0)
+
+    z0 = (np.arange(1, 5) - 2.5) / np.sqrt(1.25)
+    z1 = np.array([1.0, 1 / 3, -1 / 3, -1.0])       # (4, 1) z = ±1, arası doğrusal
+    cov = np.array([1.0, 0.5, 0.5, 1.0])
+    expected = (z0 + cov * z1) / (1 + cov)
+
+    np.testing.assert_allclose(out["coverage"], cov)
+    np.testing.assert_allclose(out["stress_index"], expected, rtol=0, atol=1e-12)
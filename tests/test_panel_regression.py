@@ -0,0 +1,38 @@
+"""
+Panel regresyon katmanı: tek formüllü run_anova'yı ve dummy kolonlu OLS'u
+yeniden üretmeli.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from analyze_region_stress import build_event_panel, run_anova
+from panel_regression import fit_specs
+
+
+@pytest.fixture(scope="module")
+def panel(region, events):
+    return build_event_panel(region, events, out_file=None)
+
+
+def test_anova_spec_reproduces_run_anova(panel):
+    anova = run_anova(panel, verbose=False)
+    _, wald = fit_specs(panel, [{"name": "anova", "fe": [], "terms": ["C(region7)"]}], cov="iid")
+    assert wald["F"].iloc[0] == pytest.approx(anova["F"].iloc[0], rel=1e-9)
+    assert wald["p_value"].iloc[0] == pytest.approx(anova["PR(>F)"].iloc[0], rel=1e-6)
+
+
+def test_event_fe_matches_dummy_ols(panel):
+    coef, _ = fit_specs(panel, [{"name": "event_fe", "fe": ["event"], "terms": ["C(region7)"]}],
+                        cov="iid")
+
+    df = panel.dropna(subset=["delta_stress"]).copy()
+    event = df["event_date"].astype(str) + "|" + df["event_type"].astype(str)
+    X = pd.concat([pd.get_dummies(event, dtype=float),
+                   pd.get_dummies(df["region7"].astype(str), dtype=float).iloc[:, 1:]], axis=1)
+    beta, *_ = np.linalg.lstsq(X.to_numpy(), df["delta_stress"].to_numpy(), rcond=None)
+    ref = pd.Series(beta[-(X.shape[1] - event.nunique()):], index=X.columns[event.nunique():])
+
+    got = coef.set_index("name")["coef"]
+    assert len(got) == len(ref)
+    np.testing.assert_allclose(got.to_numpy(), ref.to_numpy(), rtol=0, atol=1e-9)
@@ -0,0 +1,37 @@
+"""
+İl paneli maruziyeti: merkez üssü event günlerini üreten filtreli katalogdan.
+"""
+import numpy as np
+import pandas as pd
+
+from conftest import root_file, write_catalog
+from province_event_panel import epicenters_by_day, exposure_weights
+
+
+def test_epicenters_follow_event_filter(events):
+    epi = epicenters_by_day(root_file("earthquake.csv"))
+    eq_days = pd.to_datetime(events.loc[events["event_type"] == "earthquake", "event_date"])
+
+    assert set(epi.index) == set(eq_days)
+    assert (epi["Magnitude"] >= 4.5).all()
+    assert epi["Depth"].between(0.0, 40.0).all()
+
+
+def test_deep_larger_quake_is_not_the_epicenter(tmp_path):
+    eq_file = write_catalog(tmp_path / "eq.csv", [
+        ("01/03/2024 01:00:00", 27.0, 38.0, 120.0, 6.1),   # derin, filtre dışı
+        ("01/03/2024 05:00:00", 35.0, 39.0, 10.0, 5.0),
+        ("02/03/2024 05:00:00", 30.0, 37.0, 8.0, 4.0),     # küçük, filtre dışı
+    ])
+    epi = epicenters_by_day(eq_file)
+
+    assert list(epi.index) == [pd.Timestamp("2024-03-01")]
+    assert epi["Magnitude"].iloc[0] == 5.0
+    assert epi["Longitude"].iloc[0] == 35.0
+
+    events = pd.DataFrame({"event_date": pd.to_datetime(["2024-03-01", "2024-03-02"]),
+                           "event_type": ["earthquake", "earthquake"]})
+    weight, dist = exposure_weights(events, np.array([39.0]), np.array([35.0]), epi)
+    assert dist[0, 0] < 1.0 and weight[0, 0] > 0.99
+    # Filtreyi geçen depremi olmayan gün ulusal event gibi: w = 1, d = NaN
+    assert weight[1, 0] == 1.0 and np.isnan(dist[1, 0])
@@ -0,0 +1,43 @@
+"""
+Dizi tabanlı bölgesel indeks. Committed region_stress_index_weekly.csv
+baseline (melt + groupby) hesabının çıktısıdır; dizi yolu toplama sırası
+farklı olduğu için son hanede (~2e-16) ayrılır, bu yüzden karşılaştırma
+atol=1e-12 ile yapılır.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from build_region_stress_index import build_region_stress_index, region_stress_index
+from conftest import root_file, sorted_frame
+
+KEYS = ["region7", "date"]
+ATOL = 1e-12
+
+
+@pytest.fixture(scope="module")
+def index(trends):
+    return region_stress_index(trends)
+
+
+def assert_same_index(got, ref, col="stress_index"):
+    got, ref = sorted_frame(got, KEYS), sorted_frame(ref, KEYS)
+    pd.testing.assert_frame_equal(got[KEYS], ref[KEYS])
+    np.testing.assert_allclose(got[col], ref[col], rtol=0, atol=ATOL)
+
+
+def test_index_matches_baseline_csv(index):
+    baseline = pd.read_csv(root_file("region_stress_index_weekly.csv"), parse_dates=["date"])
+    assert_same_index(index, baseline)
+
+
+def test_index_chunked_matches_in_memory(index, tmp_path):
+    out = build_region_stress_index(root_file("google_trends_province_timeseries.csv"),
+                                    str(tmp_path / "index.csv"), chunksize=1000)
+    assert_same_index(out, index)
+
+
+def test_named_indices_share_one_pass(trends, index):
+    multi = region_stress_index(trends, indices="all")
+    assert {"stress_index", "anxiety_index", "somatic_index"} <= set(multi.columns)
+    assert_same_index(multi, index)
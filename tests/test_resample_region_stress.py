@@ -0,0 +1,48 @@
+"""
+Bootstrap / permütasyon çıkarımı: toplu F istatistiği, tekrarlanabilirlik
+ve blok bootstrap ağırlıkları.
+"""
+import numpy as np
+import pytest
+
+from analyze_region_stress import build_event_panel, run_anova
+from resample_region_stress import (
+    _bootstrap_chunk,
+    block_bootstrap,
+    build_design,
+    f_statistic,
+    permutation_test,
+)
+
+
+@pytest.fixture(scope="module")
+def panel(region, events):
+    return build_event_panel(region, events, out_file=None)
+
+
+def test_f_statistic_matches_run_anova(panel):
+    design = build_design(panel)
+    f = f_statistic(design["y"][None, :], design["X"])[0]
+    assert f == pytest.approx(run_anova(panel, verbose=False)["F"].iloc[0], rel=1e-9)
+
+
+def test_permutation_is_independent_of_worker_count(panel):
+    serial = permutation_test(panel, n_reps=1500, seed=7, n_jobs=1)
+    pooled = permutation_test(panel, n_reps=1500, seed=7, n_jobs=2)
+    np.testing.assert_array_equal(serial["null"], pooled["null"])
+    assert 0 < serial["p_value"] <= 1
+
+
+def test_block_covering_all_events_reproduces_observed_means(panel):
+    design = build_design(panel)
+    boot = _bootstrap_chunk(design, 5, np.random.SeedSequence(0), block_len=design["n_events"])
+    observed = (design["y"] @ design["X"]) / design["X"].sum(axis=0)
+    np.testing.assert_allclose(boot, np.broadcast_to(observed, boot.shape), rtol=1e-12)
+
+
+def test_bootstrap_interval_brackets_observed_mean(panel):
+    res = block_bootstrap(panel, n_reps=500, seed=1, n_jobs=1)
+    s = res["summary"]
+    assert res["replicates"].shape == (500, len(s))
+    assert ((s["ci_low"] <= s["mean_delta"]) & (s["mean_delta"] <= s["ci_high"])).all()
+    assert s["p_value"].between(0, 1).all()
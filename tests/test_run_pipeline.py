@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+import run_pipeline
+from stress_store import write_table
+
+
+@pytest.mark.parametrize("name", list(run_pipeline.STAGES))
+def test_stage_code_includes_transitive_imports(name):
+    files = run_pipeline.code_closure(tuple(run_pipeline.STAGES[name]["code"]))
+    assert "stress_store.py" in files
+
+
+def test_stage_key_changes_with_imported_module(monkeypatch):
+    cfg = dict(run_pipeline.DEFAULT_CONFIG)
+    before = run_pipeline.stage_key("panel", cfg, {})
+
+    digest = run_pipeline.file_digest
+
+    def patched(path):
+        return "changed" if path.endswith("stress_store.py") else digest(path)
+
+    monkeypatch.setattr(run_pipeline, "file_digest", patched)
+    assert run_pipeline.stage_key("panel", cfg, {}) != before
+
+
+def test_collect_runs_every_time_and_rekeys_downstream(trends, monkeypatch, tmp_path):
+    trends_file = str(tmp_path / "trends.parquet")
+    calls = []
+
+    def fake_collect(out_file, kw_list, timeframe):
+        calls.append(out_file)
+        df = trends.copy()
+        df[kw_list[0]] = df[kw_list[0]] + len(calls)
+        write_table(df, "trends", out_file)
+        return df
+
+    monkeypatch.setattr(run_pipeline.collect_trends_provinces, "collect_trends_provinces",
+                        fake_collect)
+    cfg = {"collect": True, "trends_file": trends_file}
+    cache_dir = str(tmp_path / "cache")
+
+    first = run_pipeline.run_pipeline(cfg, targets=["trends"], cache_dir=cache_dir)
+    second = run_pipeline.run_pipeline(cfg, targets=["trends"], cache_dir=cache_dir)
+
+    assert len(calls) == 2
+    assert not first["trends"].equals(second["trends"])
+    assert not [f for f in os.listdir(cache_dir) if f.startswith("trends-")]
+
+
+def test_collect_without_data_raises(monkeypatch, tmp_path):
+    import collect_trends_provinces as ctp
+
+    def failing(geo, kw_list, timeframe):
+        raise RuntimeError("yok")
+
+    with pytest.raises(RuntimeError):
+        ctp.collect_trends_provinces(out_file=str(tmp_path / "t.parquet"), fetcher=failing,
+                                     cache_dir=str(tmp_path / "cache"), max_retries=0,
+                                     rate_per_sec=1000.0, backoff=0.0)
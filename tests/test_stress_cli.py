@@ -0,0 +1,54 @@
+"""
+stress_cli: alt komut yönlendirmesi ve tembel importlar.
+"""
+import json
+import subprocess
+import sys
+
+import pytest
+
+import stress_cli
+from conftest import ROOT
+
+PROBE = """
+import json, sys
+import stress_cli
+before = sorted(m for m in ("numpy", "pandas") if m in sys.modules)
+stress_cli.load_command({name!r})
+loaded = [m for m in {forbidden!r} if m in sys.modules]
+print(json.dumps({{"before": before, "loaded": loaded}}))
+"""
+
+
+@pytest.mark.parametrize("name", list(stress_cli.COMMANDS))
+def test_command_does_not_import_forbidden_packages(name):
+    code = PROBE.format(name=name, forbidden=stress_cli.COMMANDS[name]["forbidden"])
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                         text=True, check=True)
+    res = json.loads(out.stdout.strip().splitlines()[-1])
+    assert res["before"] == []          # stress_cli tek başına pandas / numpy yüklemez
+    assert res["loaded"] == []
+
+
+def test_only_given_options_are_forwarded(monkeypatch):
+    mod = stress_cli.load_command("events")
+    calls = []
+    monkeypatch.setattr(mod, "build_event_dates", lambda **kw: calls.append(kw))
+
+    assert stress_cli.main(["events", "--mag-min", "5.0", "--decluster"]) == 0
+    assert calls == [{"mag_min": 5.0, "decluster": True}]
+
+
+def test_index_all_is_passed_as_string(monkeypatch):
+    mod = stress_cli.load_command("index")
+    calls = []
+    monkeypatch.setattr(mod, "build_region_stress_index", lambda **kw: calls.append(kw))
+
+    stress_cli.main(["index", "--indices", "all", "--chunksize", "500"])
+    stress_cli.main(["index", "--indices", "anxiety_index"])
+    assert calls == [{"chunksize": 500, "indices": "all"}, {"indices": ["anxiety_index"]}]
+
+
+def test_unknown_command_exits():
+    with pytest.raises(SystemExit):
+        stress_cli.main(["nope"])
@@ -0,0 +1,78 @@
+"""
+Zaman serisi kümeleme: DTW / korelasyon uzaklıkları ve artımlı güncelleme.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from conftest import root_file
+from stress_clusters import (
+    corr_distance,
+    corr_stats,
+    dtw_distance,
+    run_clustering,
+)
+
+
+def naive_dtw(a, b, window=None):
+    t = a.shape[-1]
+    D = np.full((t + 1, t + 1), np.inf)
+    D[0, 0] = 0.0
+    for i in range(t):
+        for j in range(t):
+            if window is not None and abs(i - j) > window:
+                continue
+            d = np.nan_to_num(a[:, i] - b[:, j])
+            D[i + 1, j + 1] = (d * d).sum() + min(D[i, j + 1], D[i + 1, j], D[i, j])
+    return np.sqrt(D[t, t])
+
+
+@pytest.fixture(scope="module")
+def x():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(5, 2, 24)).cumsum(axis=-1)
+    x[1, 1, 3:6] = np.nan
+    return x
+
+
+@pytest.mark.parametrize("window", [None, 3])
+def test_dtw_matches_naive(x, window):
+    dist, _ = dtw_distance(x, window=window)
+    for i in range(len(x)):
+        for j in range(len(x)):
+            if i != j:
+                assert dist[i, j] == pytest.approx(naive_dtw(x[i], x[j], window), rel=1e-12)
+
+
+@pytest.mark.parametrize("window", [None, 3])
+def test_dtw_incremental_equals_full(x, window):
+    _, state = dtw_distance(x[:, :, :15], window=window)
+    inc, _ = dtw_distance(x, window=window, state=state)
+    full, _ = dtw_distance(x, window=window)
+    np.testing.assert_allclose(inc, full, rtol=1e-12, atol=0)
+
+
+def test_corr_incremental_equals_full_and_pearson(x):
+    head, tail = corr_stats(x[:, :, :15]), corr_stats(x[:, :, 15:])
+    inc = corr_distance({k: head[k] + tail[k] for k in head})
+    full = corr_distance(corr_stats(x))
+    np.testing.assert_allclose(inc, full, rtol=0, atol=1e-12)
+
+    ref = 1 - np.mean([np.corrcoef(x[0, c], x[2, c])[0, 1] for c in range(2)])
+    assert full[0, 2] == pytest.approx(ref, abs=1e-12)
+
+
+@pytest.mark.parametrize("metric", ["corr", "dtw"])
+def test_cached_run_matches_rebuild_and_keeps_notebook_file(metric, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    index_file = root_file("region_stress_index_weekly.csv")
+    cache_file = str(tmp_path / "dist.npz")
+
+    first = run_clustering(metric=metric, cache_file=cache_file, index_file=index_file)
+    cached = run_clustering(metric=metric, cache_file=cache_file, index_file=index_file)
+    assert first.equals(cached)
+
+    assert os.path.exists(f"data/region_clusters_{metric}.csv")
+    assert not os.path.exists("data/region_clusters.csv")
@@ -0,0 +1,22 @@
+import pstats
+
+import stress_metrics
+
+
+def _inner_work():
+    return sum(i * i for i in range(10_000))
+
+
+def test_nested_stages_profile_only_outermost(tmp_path, monkeypatch):
+    monkeypatch.setattr(stress_metrics, "RUN_LOG", "")
+    monkeypatch.setattr(stress_metrics, "PROFILE", "cprofile")
+    monkeypatch.setattr(stress_metrics, "PROFILE_DIR", str(tmp_path))
+
+    with stress_metrics.stage("outer") as outer:
+        with stress_metrics.stage("inner") as inner:
+            _inner_work()
+
+    assert "profile" not in inner
+    stats = pstats.Stats(outer["profile"]["file"]).stats
+    assert any(func[2] == "_inner_work" for func in stats)
+    assert not stress_metrics._profiling
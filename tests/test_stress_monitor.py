@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import stress_monitor
+from build_region_stress_index import VALUE_COLS, region_stress_index
+
+
+def new_state(trends, threshold=stress_monitor.THRESHOLD):
+    first = trends.drop_duplicates("province")
+    return stress_monitor.init_state(first["province"].astype(str), first["region7"].astype(str),
+                                     threshold=threshold)
+
+
+def expanding_batch(trends):
+    # Her tarih için o tarihe kadarki veriyle batch indeks, sadece o tarihin değeri
+    rows = {}
+    for date in np.sort(trends["date"].unique()):
+        out = region_stress_index(trends[trends["date"] <= date])
+        rows[date] = out[out["date"] == date].set_index("region7")["stress_index"]
+    return pd.DataFrame(rows).T
+
+
+def upward_crossings(index, threshold):
+    above = index >= threshold
+    prev = above.shift(1, fill_value=False).astype(bool)
+    dates, regions = np.nonzero((above & ~prev).to_numpy())
+    return sorted((str(index.index[d].date()), str(index.columns[r])) for d, r in zip(dates, regions))
+
+
+@pytest.fixture(scope="module")
+def replay(trends):
+    state = new_state(trends)
+    alerts, index = stress_monitor.update_frame(state, trends)
+    return state, alerts, index
+
+
+def test_snapshots_match_expanding_batch(trends, replay):
+    _, _, index = replay
+    batch = expanding_batch(trends)[index.columns]
+    np.testing.assert_allclose(index.to_numpy(), batch.to_numpy(), rtol=0, atol=1e-12)
+
+
+def test_last_date_matches_full_batch(trends, replay):
+    _, _, index = replay
+    full = region_stress_index(trends)
+    last = full[full["date"] == full["date"].max()].set_index("region7")["stress_index"]
+    np.testing.assert_allclose(index.iloc[-1][last.index].to_numpy(), last.to_numpy(), atol=1e-12)
+
+
+def test_alerts_equal_batch_threshold_crossings(trends, replay):
+    _, alerts, _ = replay
+    batch = expanding_batch(trends)
+    got = sorted((a["date"], a["region7"]) for a in alerts)
+    assert got == upward_crossings(batch, stress_monitor.THRESHOLD)
+    # Alarm değeri tarihin kapanış değeri
+    for a in alerts:
+        closing = batch.loc[pd.Timestamp(a["date"]), a["region7"]]
+        assert a["stress_index"] == pytest.approx(closing, abs=1e-12)
+        assert closing >= stress_monitor.THRESHOLD
+
+
+def test_repeated_province_counted_once(trends):
+    dates = np.sort(trends["date"].unique())[:3]
+    sub = trends[trends["date"].isin(dates)]
+    once = new_state(trends)
+    stress_monitor.update_frame(once, sub)
+
+    # Son tarihteki ilk il önce farklı bir değerle, sonra asıl değeriyle gelir
+    row = sub[sub["date"] == dates[-1]].iloc[[0]]
+    dup = row.copy()
+    dup[VALUE_COLS] = dup[VALUE_COLS] + 50.0
+    twice = new_state(trends)
+    stress_monitor.update_frame(twice, pd.concat([sub[sub["date"] < dates[-1]], dup,
+                                                  sub[sub["date"] == dates[-1]]]))
+
+    for key in ("n", "mean", "m2", "z_sum", "n_obs"):
+        np.testing.assert_allclose(twice[key], once[key], atol=1e-12, err_msg=key)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from analyze_region_stress import build_event_panel
+from build_region_stress_index import region_stress_index
+from conftest import sorted_frame
+from stress_partitions import (
+    build_event_panel_partitioned,
+    build_region_stress_index_partitioned,
+    partition_table,
+    read_partitions,
+)
+from stress_store import write_table
+
+KEYS = ["region7", "date"]
+PANEL_KEYS = ["event_date", "event_type", "region7"]
+
+
+def test_resplit_with_other_chunksize_does_not_duplicate(trends, tmp_path):
+    trends_file = str(tmp_path / "trends.parquet")
+    write_table(trends, "trends", trends_file, export_csv=False)
+    out_root = str(tmp_path / "parts")
+
+    partition_table("trends", trends_file, out_root, chunksize=1000)
+    partition_table("trends", trends_file, out_root, chunksize=3000)
+
+    parts = read_partitions("trends", out_root)
+    assert len(parts) == len(trends)
+    assert not parts.duplicated(["province", "date"]).any()
+
+
+def test_partitioned_index_and_panel_match_in_memory(trends, events, tmp_path):
+    index = region_stress_index(trends)
+    trends_file = str(tmp_path / "trends.parquet")
+    write_table(trends, "trends", trends_file, export_csv=False)
+    partition_table("trends", trends_file, str(tmp_path / "trends"), chunksize=2000)
+
+    build_region_stress_index_partitioned(str(tmp_path / "trends"), str(tmp_path / "index"),
+                                          workers=1)
+    part_index = read_partitions("region_index", str(tmp_path / "index")).drop(columns="country")
+    got, ref = sorted_frame(part_index, KEYS), sorted_frame(index, KEYS)
+    pd.testing.assert_frame_equal(got[KEYS], ref[KEYS])
+    np.testing.assert_allclose(got["stress_index"], ref["stress_index"], rtol=0, atol=1e-12)
+
+    build_event_panel_partitioned(str(tmp_path / "index"), events, str(tmp_path / "panel"),
+                                  workers=1)
+    part_panel = read_partitions("panel", str(tmp_path / "panel")).drop(columns="country")
+    ref_panel = build_event_panel(index, events, out_file=None)
+    got, ref = sorted_frame(part_panel, PANEL_KEYS), sorted_frame(ref_panel, PANEL_KEYS)
+    assert len(got) == len(ref)
+    np.testing.assert_allclose(got["delta_stress"], ref["delta_stress"], rtol=0, atol=1e-12)
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+import stress_service
+from conftest import root_file
+
+
+@pytest.fixture(scope="module")
+def store():
+    return stress_service.load_store({
+        "region_index": root_file("region_stress_index_weekly.csv"),
+        "panel": root_file("event_region_stress_panel.csv"),
+        "events": root_file("event_dates.csv"),
+    })
+
+
+def test_stress_matches_pandas(store, region):
+    out = stress_service.query(store, "/stress", {"region": "Marmara", "start": "2023-01-01",
+                                                  "end": "2023-12-31"})
+    sub = region[(region["region7"] == "Marmara") & region["date"].between("2023-01-01", "2023-12-31")]
+    assert out["regions"]["Marmara"]["n"] == len(sub)
+    assert out["regions"]["Marmara"]["mean"] == pytest.approx(sub["stress_index"].mean(), abs=1e-12)
+
+
+@pytest.mark.parametrize("path, params, message", [
+    ("/stress", {"start": "2024-01-01", "end": "2023-01-01"}, "sonra olamaz"),
+    ("/delta", {"start": "2024-01-01", "end": "2023-01-01"}, "sonra olamaz"),
+    ("/delta", {"start": "2262-02-01"}, "sonra olamaz"),
+    ("/stress", {"start": "not-a-date"}, "Geçersiz tarih"),
+    ("/delta", {"pre_days": "-5"}, "negatif olamaz"),
+    ("/delta", {"post_days": "-1"}, "negatif olamaz"),
+    ("/delta", {"pre_days": "abc"}, "tam sayı"),
+])
+def test_invalid_params_raise_value_error(store, path, params, message):
+    with pytest.raises(ValueError, match=message):
+        stress_service.query(store, path, params)
+
+
+def _get(state, target):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(f"GET {target} HTTP/1.1\r\n\r\n".encode())
+        reader.feed_eof()
+
+        class Writer:
+            data = b""
+
+            def write(self, b):
+                Writer.data += b
+
+            async def drain(self):
+                pass
+
+            def close(self):
+                pass
+
+        await stress_service.handle(reader, Writer(), state)
+        head, body = Writer.data.split(b"\r\n\r\n", 1)
+        return int(head.split()[1]), json.loads(body)
+
+    return asyncio.run(run())
+
+
+def test_http_status_codes(store, monkeypatch):
+    state = {"store": store, "verbose": False}
+    assert _get(state, "/stress?start=2024-01-01&end=2023-01-01")[0] == 400
+    assert _get(state, "/nope")[0] == 404
+
+    # Handler içindeki KeyError 404 değil 500 olur
+    def broken(store, params):
+        raise KeyError("bug")
+
+    monkeypatch.setitem(stress_service.ROUTES, "/regions", broken)
+    status, body = _get(state, "/regions")
+    assert status == 500 and "KeyError" in body["error"]
+    assert np.isfinite(_get(state, "/stress?region=Marmara")[1]["regions"]["Marmara"]["mean"])
@@ -0,0 +1,45 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+import stress_store
+from conftest import root_file
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache")
+    monkeypatch.setattr(stress_store, "CACHE_DIR", path)
+    monkeypatch.setattr(stress_store, "USE_CACHE", True)
+    return path
+
+
+def _load_earthquake(_):
+    return len(stress_store.load_source("earthquake", root_file("earthquake.csv")))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork gerekli")
+def test_concurrent_cold_loads_share_cache(cache_dir):
+    expected = len(stress_store._read_source(root_file("earthquake.csv"),
+                                             stress_store.SOURCES["earthquake"]))
+    with ProcessPoolExecutor(16, mp_context=multiprocessing.get_context("fork")) as pool:
+        sizes = list(pool.map(_load_earthquake, range(16)))
+
+    assert sizes == [expected] * 16
+    # Tek kayıt kalır, geçici klasör kalmaz
+    assert len(os.listdir(cache_dir)) == 1
+    assert _load_earthquake(0) == expected
+
+
+def test_schema_change_invalidates_cache(cache_dir, monkeypatch):
+    path = root_file("earthquake.csv")
+    first = stress_store.load_source("earthquake", path)
+    assert isinstance(first["Location"].dtype, pd.CategoricalDtype)
+
+    spec = dict(stress_store.SOURCES["earthquake"], categories=["Type"])
+    monkeypatch.setitem(stress_store.SOURCES, "earthquake", spec)
+    second = stress_store.load_source("earthquake", path)
+    assert not isinstance(second["Location"].dtype, pd.CategoricalDtype)
@@ -0,0 +1,45 @@
+"""
+Çoklu pencere taraması (sweep_event_windows) ve pencere başına ANOVA.
+"""
+import numpy as np
+import pytest
+
+from analyze_region_stress import anova_by_window, build_event_panel, sweep_event_windows
+from stress_store import read_table
+
+WINDOWS = [(30, 30), (7, 14), (14, 7)]
+
+
+@pytest.fixture(scope="module")
+def sweep(region, events):
+    return sweep_event_windows(region, events, WINDOWS)
+
+
+def test_sweep_matches_single_window_panels(region, events, sweep):
+    for pre, post in WINDOWS:
+        ref = build_event_panel(region, events, pre_days=pre, post_days=post, out_file=None)
+        got = sweep.loc[(sweep["pre_days"] == pre) & (sweep["post_days"] == post)]
+        np.testing.assert_array_equal(got["delta_stress"].to_numpy(), ref["delta_stress"].to_numpy())
+
+
+def test_sweep_rejects_empty_windows(region, events):
+    with pytest.raises(ValueError, match="windows"):
+        sweep_event_windows(region, events, [])
+
+
+def test_sweep_writes_through_store(region, events, tmp_path):
+    out = sweep_event_windows(region, events, WINDOWS[:1], out_file=str(tmp_path / "sweep.parquet"))
+    back = read_table("panel_sweep", str(tmp_path / "sweep.parquet"))
+    assert (tmp_path / "sweep.csv").exists()
+    assert len(back) == len(out)
+    np.testing.assert_array_equal(back["delta_stress"].to_numpy(), out["delta_stress"].to_numpy())
+
+
+def test_anova_by_window_skips_all_nan_window(region, events):
+    # pre_days=0: olay öncesi pencere boş, tüm delta_stress NaN
+    panel = sweep_event_windows(region, events, [(0, 30), (30, 30)])
+    assert panel.loc[panel["pre_days"] == 0, "delta_stress"].isna().all()
+
+    table = anova_by_window(panel)
+    assert table[["pre_days", "post_days"]].values.tolist() == [[30, 30]]
+    assert np.isfinite(table["F"]).all()